@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP client for the moph.id.th (Health ID) -> provider.id.th login flow,
+and the background worker that revalidates cached credentials.
+The endpoints can be overridden in config_auth.AUTH_CONFIG (AUTHORIZE_URL,
+TOKEN_URL, PROVIDER_TOKEN_URL, PROVIDER_PROFILE_URL).
+
+using by
+from AuthClient import AuthClient, AuthError, CredentialRefreshWorker
+"""
+import time
+
+import requests
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from config_auth import AUTH_CONFIG
+from CredentialCache import credential_cache
+
+
+# Endpoints used when config_auth.AUTH_CONFIG does not override them
+DEFAULT_ENDPOINTS = {
+    "AUTHORIZE_URL": "https://moph.id.th/oauth/redirect",
+    "TOKEN_URL": "https://moph.id.th/api/v1/token",
+    "PROVIDER_TOKEN_URL": "https://provider.id.th/api/v1/services/token",
+    "PROVIDER_PROFILE_URL": "https://provider.id.th/api/v1/services/profile?position_type=1",
+}
+
+
+def get_endpoint(name):
+    """Return an endpoint URL from AUTH_CONFIG, falling back to the production default"""
+    return AUTH_CONFIG.get(name) or DEFAULT_ENDPOINTS[name]
+
+
+class AuthError(Exception):
+    """A login request failed"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def credentials_rejected(self):
+        """True when the server refused the token (as opposed to a network problem)"""
+        return self.status_code in (400, 401, 403)
+
+
+class AuthClient:
+    """Runs the token and profile requests on one keep-alive requests.Session"""
+
+    # Seconds to wait for each request
+    REQUEST_TIMEOUT = 30
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+
+        # Endpoints (configurable through AUTH_CONFIG, e.g. for the local FakeAuthServer)
+        self.token_url = get_endpoint("TOKEN_URL")
+        self.provider_token_url = get_endpoint("PROVIDER_TOKEN_URL")
+        self.provider_profile_url = get_endpoint("PROVIDER_PROFILE_URL")
+
+    def _log_response(self, name, response):
+        """Log the status and latency of a request (never its body: it holds tokens and the profile)"""
+        print(f"{name}: HTTP {response.status_code} in {response.elapsed.total_seconds() * 1000:.0f} ms")
+
+    def _data(self, response, error_message):
+        """Return the "data" object of a successful response"""
+        if response.status_code != 200:
+            raise AuthError(f"{error_message}: {response.text}", response.status_code)
+        data = response.json().get("data")
+        if data is None:
+            raise AuthError(f"{error_message}: response has no data", response.status_code)
+        return data
+
+    def exchange_code_for_token(self, auth_code):
+        """Exchange authorization code for access token (ขั้นตอนที่ 2); returns the token data"""
+        client_id = AUTH_CONFIG["HEALTH_CLIENT_ID"]
+        client_secret = AUTH_CONFIG["HEALTH_CLIENT_SECRET"]
+        redirect_uri = AUTH_CONFIG["REDIRECT_URI"]
+
+        if not all([client_id, client_secret, redirect_uri]):
+            raise AuthError("Missing required configuration variables")
+
+        # ข้อมูลสำหรับขอ access token
+        token_data = {
+            "grant_type": "authorization_code",
+            "code": auth_code,
+            "redirect_uri": redirect_uri,
+            "client_id": client_id,
+            "client_secret": client_secret,
+        }
+
+        # Headers
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+
+        response = self.session.post(self.token_url, data=token_data, headers=headers, timeout=self.REQUEST_TIMEOUT)
+        self._log_response("Token exchange", response)
+        return self._data(response, "Token exchange failed")
+
+    def get_provider_token(self, access_token):
+        """Get provider token from Health ID service (ขั้นตอนที่ 3); returns the token data"""
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+
+        body = {
+            "client_id": AUTH_CONFIG["PROVIDER_CLIENT_ID"],
+            "secret_key": AUTH_CONFIG["PROVIDER_CLIENT_SECRET"],
+            "token_by": "Health ID",
+            "token": access_token,
+        }
+
+        response = self.session.post(self.provider_token_url, headers=headers, data=body, timeout=self.REQUEST_TIMEOUT)
+        self._log_response("Provider token", response)
+        return self._data(response, "Error getting provider token")
+
+    def get_provider_profile(self, provider_access_token):
+        """Get provider profile from Provider ID service (ขั้นตอนที่ 4)"""
+        headers = {
+            "client-id": AUTH_CONFIG["PROVIDER_CLIENT_ID"],
+            "secret-key": AUTH_CONFIG["PROVIDER_CLIENT_SECRET"],
+            "Authorization": f"Bearer {provider_access_token}",
+        }
+
+        response = self.session.get(self.provider_profile_url, headers=headers, timeout=self.REQUEST_TIMEOUT)
+        self._log_response("Provider profile", response)
+        return self._data(response, "Error getting provider profile")
+
+
+class CredentialRefreshWorker(QThread):
+    """Worker thread for renewing the provider token and profile of a cached entry"""
+
+    # Signals
+    refresh_succeeded = pyqtSignal(dict)  # new cache entry
+    refresh_failed = pyqtSignal(str, bool)  # error message, True if the entry is no longer valid
+
+    def __init__(self, entry, client):
+        super().__init__()
+        self.entry = entry
+        self.client = client
+        self.refresh_time = 0.0
+
+    def run(self):
+        """Get a new provider token with the cached Health ID token, then the profile"""
+        if not credential_cache.can_refresh(self.entry):
+            self.refresh_failed.emit("Health ID token expired", True)
+            return
+
+        start_time = time.perf_counter()
+        try:
+            provider_data = self.client.get_provider_token(self.entry["access_token"])
+            profile = self.client.get_provider_profile(provider_data.get("access_token"))
+        except AuthError as e:
+            self.refresh_failed.emit(str(e), e.credentials_rejected)
+            return
+        except Exception as e:
+            # Offline or server down - keep the cached identity and retry later
+            self.refresh_failed.emit(str(e), False)
+            return
+        self.refresh_time = time.perf_counter() - start_time
+
+        if profile.get("hash_cid") != self.entry.get("hash_cid"):
+            self.refresh_failed.emit("Refreshed profile belongs to another provider", True)
+            return
+
+        entry = dict(self.entry)
+        entry.update(credential_cache.create_entry(
+            {"access_token": self.entry["access_token"], "expires_at": self.entry["access_expires_at"]},
+            provider_data, profile))
+        self.refresh_succeeded.emit(entry)
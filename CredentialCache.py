@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Encrypted on-disk cache of login tokens and provider profiles.
+Entries are keyed by hash_cid, encrypted with a per-installation key kept
+in AppSetting (so the files alone cannot be read) and honour the expiry
+of the tokens they hold.
+
+using by
+from CredentialCache import credential_cache
+"""
+import hashlib
+import json
+import os
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from AppSetting import app_settings
+
+
+class CredentialCache:
+    """Stores one encrypted credential entry per provider (hash_cid)"""
+
+    # Lifetime assumed when a token response carries no expires_in
+    DEFAULT_TOKEN_LIFETIME = 3600
+    # Refresh the provider token this many seconds before it expires
+    REFRESH_MARGIN = 300
+    # Entries older than this are never used, whatever the token expiry says
+    MAX_ENTRY_AGE = 7 * 24 * 3600
+
+    KEY_SETTING = "auth_cache/key"
+    ENABLED_SETTING = "auth_cache_enabled"
+    # File in the cache directory naming the entry of the last login
+    LAST_ENTRY_FILE = "last_entry"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".plk_super_app", "auth_cache")
+        # None follows the auth_cache_enabled setting; True/False overrides it (e.g. in benchmarks)
+        self.enabled = None
+        self._fernet = None
+
+    def is_enabled(self):
+        """Return True unless the cache is turned off with the auth_cache_enabled setting"""
+        if self.enabled is not None:
+            return self.enabled
+        value = app_settings.get_value(self.ENABLED_SETTING, True)
+        return value == 'true' if isinstance(value, str) else bool(value)
+
+    def _get_fernet(self):
+        """Return the cipher, creating the installation key on first use"""
+        if self._fernet is None:
+            key = app_settings.get_value(self.KEY_SETTING, "")
+            if not key:
+                key = Fernet.generate_key().decode("ascii")
+                app_settings.set_value(self.KEY_SETTING, key)
+                app_settings.sync()
+            self._fernet = Fernet(key.encode("ascii") if isinstance(key, str) else key)
+        return self._fernet
+
+    def _entry_id(self, hash_cid):
+        """File name of an entry (hash_cid itself is not written to the file system)"""
+        return hashlib.sha256(hash_cid.encode("utf-8")).hexdigest()[:32]
+
+    def _entry_path(self, entry_id):
+        return os.path.join(self.cache_dir, f"{entry_id}.bin")
+
+    def _last_entry_path(self):
+        return os.path.join(self.cache_dir, self.LAST_ENTRY_FILE)
+
+    def _read_last_entry_id(self):
+        try:
+            with open(self._last_entry_path(), encoding="ascii") as last_file:
+                return last_file.read().strip()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _expires_at(token_data, now):
+        """Absolute expiry time of a token response"""
+        for field in ("expires_at", "expired_at"):
+            value = token_data.get(field)
+            if isinstance(value, (int, float)) and value > now:
+                return float(value)
+        expires_in = token_data.get("expires_in")
+        try:
+            return now + float(expires_in)
+        except (TypeError, ValueError):
+            return now + CredentialCache.DEFAULT_TOKEN_LIFETIME
+
+    def create_entry(self, access_data, provider_data, profile):
+        """Build an entry from the Health ID token, provider token and profile responses"""
+        now = time.time()
+        return {
+            "hash_cid": profile.get("hash_cid"),
+            "profile": profile,
+            "access_token": access_data.get("access_token"),
+            "access_expires_at": self._expires_at(access_data, now),
+            "provider_token": provider_data.get("access_token"),
+            "provider_expires_at": self._expires_at(provider_data, now),
+            "saved_at": now,
+        }
+
+    def is_usable(self, entry, now=None):
+        """Return True if the entry can still identify the user or be refreshed"""
+        now = time.time() if now is None else now
+        if not entry or not entry.get("hash_cid") or now - entry.get("saved_at", 0) > self.MAX_ENTRY_AGE:
+            return False
+        return entry.get("provider_expires_at", 0) > now or entry.get("access_expires_at", 0) > now
+
+    def can_refresh(self, entry, now=None):
+        """Return True if the Health ID token can still get a new provider token"""
+        now = time.time() if now is None else now
+        return entry.get("access_expires_at", 0) > now
+
+    def seconds_until_refresh(self, entry, now=None):
+        """Seconds until the provider token should be refreshed (0 = now)"""
+        now = time.time() if now is None else now
+        return max(0.0, entry.get("provider_expires_at", 0) - self.REFRESH_MARGIN - now)
+
+    def save(self, entry):
+        """Encrypt and store an entry, and remember it as the last login"""
+        if not self.is_enabled() or not entry.get("hash_cid"):
+            return False
+        entry_id = self._entry_id(entry["hash_cid"])
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            data = self._get_fernet().encrypt(json.dumps(entry).encode("utf-8"))
+            temp_path = self._entry_path(entry_id) + ".tmp"
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(data)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self._entry_path(entry_id))
+            with open(self._last_entry_path(), "w", encoding="ascii") as last_file:
+                last_file.write(entry_id)
+        except Exception as e:
+            print(f"Error saving credential cache: {str(e)}")
+            return False
+        return True
+
+    def load(self, hash_cid):
+        """Return the usable entry of hash_cid, or None"""
+        return self._load_entry(self._entry_id(hash_cid))
+
+    def load_last(self):
+        """Return the usable entry of the last login, or None"""
+        entry_id = self._read_last_entry_id()
+        return self._load_entry(entry_id) if entry_id else None
+
+    def _load_entry(self, entry_id):
+        if not self.is_enabled():
+            return None
+        path = self._entry_path(entry_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as cache_file:
+                entry = json.loads(self._get_fernet().decrypt(cache_file.read(), ttl=self.MAX_ENTRY_AGE))
+        except (InvalidToken, ValueError, OSError) as e:
+            # Wrong key, tampered or too old - drop it
+            print(f"Discarding credential cache entry: {type(e).__name__}")
+            self._remove_entry(entry_id)
+            return None
+
+        if not self.is_usable(entry):
+            self._remove_entry(entry_id)
+            return None
+        return entry
+
+    def remove(self, hash_cid):
+        """Forget the entry of hash_cid (e.g. after its tokens were rejected)"""
+        self._remove_entry(self._entry_id(hash_cid))
+
+    def _remove_entry(self, entry_id):
+        try:
+            os.remove(self._entry_path(entry_id))
+        except OSError:
+            pass
+        if self._read_last_entry_id() == entry_id:
+            try:
+                os.remove(self._last_entry_path())
+            except OSError:
+                pass
+
+
+credential_cache = CredentialCache()
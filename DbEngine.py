@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Shared SQLAlchemy engines for HIS database access.
+Keeps one long-lived pooled engine per connection profile so queries reuse
+connections instead of reconnecting every time.
+
+using by
+from DbEngine import db_engines
+"""
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.pool import NullPool
+
+from AppSetting import app_settings
+from QueryGuard import (DEFAULT_STATEMENT_TIMEOUT, DEFAULT_ROW_LIMIT, DEFAULT_MAX_RESULT_MB,
+                        DEFAULT_MAX_CONCURRENT_QUERIES)
+
+
+class DbEngine:
+    """Registry of pooled SQLAlchemy engines keyed by connection profile"""
+
+    # Pool configuration shared by all profiles
+    POOL_SIZE = 5
+    MAX_OVERFLOW = 5
+    POOL_TIMEOUT = 30
+    POOL_RECYCLE = 3600
+
+    def __init__(self):
+        self._engines = {}
+        # (server key, limit) -> semaphore bounding concurrent Query window queries
+        self._query_slots = {}
+        self._lock = threading.Lock()
+
+    def get_settings(self):
+        """Read the connection profile saved by HisConSetting"""
+        ssl_value = app_settings.get_value('ssl', False)
+        use_conn_str_value = app_settings.get_value('use_connection_string', False)
+        return {
+            'host': str(app_settings.get_value('host', 'localhost')),
+            'port': int(app_settings.get_value('port', 3306)),
+            'database': str(app_settings.get_value('database', '')),
+            'username': str(app_settings.get_value('username', '')),
+            'password': str(app_settings.get_value('password', '')),
+            'db_system': str(app_settings.get_value('db_system', 'mysql')).lower(),
+            'his_name': str(app_settings.get_value('his_name', 'HOSXP')),
+            'charset': str(app_settings.get_value('charset', 'utf8mb4')),
+            'ssl': ssl_value == 'true' if isinstance(ssl_value, str) else bool(ssl_value),
+            'connection_string': str(app_settings.get_value('connection_string', '')),
+            'use_connection_string': use_conn_str_value == 'true' if isinstance(use_conn_str_value, str) else bool(use_conn_str_value),
+            # Query window guardrails (see QueryGuard)
+            'statement_timeout': int(app_settings.get_value('statement_timeout', DEFAULT_STATEMENT_TIMEOUT)),
+            'row_limit': int(app_settings.get_value('row_limit', DEFAULT_ROW_LIMIT)),
+            'max_result_mb': int(app_settings.get_value('max_result_mb', DEFAULT_MAX_RESULT_MB)),
+            'max_concurrent_queries': int(app_settings.get_value('max_concurrent_queries',
+                                                                 DEFAULT_MAX_CONCURRENT_QUERIES)),
+        }
+
+    def is_configured(self, settings):
+        """Return True if the profile has enough information to connect"""
+        if settings.get('use_connection_string'):
+            return bool(settings.get('connection_string', '').strip())
+        return bool(settings.get('host') and settings.get('database') and settings.get('username'))
+
+    def create_connection_url(self, settings):
+        """Build the SQLAlchemy connection URL for a profile"""
+        if settings.get('use_connection_string'):
+            return settings.get('connection_string', '').strip()
+
+        db_system = settings.get('db_system', 'mysql').lower()
+        if db_system == 'mysql':
+            drivername = 'mysql+pymysql'
+        elif db_system == 'postgresql':
+            drivername = 'postgresql+psycopg2'
+        else:
+            raise ValueError(f"Unsupported database system: {db_system}")
+
+        url = URL.create(
+            drivername,
+            username=settings.get('username') or None,
+            password=settings.get('password') or None,
+            host=settings.get('host') or None,
+            port=int(settings['port']) if settings.get('port') else None,
+            database=settings.get('database') or None,
+        )
+        return url.render_as_string(hide_password=False)
+
+    def _connect_args(self, settings):
+        """Driver specific connect arguments for individual-parameter profiles"""
+        if settings.get('use_connection_string'):
+            return {}
+        if settings.get('db_system', 'mysql').lower() == 'postgresql':
+            return {'sslmode': 'require' if settings.get('ssl') else 'disable'}
+        return {
+            'charset': settings.get('charset', 'utf8mb4'),
+            'ssl_disabled': not settings.get('ssl', False),
+        }
+
+    def profile_key(self, settings):
+        """Return the key identifying a connection profile"""
+        url = self.create_connection_url(settings)
+        connect_args = tuple(sorted(self._connect_args(settings).items()))
+        return (url, connect_args)
+
+    def profile_label(self, settings):
+        """Return a displayable name of a profile (the connection URL with the password masked)"""
+        return make_url(self.create_connection_url(settings)).render_as_string(hide_password=True)
+
+    def server_key(self, settings):
+        """Return the key identifying the database server of a profile (any database on it)"""
+        url = make_url(self.create_connection_url(settings))
+        if url.get_backend_name() == 'sqlite':
+            return ('sqlite', url.database)
+        return (url.get_backend_name(), url.host, url.port)
+
+    def query_slot(self, settings):
+        """
+        Return the semaphore bounding the concurrent interactive queries on
+        the server of a profile, or None if the profile sets no limit. All
+        profiles on the same server with the same limit share the semaphore.
+        """
+        limit = int(settings.get('max_concurrent_queries') or 0)
+        if limit <= 0:
+            return None
+        key = (self.server_key(settings), limit)
+        with self._lock:
+            slot = self._query_slots.get(key)
+            if slot is None:
+                slot = self._query_slots[key] = threading.BoundedSemaphore(limit)
+            return slot
+
+    def get_engine(self, settings=None):
+        """Return the pooled engine for a profile, creating it on first use"""
+        if settings is None:
+            settings = self.get_settings()
+        key = self.profile_key(settings)
+
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                url = key[0]
+                engine_options = {'pool_pre_ping': True}
+                # SQLite (used for local testing) does not support the queue pool options
+                if make_url(url).get_backend_name() != 'sqlite':
+                    engine_options.update(
+                        pool_size=self.POOL_SIZE,
+                        max_overflow=self.MAX_OVERFLOW,
+                        pool_timeout=self.POOL_TIMEOUT,
+                        pool_recycle=self.POOL_RECYCLE,
+                    )
+                engine = create_engine(url, connect_args=self._connect_args(settings), **engine_options)
+                self._engines[key] = engine
+            return engine
+
+    def engine_for_profile(self, key):
+        """Return the engine of a profile key that is already in use, or None"""
+        with self._lock:
+            return self._engines.get(key)
+
+    def checkout(self, settings=None):
+        """
+        Check out a pooled connection.
+
+        Returns (connection, wait_time) where wait_time is the seconds spent
+        waiting for the pool (including opening a new connection if needed).
+        """
+        engine = self.get_engine(settings)
+        start_time = time.perf_counter()
+        connection = engine.connect()
+        return connection, time.perf_counter() - start_time
+
+    def backend_id(self, connection):
+        """
+        Return the server session id of a connection (for cancel_backend), or
+        None if unsupported. It is read once per DBAPI connection and kept in
+        its pool info, which is cleared when the pool reconnects.
+        """
+        dialect = connection.dialect.name
+        if dialect == 'mysql':
+            statement = "SELECT CONNECTION_ID()"
+        elif dialect == 'postgresql':
+            statement = "SELECT pg_backend_pid()"
+        else:
+            return None
+        if 'backend_id' not in connection.info:
+            connection.info['backend_id'] = connection.execute(text(statement)).scalar()
+        return connection.info['backend_id']
+
+    def cancel_backend(self, settings, backend_id):
+        """
+        Cancel the statement running in server session backend_id (KILL QUERY /
+        pg_cancel_backend). The session itself stays open. The cancel uses its
+        own unpooled connection, so it is not queued behind a busy pool.
+        """
+        url, connect_args = self.profile_key(settings)
+        engine = create_engine(url, connect_args=dict(connect_args), poolclass=NullPool)
+        try:
+            with engine.connect() as connection:
+                if connection.dialect.name == 'mysql':
+                    connection.execute(text(f"KILL QUERY {int(backend_id)}"))
+                elif connection.dialect.name == 'postgresql':
+                    connection.execute(text("SELECT pg_cancel_backend(:pid)"), {'pid': int(backend_id)})
+                else:
+                    raise ValueError(f"Cancelling queries is not supported for {connection.dialect.name}")
+        finally:
+            engine.dispose()
+
+    def dispose(self, settings=None):
+        """Close all pooled connections of a profile"""
+        if settings is None:
+            settings = self.get_settings()
+        key = self.profile_key(settings)
+        with self._lock:
+            engine = self._engines.pop(key, None)
+        if engine is not None:
+            engine.dispose()
+
+    def dispose_all(self):
+        """Close the pooled connections of every profile"""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+
+db_engines = DbEngine()
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Database access layer for the HIS management modules (House, Person, Visit, ...).
+Reads the connection profile from AppSetting and runs parameterized statements
+on the shared connection pool of that profile.
+
+using by
+from DbPerform import DbPerform
+"""
+import hashlib
+import re
+import threading
+import time
+
+from sqlalchemy import text, bindparam
+
+from DbEngine import db_engines
+from QueryExport import is_read_only_query
+from TableChangeMonitor import read_table_versions
+
+
+SIMPLE_SELECT_PATTERN = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>[A-Za-z_]\w*)(?P<rest>(\s.*)?)$",
+    re.IGNORECASE | re.DOTALL,
+)
+IDENTIFIER_PATTERN = re.compile(r"^(?:[A-Za-z_]\w*\.)?(?P<name>[A-Za-z_]\w*)$")
+SQL_VALUE_KEYWORDS = {"null", "true", "false", "case", "current_date", "current_timestamp"}
+
+
+def parse_simple_select(query):
+    """
+    Return (table, columns) referenced by a single-table SELECT.
+
+    Only plain column references are collected; literals, expressions and *
+    carry no column requirement. Returns None for statements that are not a
+    simple single-table SELECT (joins, subqueries, ...).
+    """
+    match = SIMPLE_SELECT_PATTERN.match(query)
+    if not match:
+        return None
+    rest = match.group("rest").lower()
+    if re.search(r"\bjoin\b", rest) or rest.lstrip().startswith(","):
+        return None
+
+    select_list = re.sub(r"^\s*distinct\s+", "", match.group("columns"), flags=re.IGNORECASE)
+    columns = []
+    depth = 0
+    item = ""
+    for char in select_list + ",":
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            expression = item.strip().split()[0] if item.strip() else ""
+            identifier = IDENTIFIER_PATTERN.match(expression)
+            if identifier and identifier.group("name").lower() not in SQL_VALUE_KEYWORDS:
+                columns.append(identifier.group("name"))
+            item = ""
+        else:
+            item += char
+    return match.group("table"), columns
+
+
+class DbPerform:
+    """
+    Thread-safe data access helper.
+
+    Every call checks a connection out of the profile's shared pool and
+    returns it afterwards, so one instance can be used from any QThread and
+    all modules share the same connections.
+    """
+
+    def __init__(self, connection_settings=None):
+        # None means "read the profile saved by HisConSetting on every call",
+        # which reads QSettings and is only safe on the GUI thread; instances
+        # used by worker threads are given explicit settings
+        self.connection_settings = connection_settings
+
+        # Per-call timing counters
+        self._stats_lock = threading.Lock()
+        self.timings = {}
+        self.last_execution_time = 0.0
+        self.last_pool_wait_time = 0.0
+
+    def _get_connection_settings(self):
+        """Get the connection settings of the active profile"""
+        if self.connection_settings is not None:
+            return dict(self.connection_settings)
+        return db_engines.get_settings()
+
+    def profile_key(self):
+        """Return the db_engines key of the active connection profile"""
+        return db_engines.profile_key(self._get_connection_settings())
+
+    def _create_connection_string(self, settings):
+        """Create the SQLAlchemy connection string for the given settings"""
+        return db_engines.create_connection_url(settings)
+
+    def _record_timing(self, name, execution_time, pool_wait_time, success):
+        """Update the timing counters for one call"""
+        with self._stats_lock:
+            stats = self.timings.setdefault(name, {
+                'calls': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0, 'pool_wait_time': 0.0
+            })
+            stats['calls'] += 1
+            stats['total_time'] += execution_time
+            stats['max_time'] = max(stats['max_time'], execution_time)
+            stats['pool_wait_time'] += pool_wait_time
+            if not success:
+                stats['errors'] += 1
+            self.last_execution_time = execution_time
+            self.last_pool_wait_time = pool_wait_time
+
+    def get_timing_stats(self):
+        """Return a copy of the per-call timing counters"""
+        with self._stats_lock:
+            return {name: dict(stats) for name, stats in self.timings.items()}
+
+    def _run(self, name, callback):
+        """Check out a pooled connection, run callback(connection) and record timings"""
+        settings = self._get_connection_settings()
+        if not db_engines.is_configured(settings):
+            return False, "Database connection is not configured"
+
+        start_time = time.perf_counter()
+        pool_wait_time = 0.0
+        try:
+            connection, pool_wait_time = db_engines.checkout(settings)
+            try:
+                result = callback(connection)
+            finally:
+                connection.close()
+            self._record_timing(name, time.perf_counter() - start_time, pool_wait_time, True)
+            return True, result
+        except Exception as e:
+            self._record_timing(name, time.perf_counter() - start_time, pool_wait_time, False)
+            return False, str(e)
+
+    def execute_query(self, query, params=None):
+        """
+        Execute a parameterized statement.
+
+        Parameters use the :name style, e.g.
+        execute_query("SELECT * FROM house WHERE village_id = :village", {"village": 3})
+
+        Returns (success, rows) or (success, error_message).
+        """
+        def callback(connection):
+            result = connection.execute(text(query), params or {})
+            data = [tuple(row) for row in result] if result.returns_rows else result.rowcount
+            if not is_read_only_query(query):
+                # Also INSERT/UPDATE ... RETURNING, whose rows are read first
+                connection.commit()
+            return data
+
+        return self._run('execute_query', callback)
+
+    def stream_query(self, query, params=None, batch_size=500):
+        """
+        Execute a parameterized SELECT and yield its rows in batches.
+
+        The statement runs on a server-side cursor and the pooled connection
+        is held until the generator is exhausted or closed, so callers can
+        show rows as they arrive and stop early. Errors are raised.
+        """
+        settings = self._get_connection_settings()
+        if not db_engines.is_configured(settings):
+            raise RuntimeError("Database connection is not configured")
+
+        start_time = time.perf_counter()
+        connection, pool_wait_time = db_engines.checkout(settings)
+        success = False
+        try:
+            result = connection.execution_options(stream_results=True).execute(text(query), params or {})
+            while True:
+                rows = result.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+            success = True
+        except GeneratorExit:
+            # Closed early by the caller (e.g. cancelled) - not an error
+            success = True
+            raise
+        finally:
+            connection.close()
+            self._record_timing('stream_query', time.perf_counter() - start_time, pool_wait_time, success)
+
+    def execute_multiple_queries(self, queries, params=None, probe_schema=False):
+        """
+        Try candidate queries in order and return the first that succeeds.
+
+        With probe_schema=True the tables and columns of all candidates are
+        checked in a single information_schema round trip first, and
+        candidates that cannot succeed are skipped instead of each costing a
+        failed query.
+
+        Returns (success, rows, query_index) or (False, error_message, -1).
+        """
+        skipped = set()
+        if probe_schema:
+            skipped = self.find_unavailable_candidates(queries)
+
+        last_error = "No queries to execute"
+        for query_index, query in enumerate(queries):
+            if query_index in skipped:
+                last_error = f"Candidate {query_index + 1} skipped: tables or columns not found"
+                continue
+            success, data = self.execute_query(query, params)
+            if success:
+                return True, data, query_index
+            last_error = data
+        return False, last_error, -1
+
+    def get_result_columns(self, query, params=None):
+        """
+        Return the column names a statement produces.
+
+        Returns (success, [column_name, ...]) or (success, error_message).
+        """
+        def callback(connection):
+            result = connection.execute(text(query), params or {})
+            columns = list(result.keys())
+            result.close()
+            return columns
+
+        return self._run('get_result_columns', callback)
+
+    def find_unavailable_candidates(self, queries):
+        """Return the indexes of candidate queries whose table or columns do not exist"""
+        requirements = {index: parse_simple_select(query) for index, query in enumerate(queries)}
+        tables = sorted({req[0].lower() for req in requirements.values() if req})
+        if not tables:
+            return set()
+
+        success, schema = self.get_table_columns(tables)
+        if not success:
+            # Could not read the schema (e.g. no permission) - try every candidate
+            return set()
+
+        unavailable = set()
+        for index, requirement in requirements.items():
+            if not requirement:
+                continue
+            table, columns = requirement
+            existing = schema.get(table.lower())
+            if existing is None or any(column.lower() not in existing for column in columns):
+                unavailable.add(index)
+        return unavailable
+
+    def get_table_columns(self, tables):
+        """
+        Read the columns of several tables in one round trip.
+
+        Returns (success, {table_name_lower: {column_name_lower, ...}}) or
+        (success, error_message). Tables that do not exist are not in the dict.
+        """
+        def callback(connection):
+            dialect = connection.dialect.name
+            if dialect == 'mysql':
+                query = ("SELECT table_name, column_name FROM information_schema.columns "
+                         "WHERE table_schema = DATABASE() AND LOWER(table_name) IN :tables")
+            elif dialect == 'postgresql':
+                query = ("SELECT table_name, column_name FROM information_schema.columns "
+                         "WHERE table_schema = current_schema() AND LOWER(table_name) IN :tables")
+            elif dialect == 'sqlite':
+                query = ("SELECT m.name, p.name FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+                         "WHERE m.type = 'table' AND LOWER(m.name) IN :tables")
+            else:
+                raise ValueError(f"Schema probing is not supported for {dialect}")
+
+            statement = text(query).bindparams(bindparam('tables', expanding=True))
+            schema = {}
+            for table_name, column_name in connection.execute(statement, {'tables': [t.lower() for t in tables]}):
+                schema.setdefault(table_name.lower(), set()).add(column_name.lower())
+            return schema
+
+        return self._run('get_table_columns', callback)
+
+    def get_primary_key(self, table):
+        """
+        Read the primary key columns of a table, in key order.
+
+        Returns (success, [column_name, ...]) or (success, error_message);
+        the list is empty when the table has no primary key.
+        """
+        def callback(connection):
+            dialect = connection.dialect.name
+            if dialect == 'mysql':
+                query = ("SELECT column_name FROM information_schema.key_column_usage "
+                         "WHERE table_schema = DATABASE() AND table_name = :table "
+                         "AND constraint_name = 'PRIMARY' ORDER BY ordinal_position")
+            elif dialect == 'postgresql':
+                query = ("SELECT k.column_name FROM information_schema.table_constraints c "
+                         "JOIN information_schema.key_column_usage k ON k.constraint_name = c.constraint_name "
+                         "AND k.table_schema = c.table_schema AND k.table_name = c.table_name "
+                         "WHERE c.constraint_type = 'PRIMARY KEY' AND c.table_schema = current_schema() "
+                         "AND c.table_name = :table ORDER BY k.ordinal_position")
+            elif dialect == 'sqlite':
+                query = "SELECT name FROM pragma_table_info(:table) WHERE pk > 0 ORDER BY pk"
+            else:
+                raise ValueError(f"Primary key lookup is not supported for {dialect}")
+
+            return [row[0] for row in connection.execute(text(query), {'table': table})]
+
+        return self._run('get_primary_key', callback)
+
+    def quote_identifier(self, name):
+        """Quote a table or column name for the dialect of the active profile"""
+        engine = db_engines.get_engine(self._get_connection_settings())
+        return engine.dialect.identifier_preparer.quote_identifier(name)
+
+    def find_tables_by_pattern(self, patterns):
+        """
+        Find tables in the current database whose names match LIKE patterns.
+
+        Returns (success, table_names) or (success, error_message).
+        """
+        def callback(connection):
+            dialect = connection.dialect.name
+            if dialect == 'mysql':
+                query = ("SELECT table_name FROM information_schema.tables "
+                         "WHERE table_schema = DATABASE() AND table_name LIKE :pattern")
+            elif dialect == 'postgresql':
+                query = ("SELECT table_name FROM information_schema.tables "
+                         "WHERE table_schema = current_schema() AND table_name LIKE :pattern")
+            elif dialect == 'sqlite':
+                query = "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern"
+            else:
+                raise ValueError(f"Table search is not supported for {dialect}")
+
+            statement = text(query)
+            tables = []
+            for pattern in patterns:
+                for row in connection.execute(statement, {'pattern': pattern}):
+                    if row[0] not in tables:
+                        tables.append(row[0])
+            return tables
+
+        return self._run('find_tables_by_pattern', callback)
+
+    def get_schema_fingerprint(self):
+        """
+        Identify the current database and schema version in one round trip.
+
+        The fingerprint changes when the server, database or table/column
+        layout changes, so it can key caches of schema probing results.
+        Returns (success, fingerprint) or (success, error_message).
+        """
+        def callback(connection):
+            dialect = connection.dialect.name
+            if dialect == 'mysql':
+                query = ("SELECT (SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = DATABASE()), "
+                         "(SELECT MAX(create_time) FROM information_schema.tables WHERE table_schema = DATABASE())")
+            elif dialect == 'postgresql':
+                query = ("SELECT (SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = current_schema()), "
+                         "(SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = current_schema())")
+            elif dialect == 'sqlite':
+                query = "PRAGMA schema_version"
+            else:
+                raise ValueError(f"Schema fingerprint is not supported for {dialect}")
+
+            schema_version = "|".join(str(value) for value in connection.execute(text(query)).fetchone())
+            url = connection.engine.url.render_as_string(hide_password=True)
+            return hashlib.sha1(f"{url}|{schema_version}".encode("utf-8")).hexdigest()[:16]
+
+        return self._run('get_schema_fingerprint', callback)
+
+    def get_table_versions(self, tables):
+        """
+        Read the change tokens of tables in one catalog query.
+
+        Returns (success, versions) where versions is {table: token}, or None
+        when the database has no change counters (see TableChangeMonitor).
+        """
+        return self._run('get_table_versions', lambda connection: read_table_versions(connection, tables))
+
+    def test_connection(self):
+        """Test the connection of the active profile"""
+        success, result = self._run('test_connection', lambda connection: connection.execute(text("SELECT 1")).scalar())
+        if success and result == 1:
+            return True, "Connection successful"
+        return False, f"Connection Failed: {result}"
+
+    def close(self):
+        """
+        Release this instance.
+
+        The connection pool is shared by all modules, so it is left open; use
+        db_engines.dispose_all() to close the pooled connections.
+        """
+        with self._stats_lock:
+            self.timings.clear()
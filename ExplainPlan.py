@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+EXPLAIN support for the Query window.
+Runs the plan statement of the connection's dialect and parses it into a
+tree of PlanNode objects with estimated and (when analyzed) actual rows:
+    MySQL       EXPLAIN FORMAT=JSON / EXPLAIN ANALYZE (tree text)
+    MariaDB     EXPLAIN FORMAT=JSON / ANALYZE FORMAT=JSON
+    PostgreSQL  EXPLAIN (FORMAT JSON) / EXPLAIN (ANALYZE, FORMAT JSON)
+    SQLite      EXPLAIN QUERY PLAN (local testing)
+Full table scans, filesorts and temporary tables are flagged on each node;
+on the large HOSxP tables (BIG_TABLES) they are reported as severe.
+
+using by
+from ExplainPlan import explain_query, plan_warnings
+"""
+import json
+import re
+
+from sqlalchemy import text
+
+from QueryExport import is_read_only_query
+
+
+# Tables large enough in a HOSxP database that a full scan or sort on them hurts
+BIG_TABLES = {"ovst", "opdscreen", "patient"}
+
+FULL_SCAN = "full table scan"
+FILESORT = "filesort"
+TEMPORARY = "temporary table"
+
+
+class PlanNode:
+    """One operation of a query plan"""
+
+    def __init__(self, operation, table=None, estimated_rows=None, actual_rows=None, cost=None, details=""):
+        self.operation = operation
+        self.table = table
+        self.estimated_rows = estimated_rows
+        self.actual_rows = actual_rows
+        self.cost = cost
+        self.details = details
+        self.warnings = []
+        self.children = []
+
+    def warn(self, warning):
+        if warning not in self.warnings:
+            self.warnings.append(warning)
+
+    def is_big_table(self):
+        return self.table is not None and self.table.lower() in BIG_TABLES
+
+    def walk(self):
+        """Yield this node and all nodes below it"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def plan_warnings(roots):
+    """Return (node, warning, severe) for every flagged node of a plan"""
+    return [(node, warning, node.is_big_table())
+            for root in roots for node in root.walk() for warning in node.warnings]
+
+
+def _number(value):
+    """Plan values come as numbers or numeric strings"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# MySQL / MariaDB JSON ------------------------------------------------------
+
+# Operations wrapping the tables they apply to: key -> label
+_MYSQL_OPERATIONS = {
+    "ordering_operation": "Order by",
+    "grouping_operation": "Group by",
+    "duplicates_removal": "Distinct",
+    "windowing": "Window",
+    "union_result": "Union",
+    "filesort": "Filesort",
+    "temporary_table": "Temporary table",
+    "read_sorted_file": "Read sorted file",
+}
+
+
+def _mysql_table(spec):
+    """Create the node of one table access"""
+    access_type = spec.get("access_type", "")
+    operation = f"Table access ({access_type})" if access_type else "Table access"
+    details = []
+    if spec.get("key"):
+        details.append(f"key: {spec['key']}")
+    if spec.get("attached_condition"):
+        details.append(f"where: {spec['attached_condition']}")
+    cost_info = spec.get("cost_info", {})
+    node = PlanNode(operation, spec.get("table_name"),
+                    _number(spec.get("rows_examined_per_scan", spec.get("rows"))),
+                    _number(spec.get("r_rows")),
+                    _number(cost_info.get("prefix_cost", cost_info.get("read_cost"))),
+                    "; ".join(details))
+    if access_type == "ALL":
+        node.warn(FULL_SCAN)
+    for key, value in spec.items():
+        if isinstance(value, (dict, list)):
+            node.children.extend(_mysql_nodes(value))
+    return node
+
+
+def _mysql_nodes(value):
+    """Return the plan nodes found in a part of a MySQL/MariaDB JSON plan"""
+    if isinstance(value, list):
+        return [node for item in value for node in _mysql_nodes(item)]
+    if not isinstance(value, dict):
+        return []
+
+    nodes = []
+    for key, item in value.items():
+        if key == "query_block":
+            cost_info = item.get("cost_info", {})
+            node = PlanNode(f"Query block #{item.get('select_id', 1)}", cost=_number(cost_info.get("query_cost")))
+            node.children = _mysql_nodes({k: v for k, v in item.items() if k != "cost_info"})
+            nodes.append(node)
+        elif key == "table" and isinstance(item, dict):
+            nodes.append(_mysql_table(item))
+        elif key == "nested_loop":
+            node = PlanNode("Nested loop join")
+            node.children = _mysql_nodes(item)
+            nodes.append(node)
+        elif key in _MYSQL_OPERATIONS and isinstance(item, dict):
+            node = PlanNode(_MYSQL_OPERATIONS[key], estimated_rows=_number(item.get("rows")),
+                            actual_rows=_number(item.get("r_output_rows")))
+            if item.get("using_filesort") or key == "filesort":
+                node.warn(FILESORT)
+            if item.get("using_temporary_table") or key == "temporary_table":
+                node.warn(TEMPORARY)
+            node.children = _mysql_nodes(item)
+            nodes.append(node)
+        elif isinstance(item, (dict, list)):
+            # Containers such as query_specifications or attached_subqueries
+            nodes.extend(_mysql_nodes(item))
+    return nodes
+
+
+def parse_mysql_json(plan):
+    """Parse EXPLAIN FORMAT=JSON (or MariaDB ANALYZE FORMAT=JSON) output"""
+    roots = _mysql_nodes(plan)
+    # A filesort or temporary table belongs to the tables it reads; flag them too
+    for root in roots:
+        for node in root.walk():
+            for warning in (FILESORT, TEMPORARY):
+                if warning in node.warnings:
+                    for child in node.walk():
+                        if child.table is not None:
+                            child.warn(warning)
+    return roots
+
+
+# MySQL EXPLAIN ANALYZE tree ------------------------------------------------
+
+_TREE_LINE_RE = re.compile(
+    r"^(?P<indent>\s*)-> (?P<operation>.*?)"
+    r"(?:\s+\(cost=(?P<cost>[\d.e+]+)(?:\.\.[\d.e+]+)? rows=(?P<rows>[\d.e+]+)\))?"
+    r"(?:\s+\(actual time=[\d.e+]+\.\.[\d.e+]+ rows=(?P<actual>[\d.e+]+) loops=(?P<loops>\d+)\)|\s+\(never executed\))?\s*$")
+_TREE_TABLE_RE = re.compile(r"\bon ([\w$]+)")
+
+
+def parse_mysql_tree(plan_text):
+    """Parse EXPLAIN ANALYZE / EXPLAIN FORMAT=TREE output"""
+    roots = []
+    stack = []
+    for line in plan_text.splitlines():
+        match = _TREE_LINE_RE.match(line)
+        if not match:
+            continue
+        operation = match.group("operation")
+        table_match = _TREE_TABLE_RE.search(operation)
+        node = PlanNode(operation, table_match.group(1) if table_match else None,
+                        _number(match.group("rows")), _number(match.group("actual")), _number(match.group("cost")),
+                        f"loops: {match.group('loops')}" if match.group("loops") else "")
+        if operation.startswith("Table scan on"):
+            node.warn(FULL_SCAN)
+        if operation.startswith("Sort"):
+            node.warn(FILESORT)
+        if "temporary" in operation.lower() or operation.startswith("Materialize"):
+            node.warn(TEMPORARY)
+
+        depth = len(match.group("indent"))
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        if stack:
+            stack[-1][1].children.append(node)
+        else:
+            roots.append(node)
+        stack.append((depth, node))
+    return roots
+
+
+# PostgreSQL JSON -----------------------------------------------------------
+
+def _postgresql_node(plan):
+    node_type = plan.get("Node Type", "")
+    details = []
+    for key in ("Index Name", "Filter", "Index Cond", "Hash Cond", "Join Filter", "Sort Key",
+                "Sort Method", "Group Key"):
+        if plan.get(key):
+            value = plan[key]
+            details.append(f"{key}: {', '.join(value) if isinstance(value, list) else value}")
+    loops = plan.get("Actual Loops")
+    if loops is not None and loops != 1:
+        details.append(f"loops: {loops}")
+
+    node = PlanNode(node_type, plan.get("Relation Name"), _number(plan.get("Plan Rows")),
+                    _number(plan.get("Actual Rows")), _number(plan.get("Total Cost")), "; ".join(details))
+    if node_type == "Seq Scan":
+        node.warn(FULL_SCAN)
+    if node_type in ("Sort", "Incremental Sort"):
+        node.warn(FILESORT)
+    if node_type == "Materialize" or plan.get("Sort Space Type") == "Disk" or (plan.get("Hash Batches") or 0) > 1:
+        node.warn(TEMPORARY)
+    node.children = [_postgresql_node(child) for child in plan.get("Plans", [])]
+    if FILESORT in node.warnings:
+        for child in node.walk():
+            if child.table is not None:
+                child.warn(FILESORT)
+    return node
+
+
+def parse_postgresql_json(plan):
+    """Parse EXPLAIN (FORMAT JSON) output (a list with one document per statement)"""
+    if isinstance(plan, dict):
+        plan = [plan]
+    return [_postgresql_node(document["Plan"]) for document in plan if "Plan" in document]
+
+
+# SQLite --------------------------------------------------------------------
+
+_SQLITE_SCAN_RE = re.compile(r"^(SCAN|SEARCH)(?: TABLE)? ([\w$]+)")
+
+
+def parse_sqlite_plan(rows):
+    """Parse EXPLAIN QUERY PLAN rows (id, parent, notused, detail)"""
+    roots = []
+    nodes = {}
+    for row in rows:
+        node_id, parent, detail = row[0], row[1], row[3]
+        match = _SQLITE_SCAN_RE.match(detail)
+        node = PlanNode(detail, match.group(2) if match else None)
+        if match and match.group(1) == "SCAN" and "INDEX" not in detail:
+            node.warn(FULL_SCAN)
+        if detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail:
+            node.warn(FILESORT)
+        elif detail.startswith("USE TEMP B-TREE") or detail.startswith("MATERIALIZE"):
+            node.warn(TEMPORARY)
+        nodes[node_id] = node
+        if parent in nodes:
+            nodes[parent].children.append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+_ALIAS_RE = re.compile(r"\b(?:from|join)\s+[`\"]?(?:[\w$]+[`\"]?\.[`\"]?)?([\w$]+)[`\"]?\s+(?:as\s+)?([\w$]+)",
+                       re.IGNORECASE)
+
+
+def resolve_aliases(roots, query):
+    """Replace the table aliases MySQL and SQLite report with the table names of query"""
+    aliases = {alias.lower(): table for table, alias in _ALIAS_RE.findall(query)}
+    for root in roots:
+        for node in root.walk():
+            if node.table is not None and node.table.lower() in aliases:
+                node.table = aliases[node.table.lower()]
+    return roots
+
+
+def explain_query(connection, query, analyze=False, guard=None):
+    """
+    Run the EXPLAIN statement of connection's dialect for query and return
+    the root PlanNodes. analyze executes the statement to get actual row
+    counts, so it is only allowed for read-only queries, runs within the
+    statement timeout of guard (a QueryGuard) and the transaction is rolled
+    back afterwards. Raises ValueError for unsupported requests.
+    """
+    query = query.strip().rstrip(";").strip()
+    if analyze and not is_read_only_query(query):
+        raise ValueError("ANALYZE runs the statement - only SELECT queries can be analyzed")
+
+    dialect = connection.dialect
+    try:
+        return resolve_aliases(_run_explain(connection, dialect, query, analyze, guard), query)
+    finally:
+        connection.rollback()
+
+
+def _run_explain(connection, dialect, query, analyze, guard):
+    def scalar(statement):
+        if analyze and guard is not None:
+            # The timeout wraps the whole EXPLAIN (MariaDB SET STATEMENT, PostgreSQL
+            # SET LOCAL) or hints its SELECT (MySQL MAX_EXECUTION_TIME)
+            statement = guard.prepare(connection, statement)
+        return connection.execute(text(statement)).scalar()
+
+    if dialect.name == 'mysql':
+        if getattr(dialect, 'is_mariadb', False):
+            prefix = "ANALYZE FORMAT=JSON " if analyze else "EXPLAIN FORMAT=JSON "
+            return parse_mysql_json(json.loads(scalar(prefix + query)))
+        if analyze:
+            return parse_mysql_tree(scalar("EXPLAIN ANALYZE " + query))
+        return parse_mysql_json(json.loads(scalar("EXPLAIN FORMAT=JSON " + query)))
+    if dialect.name == 'postgresql':
+        options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        plan = scalar(f"EXPLAIN ({options}) {query}")
+        return parse_postgresql_json(json.loads(plan) if isinstance(plan, str) else plan)
+    if dialect.name == 'sqlite':
+        return parse_sqlite_plan(connection.execute(text("EXPLAIN QUERY PLAN " + query)).fetchall())
+    raise ValueError(f"EXPLAIN is not supported for {dialect.name}")
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the moph.id.th / provider.id.th login endpoints.
+Issues authorization codes, tokens and provider profiles with configurable
+latency and failure injection, so the login flow can be measured and
+regression-tested offline.
+
+usage:
+python FakeAuthServer.py --port 8765 --latency 150 --jitter 50 --failure-rate 0.05
+
+using by
+from FakeAuthServer import FakeAuthServer
+server = FakeAuthServer(latency_ms=100).start()
+AUTH_CONFIG.update(server.auth_config())
+"""
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+
+AUTHORIZE_PATH = "/oauth/redirect"
+TOKEN_PATH = "/api/v1/token"
+PROVIDER_TOKEN_PATH = "/api/v1/services/token"
+PROVIDER_PROFILE_PATH = "/api/v1/services/profile"
+CALLBACK_PATH = "/callback"
+
+# Profile returned for every login
+DEFAULT_PROFILE = {
+    "title_th": "นพ.",
+    "name_th": "ทดสอบ ระบบ",
+    "hash_cid": "fake0000000000000000000000000000000000000000000000000000000000",
+    "organization": [
+        {"hcode": "00000", "hname_th": "โรงพยาบาลทดสอบ", "position": "นายแพทย์"},
+    ],
+}
+
+
+class _FakeAuthHandler(BaseHTTPRequestHandler):
+    """Request handler; the server state lives on self.server.fake"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY the
+    # client's delayed ACK adds ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.fake.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        return {key: values[0] for key, values in parse_qs(body).items()}
+
+    def _inject(self, endpoint):
+        """Apply the configured latency; return True if this request should fail"""
+        fake = self.server.fake
+        fake.record_request(endpoint)
+        delay_ms = fake.latency_ms.get(endpoint, fake.default_latency_ms)
+        if fake.jitter_ms:
+            delay_ms += random.uniform(-fake.jitter_ms, fake.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        if fake.failure_rate and random.random() < fake.failure_rate:
+            fake.record_failure(endpoint)
+            self._send_json(500, {"status": 500, "message": "Injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        fake = self.server.fake
+
+        if parsed.path == AUTHORIZE_PATH:
+            if self._inject("authorize"):
+                return
+            # Log the user in immediately and redirect back with a code
+            code = fake.issue("codes")
+            redirect_uri = params.get("redirect_uri") or fake.base_url + CALLBACK_PATH
+            separator = "&" if "?" in redirect_uri else "?"
+            self.send_response(302)
+            self.send_header("Location", f"{redirect_uri}{separator}{urlencode({'code': code})}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif parsed.path == CALLBACK_PATH:
+            body = b"<html><body>Login complete</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif parsed.path == PROVIDER_PROFILE_PATH:
+            if self._inject("profile"):
+                return
+            token = self.headers.get("Authorization", "").replace("Bearer ", "", 1)
+            if not fake.is_valid("provider_tokens", token):
+                self._send_json(401, {"status": 401, "message": "Invalid provider token"})
+                return
+            self._send_json(200, {"status": 200, "data": fake.profile})
+        else:
+            self._send_json(404, {"status": 404, "message": "Not found"})
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        form = self._read_form()
+        fake = self.server.fake
+
+        if parsed.path == TOKEN_PATH:
+            if self._inject("token"):
+                return
+            if not fake.use_code(form.get("code", "")):
+                self._send_json(400, {"status": 400, "message": "Invalid authorization code"})
+                return
+            self._send_json(200, {"status": 200, "data": {
+                "access_token": fake.issue("access_tokens"),
+                "token_type": "Bearer",
+                "expires_in": fake.token_lifetime,
+            }})
+        elif parsed.path == PROVIDER_TOKEN_PATH:
+            if self._inject("provider_token"):
+                return
+            if not fake.is_valid("access_tokens", form.get("token", "")):
+                self._send_json(401, {"status": 401, "message": "Invalid Health ID token"})
+                return
+            self._send_json(200, {"status": 200, "data": {
+                "access_token": fake.issue("provider_tokens"),
+                "token_type": "Bearer",
+                "expires_in": fake.token_lifetime,
+            }})
+        else:
+            self._send_json(404, {"status": 404, "message": "Not found"})
+
+
+class FakeAuthServer:
+    """Threaded HTTP server imitating the Health ID and Provider ID APIs"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0, failure_rate=0.0,
+                 token_lifetime=3600, profile=None, verbose=False):
+        """
+        latency_ms is either one delay for every endpoint or a dict per
+        endpoint ("authorize", "token", "provider_token", "profile").
+        failure_rate is the probability (0-1) of answering with HTTP 500.
+        """
+        self.host = host
+        self.port = port
+        if isinstance(latency_ms, dict):
+            self.default_latency_ms = 0
+            self.latency_ms = dict(latency_ms)
+        else:
+            self.default_latency_ms = latency_ms
+            self.latency_ms = {}
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.token_lifetime = token_lifetime
+        self.profile = profile or DEFAULT_PROFILE
+        self.verbose = verbose
+
+        self._lock = threading.Lock()
+        self._issued = {"codes": {}, "access_tokens": {}, "provider_tokens": {}}
+        self.request_counts = {}
+        self.failure_counts = {}
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def auth_config(self):
+        """AUTH_CONFIG entries pointing the login flow at this server"""
+        return {
+            "AUTHORIZE_URL": self.base_url + AUTHORIZE_PATH,
+            "TOKEN_URL": self.base_url + TOKEN_PATH,
+            "PROVIDER_TOKEN_URL": self.base_url + PROVIDER_TOKEN_PATH,
+            "PROVIDER_PROFILE_URL": self.base_url + PROVIDER_PROFILE_PATH + "?position_type=1",
+            "REDIRECT_URI": self.base_url + CALLBACK_PATH,
+        }
+
+    def issue(self, kind):
+        """Issue a new code or token"""
+        value = secrets.token_urlsafe(24)
+        with self._lock:
+            self._issued[kind][value] = time.time() + self.token_lifetime
+        return value
+
+    def is_valid(self, kind, value):
+        """Return True if a token was issued and has not expired"""
+        with self._lock:
+            return self._issued[kind].get(value, 0) > time.time()
+
+    def use_code(self, code):
+        """Consume an authorization code (codes are single use)"""
+        with self._lock:
+            return self._issued["codes"].pop(code, 0) > time.time()
+
+    def record_request(self, endpoint):
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            self.failure_counts[endpoint] = self.failure_counts.get(endpoint, 0) + 1
+
+    def start(self):
+        """Start serving in a background thread; returns self"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _FakeAuthHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Health ID / Provider ID server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="delay per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="random +/- delay in ms")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of HTTP 500 (0-1)")
+    parser.add_argument("--token-lifetime", type=int, default=3600, help="token expires_in in seconds")
+    args = parser.parse_args()
+
+    server = FakeAuthServer(args.host, args.port, args.latency, args.jitter, args.failure_rate,
+                            args.token_lifetime, verbose=True).start()
+    print(f"Fake auth server listening on {server.base_url}")
+    print("AUTH_CONFIG overrides:")
+    print(json.dumps(server.auth_config(), indent=4))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
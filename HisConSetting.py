@@ -12,6 +12,8 @@ from PyQt6.QtCore import QThread, pyqtSignal, QTimer
 
 from HisConSetting_ui import HisConSetting_ui
 from AppSetting import app_settings
+from QueryGuard import (DEFAULT_STATEMENT_TIMEOUT, DEFAULT_ROW_LIMIT, DEFAULT_MAX_RESULT_MB,
+                        DEFAULT_MAX_CONCURRENT_QUERIES)
 
 # Database connection imports
 import pymysql
@@ -200,6 +202,10 @@ class HisConSetting(QDialog, HisConSetting_ui):
         connection_string = str(app_settings.get_value('connection_string', ''))
         use_conn_str_value = app_settings.get_value('use_connection_string', False)
         use_connection_string = use_conn_str_value == 'true' if isinstance(use_conn_str_value, str) else bool(use_conn_str_value)
+        statement_timeout = int(app_settings.get_value('statement_timeout', DEFAULT_STATEMENT_TIMEOUT))
+        row_limit = int(app_settings.get_value('row_limit', DEFAULT_ROW_LIMIT))
+        max_result_mb = int(app_settings.get_value('max_result_mb', DEFAULT_MAX_RESULT_MB))
+        max_concurrent_queries = int(app_settings.get_value('max_concurrent_queries', DEFAULT_MAX_CONCURRENT_QUERIES))
         
         # Set UI values
         self.host.setText(host)
@@ -211,6 +217,10 @@ class HisConSetting(QDialog, HisConSetting_ui):
         self.ssl.setChecked(ssl)
         self.connection_string.setText(connection_string)
         self.use_connection_string.setChecked(use_connection_string)
+        self.statement_timeout.setValue(statement_timeout)
+        self.row_limit.setValue(row_limit)
+        self.max_result_mb.setValue(max_result_mb)
+        self.max_concurrent_queries.setValue(max_concurrent_queries)
         
         # Set HIS name
         if his_name in ["HOSXP", "JHCIS", "Other"]:
@@ -256,6 +266,10 @@ class HisConSetting(QDialog, HisConSetting_ui):
         app_settings.set_value('ssl', self.ssl.isChecked())
         app_settings.set_value('connection_string', self.connection_string.text().strip())
         app_settings.set_value('use_connection_string', self.use_connection_string.isChecked())
+        app_settings.set_value('statement_timeout', self.statement_timeout.value())
+        app_settings.set_value('row_limit', self.row_limit.value())
+        app_settings.set_value('max_result_mb', self.max_result_mb.value())
+        app_settings.set_value('max_concurrent_queries', self.max_concurrent_queries.value())
         
         # Force sync to storage
         app_settings.sync()
@@ -278,6 +292,10 @@ class HisConSetting(QDialog, HisConSetting_ui):
         self.ssl.setChecked(False)
         self.connection_string.setText('')
         self.use_connection_string.setChecked(False)
+        self.statement_timeout.setValue(DEFAULT_STATEMENT_TIMEOUT)
+        self.row_limit.setValue(DEFAULT_ROW_LIMIT)
+        self.max_result_mb.setValue(DEFAULT_MAX_RESULT_MB)
+        self.max_concurrent_queries.setValue(DEFAULT_MAX_CONCURRENT_QUERIES)
         self.his_name.setCurrentText('HOSXP')
         self.db_system.setCurrentText('MySQL')
         
@@ -143,6 +143,42 @@ class HisConSetting_ui(object):
         self.ssl = QCheckBox("Use SSL/Secure Connection")
 
         adv_layout.addRow("SSL:", self.ssl)
+
+        # Query Guardrails group - limits applied to ad-hoc queries from the Query window
+        guard_group = QGroupBox("Query Guardrails")
+        guard_layout = QFormLayout(guard_group)
+
+        self.statement_timeout = QSpinBox()
+        self.statement_timeout.setRange(0, 86400)
+        self.statement_timeout.setValue(120)
+        self.statement_timeout.setSuffix(" s")
+        self.statement_timeout.setSpecialValueText("No timeout")
+        self.statement_timeout.setToolTip("The server aborts statements running longer than this")
+
+        self.row_limit = QSpinBox()
+        self.row_limit.setRange(0, 10000000)
+        self.row_limit.setSingleStep(1000)
+        self.row_limit.setValue(5000)
+        self.row_limit.setSpecialValueText("No limit")
+        self.row_limit.setToolTip("LIMIT added to SELECT queries without one (Fetch All lifts it)")
+
+        self.max_result_mb = QSpinBox()
+        self.max_result_mb.setRange(0, 65536)
+        self.max_result_mb.setValue(256)
+        self.max_result_mb.setSuffix(" MB")
+        self.max_result_mb.setSpecialValueText("No cap")
+        self.max_result_mb.setToolTip("Fetching stops once the loaded rows take this much memory")
+
+        self.max_concurrent_queries = QSpinBox()
+        self.max_concurrent_queries.setRange(0, 50)
+        self.max_concurrent_queries.setValue(3)
+        self.max_concurrent_queries.setSpecialValueText("No limit")
+        self.max_concurrent_queries.setToolTip("Queries running at once on this server from all Query tabs")
+
+        guard_layout.addRow("Statement Timeout:", self.statement_timeout)
+        guard_layout.addRow("Row Limit:", self.row_limit)
+        guard_layout.addRow("Max Result Size:", self.max_result_mb)
+        guard_layout.addRow("Concurrent Queries:", self.max_concurrent_queries)
         
         # Connect signals for dynamic updates
         self.his_name.currentTextChanged.connect(self.on_his_name_changed)
@@ -152,6 +188,7 @@ class HisConSetting_ui(object):
         parent_layout.addWidget(system_group)
         parent_layout.addWidget(conn_group)
         parent_layout.addWidget(adv_group)
+        parent_layout.addWidget(guard_group)
 
     def on_his_name_changed(self, his_name):
         """Handle HIS name selection change"""
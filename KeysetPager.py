@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Keyset pagination engine for the HIS management tables.
+Pages are read with "WHERE key > :last_key ORDER BY key LIMIT n" so every
+page costs the same regardless of how deep the user has paged, the next
+page is prefetched in the background and recent pages are kept in a
+bounded LRU for instant back-navigation. The cached pages are dropped when
+TableChangeMonitor sees the table change.
+
+using by
+from KeysetPager import KeysetPager
+"""
+import threading
+from collections import OrderedDict
+
+
+class KeysetPager:
+    """Pages through one table ordered by a unique key column"""
+
+    PAGE_SIZE = 100
+    MAX_CACHED_PAGES = 20
+    STREAM_BATCH_SIZE = 50
+
+    def __init__(self, db, columns, table, key_column, page_size=None, max_cached_pages=None):
+        """
+        db is a DbPerform instance. columns is the select list shown in the
+        table (e.g. "housecode as house_id, address"), table the source table
+        and key_column a unique, indexed column used for ordering. Without a
+        key_column (no unique key known) only the first page is read.
+        """
+        self.db = db
+        self.columns = columns
+        self.table = table
+        self.key_column = key_column
+        self.page_size = page_size or self.PAGE_SIZE
+        self.max_cached_pages = max_cached_pages or self.MAX_CACHED_PAGES
+
+        # _page_after_keys[n] is the key the n-th page starts after (None for the first page)
+        self._page_after_keys = {0: None}
+        self._last_page = None
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._prefetching = set()
+        # {table: change token} when the first page was read (None if not tracked)
+        self.table_versions = None
+
+    def probe_query(self):
+        """Return a query referencing every table column the pager needs"""
+        if self.key_column is None:
+            return f"SELECT {self.columns} FROM {self.table}"
+        return f"SELECT {self.key_column}, {self.columns} FROM {self.table}"
+
+    def _page_query(self, after_key):
+        """Build the keyset query for the page after after_key"""
+        if self.key_column is None:
+            return f"SELECT {self.columns} FROM {self.table} LIMIT {int(self.page_size)}"
+        # The key is selected first so the next page can start after it; it is
+        # stripped before the rows are returned
+        query = f"SELECT {self.key_column} AS page_key, {self.columns} FROM {self.table}"
+        if after_key is not None:
+            query += f" WHERE {self.key_column} > :after_key"
+        query += f" ORDER BY {self.key_column} LIMIT {int(self.page_size)}"
+        return query
+
+    def cached_page(self, page_number):
+        """Return the rows of a cached page (marking it recently used), or None"""
+        with self._lock:
+            rows = self._pages.get(page_number)
+            if rows is not None:
+                self._pages.move_to_end(page_number)
+            return rows
+
+    def _store_page(self, page_number, rows):
+        """Put a page in the LRU cache, evicting the least recently used pages"""
+        with self._lock:
+            self._pages[page_number] = rows
+            self._pages.move_to_end(page_number)
+            while len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+
+    def invalidate(self):
+        """Drop the cached pages after the table changed (known page boundaries stay valid keys)"""
+        with self._lock:
+            self._pages.clear()
+            if self.key_column is not None:
+                self._last_page = None
+
+    def is_last_page(self, page_number):
+        """Return True if page_number is known to be the last page"""
+        return self._last_page is not None and page_number >= self._last_page
+
+    def fetch_page(self, page_number, on_batch=None):
+        """
+        Return the rows of a page, reading it from the database if needed.
+
+        on_batch(rows) is called for each batch as the page streams in, so a
+        caller can show the rows progressively. Pages before page_number
+        that were never visited are read first to learn their last key.
+        Raises on database errors. Thread-safe.
+        """
+        rows = self.cached_page(page_number)
+        if rows is not None:
+            if on_batch is not None and rows:
+                on_batch(rows)
+            return rows
+
+        with self._fetch_lock:
+            # Another thread (e.g. a prefetch) may have read it meanwhile
+            rows = self.cached_page(page_number)
+            if rows is not None:
+                if on_batch is not None and rows:
+                    on_batch(rows)
+                return rows
+
+            # Walk forward from the furthest known page boundary
+            current = max(page for page in self._page_after_keys if page <= page_number)
+            while current < page_number:
+                self._read_page(current, None)
+                if self.is_last_page(current):
+                    return []
+                current += 1
+            return self._read_page(page_number, on_batch)
+
+    def _read_page(self, page_number, on_batch):
+        """Read one page from the database and record where the next page starts"""
+        after_key = self._page_after_keys[page_number]
+        params = {'after_key': after_key} if after_key is not None else None
+
+        # Rows start with the paging key unless there is none
+        skip = 0 if self.key_column is None else 1
+        keyed_rows = []
+        for batch in self.db.stream_query(self._page_query(after_key), params, batch_size=self.STREAM_BATCH_SIZE):
+            keyed_rows.extend(batch)
+            if on_batch is not None:
+                on_batch([row[skip:] for row in batch])
+
+        rows = [row[skip:] for row in keyed_rows]
+        if self.key_column is None or len(keyed_rows) < self.page_size:
+            self._last_page = page_number
+        elif keyed_rows:
+            self._page_after_keys[page_number + 1] = keyed_rows[-1][0]
+
+        self._store_page(page_number, rows)
+        return rows
+
+    def prefetch(self, page_number):
+        """Read a page in a background thread if it is not cached yet"""
+        if page_number < 0 or self.is_last_page(page_number - 1) or self.cached_page(page_number) is not None:
+            return
+        with self._lock:
+            if page_number in self._prefetching:
+                return
+            self._prefetching.add(page_number)
+
+        def run():
+            try:
+                self.fetch_page(page_number)
+            except Exception as e:
+                print(f"Prefetch of page {page_number + 1} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._prefetching.discard(page_number)
+
+        threading.Thread(target=run, daemon=True).start()
@@ -1,16 +1,66 @@
 import sys
-import json
 import os
+import time
 from urllib.parse import urlparse, parse_qs
 
-import requests
+# Imported first so the startup profiler (when enabled) also times the imports below
+from StartupProfiler import startup_profiler
+
 from PyQt6.QtWidgets import QWidget, QApplication, QMessageBox
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import pyqtSignal, QTimer, QUrl
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtCore import pyqtSignal, QTimer, QUrl, QThread, Qt, QEvent
 
 from config_auth import AUTH_CONFIG
+from AppSetting import app_settings
 from Login_ui import Login_ui
+from AuthClient import AuthClient, CredentialRefreshWorker, get_endpoint
+from CredentialCache import credential_cache
+
+
+# Progress message shown when each login step completes
+AUTH_STEP_MESSAGES = {
+    2: "ขั้นตอนที่ 2: ได้รับ Access Token แล้ว กำลังเชื่อมต่อ Provider...",
+    3: "ขั้นตอนที่ 3: ได้รับ Provider Token แล้ว กำลังทำการตรวจสอบข้อมูลผู้ให้บริการ...",
+    4: "ขั้นตอนที่ 4: ได้รับข้อมูลโปรไฟล์แล้ว กำลังเตรียมระบบ...",
+}
+AUTH_STEP_NAMES = {2: "token", 3: "provider token", 4: "provider profile"}
+
+# Retry a credential refresh that failed for network reasons after this delay
+REFRESH_RETRY_MS = 60 * 1000
+
+
+class LoginAuthWorker(QThread):
+    """Worker thread for the moph.id.th -> provider.id.th token and profile requests"""
+
+    # Signals
+    step_completed = pyqtSignal(int, float)  # step number, latency in seconds
+    auth_succeeded = pyqtSignal(dict)  # credential cache entry (tokens and provider profile)
+    auth_failed = pyqtSignal(str)  # error message
+
+    def __init__(self, auth_code, client):
+        super().__init__()
+        self.auth_code = auth_code
+        self.client = client
+        self.step_timings = {}
+
+    def run(self):
+        """Run the three requests back to back on the shared session"""
+        try:
+            access_data = self._timed(2, self.client.exchange_code_for_token, self.auth_code)
+            provider_data = self._timed(3, self.client.get_provider_token, access_data.get("access_token"))
+            profile_data = self._timed(4, self.client.get_provider_profile, provider_data.get("access_token"))
+            self.auth_succeeded.emit(credential_cache.create_entry(access_data, provider_data, profile_data or {}))
+        except Exception as e:
+            self.auth_failed.emit(str(e))
+
+    def _timed(self, step, request_func, *args):
+        """Run one step and report its latency"""
+        start_time = time.perf_counter()
+        result = request_func(*args)
+        seconds = time.perf_counter() - start_time
+        self.step_timings[step] = seconds
+        self.step_completed.emit(step, seconds)
+        return result
 
 
 class Login(QWidget, Login_ui):
@@ -19,10 +69,13 @@ class Login(QWidget, Login_ui):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setupUi(self)
+        # The QWebEngineView is created later, only if the OAuth page is needed
+        with startup_profiler.phase("login.setupUi"):
+            self.setupUi(self)
         
         # Set application icon
-        self.set_application_icon()
+        with startup_profiler.phase("login.set_application_icon"):
+            self.set_application_icon()
 
         # Fixed username for dummy login
         self.username = "doctor001"
@@ -31,20 +84,30 @@ class Login(QWidget, Login_ui):
         self.auth_code = None
         self.hash_cid = None
 
+        # One keep-alive HTTP session for all login requests
+        self.auth_client = AuthClient()
+        self.auth_worker = None
+        self.auth_step_timings = {}
+
+        # Cached credentials and their background revalidation
+        self.credentials = None
+        self.refresh_worker = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.refresh_credentials)
+        QApplication.instance().aboutToQuit.connect(self.wait_for_workers)
+
         # Connect button signals
         self.btn_start_main_window.clicked.connect(
             self.start_main_form
-        )  # Connect web view URL changes
-        self.web_view.urlChanged.connect(self.on_url_changed)
-
-        # Connect to handle webview resize for better fitting
-        self.web_view.loadFinished.connect(self.adjust_zoom_to_fit)
-
-        # Connect to update status when page loads
-        self.web_view.loadFinished.connect(
-            self.on_page_loaded
-        )        # Load initial OAuth URL
-        self.load_initial_url()
+        )
+        # Reuse a still valid login; otherwise load the initial OAuth URL
+        cached_entry = credential_cache.load_last()
+        if cached_entry:
+            self.show_cached_login(cached_entry)
+        else:
+            with startup_profiler.phase("login.load_initial_url"):
+                self.load_initial_url()
 
     def set_application_icon(self):
         """
@@ -96,9 +159,59 @@ class Login(QWidget, Login_ui):
         
         return QIcon(pixmap)
 
+    def ensure_web_view(self):
+        """Create the web view (importing QtWebEngine) on first use"""
+        if self.web_view is not None:
+            return self.web_view
+        with startup_profiler.phase("login.create_web_view"):
+            self.create_web_view(self)
+
+        # Connect web view URL changes
+        self.web_view.urlChanged.connect(self.on_url_changed)
+
+        # Connect to handle webview resize for better fitting
+        self.web_view.loadFinished.connect(self.adjust_zoom_to_fit)
+
+        # Connect to update status when page loads
+        self.web_view.loadFinished.connect(
+            self.on_page_loaded
+        )
+        return self.web_view
+
+    def release_web_engine(self):
+        """
+        Delete the web view, its page and its profile so the Chromium
+        renderer and GPU processes exit instead of living on with Main.
+        """
+        if self.web_view is None:
+            return
+        web_view, page, profile = self.web_view, self.web_view.page(), self.web_profile
+        self.web_view = None
+        self.web_profile = None
+
+        web_view.urlChanged.disconnect(self.on_url_changed)
+        web_view.loadFinished.disconnect()
+        web_view.stop()
+        self.panel1_layout.removeWidget(web_view)
+        web_view.hide()
+
+        # The page must be deleted before its profile
+        page.deleteLater()
+        web_view.deleteLater()
+        if profile is not None:
+            profile.deleteLater()
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        print("QtWebEngine view and profile released")
+
+    def should_release_web_engine(self):
+        """Return True unless the "release_web_engine" setting turns the teardown off"""
+        value = app_settings.get_value('release_web_engine', True)
+        return value == 'true' if isinstance(value, str) else bool(value)
+
     def load_initial_url(self):
         """Load the initial OAuth URL"""
-        initial_url = f"https://moph.id.th/oauth/redirect?client_id={AUTH_CONFIG['HEALTH_CLIENT_ID']}&redirect_uri={AUTH_CONFIG['REDIRECT_URI']}&response_type=code"
+        self.ensure_web_view()
+        initial_url = f"{get_endpoint('AUTHORIZE_URL')}?client_id={AUTH_CONFIG['HEALTH_CLIENT_ID']}&redirect_uri={AUTH_CONFIG['REDIRECT_URI']}&response_type=code"
         self.web_view.setUrl(QUrl(initial_url))
 
         # Set up webview for better display
@@ -185,14 +298,19 @@ class Login(QWidget, Login_ui):
         # Store auth code
         self.auth_code = auth_code
 
+        # The OAuth page is no longer needed; release it once the urlChanged
+        # emission that brought us here has returned
+        if self.should_release_web_engine():
+            QTimer.singleShot(0, self.release_web_engine)
+
         # Update progress status label - append first step
         self.append_progress_step("ขั้นตอนที่ 1: ได้รับ Authorization Code แล้ว กำลังดำเนินการ...")
         
         # Update status
         # Status updates are now shown in label_progress_login_status
 
-        # ขั้นตอนที่ 2: แลก authorization code เป็น access token (หน่วงเวลาเล็กน้อย)
-        QTimer.singleShot(1000, lambda: self.exchange_code_for_token(auth_code))
+        # ขั้นตอนที่ 2-4: แลก token และดึงโปรไฟล์ใน background thread (UI ไม่ค้าง)
+        self.start_auth_worker(auth_code)
 
     def append_progress_step(self, step_text, style_color="#0984e3", border_color="#e9ecef"):
         """Append a new step to the progress label with new line"""
@@ -242,166 +360,174 @@ class Login(QWidget, Login_ui):
             }}
         """)
 
-    def exchange_code_for_token(self, auth_code):
-        """Exchange authorization code for access token (ขั้นตอนที่ 2)"""
-        client_id = AUTH_CONFIG["HEALTH_CLIENT_ID"]
-        client_secret = AUTH_CONFIG["HEALTH_CLIENT_SECRET"]
-        redirect_uri = AUTH_CONFIG["REDIRECT_URI"]
-
-        if not all([client_id, client_secret, redirect_uri]):
-            print("Missing required configuration variables")
-            return None
-
-        # Token endpoint URL
-        token_url = "https://moph.id.th/api/v1/token"
-
-        # ข้อมูลสำหรับขอ access token
-        token_data = {
-            "grant_type": "authorization_code",
-            "code": auth_code,
-            "redirect_uri": redirect_uri,
-            "client_id": client_id,
-            "client_secret": client_secret,
-        }
-
-        # Headers
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json",
-        }
-
-        # แสดงข้อมูลที่จะส่ง (สำหรับ debug)
-        print(f"Token URL: {token_url}")
-        print(f"Request Data: {token_data}")
-        print(f"Headers: {headers}")        # ส่ง request ขอ access token
+    def start_auth_worker(self, auth_code):
+        """Run the token exchange and profile requests (steps 2-4) in a background thread"""
+        if self.auth_worker is not None and self.auth_worker.isRunning():
+            return
+        startup_profiler.mark("login.auth_code_received")
         self.append_progress_step("ขั้นตอนที่ 2: กำลังขอ Access Token...")
 
-        try:
-            response = requests.post(
-                token_url, data=token_data, headers=headers, timeout=30
-            )
-
-            # แสดงข้อมูล response แบบละเอียด
-            print(f"Response Status Code: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
-            print(f"Response Text: {response.text}")
-
-            if response.status_code == 200:
-                token_response = response.json()
-                print(f"Token Response: {json.dumps(token_response, indent=2)}")
-                access_token = token_response.get("data").get("access_token")
-                print("Access Token :", access_token)
-                self.append_progress_step("ขั้นตอนที่ 2: ได้รับ Access Token แล้ว กำลังเชื่อมต่อ Provider...")
-                QTimer.singleShot(1000, lambda: self.get_provider_token(access_token))
-            else:
-                print(f"Token exchange failed: {response.text}")
-
-        except Exception as e:
-            print(f"Error during token exchange: {str(e)}")
-
-    def get_provider_token(self, access_token):
-        """Get provider token from Health ID service (ขั้นตอนที่ 3)"""
-        provider_token_url = "https://provider.id.th/api/v1/services/token"
-
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json",
-        }
-
-        body = {
-            "client_id": AUTH_CONFIG["PROVIDER_CLIENT_ID"],
-            "secret_key": AUTH_CONFIG["PROVIDER_CLIENT_SECRET"],
-            "token_by": "Health ID",
-            "token": access_token,
-        }
-        print("get provider token body", body)
-
-        try:
-            response = requests.post(provider_token_url, headers=headers, data=body)
-
-            if response.status_code == 200:
-                print("Provider Token Response:", response.json())
-                provider_token = response.json().get("data").get("access_token")
-                self.append_progress_step(
-                    "ขั้นตอนที่ 3: กำลังทำการตรวจสอบข้อมูลผู้ให้บริการ..."
-                )
-
-                QTimer.singleShot(
-                    1000, lambda: self.get_provider_profile(provider_token)
-                )
-            else:
-                print("Error getting provider token:", response.text)
-
-        except Exception as e:
-            print(f"Error getting provider token: {str(e)}")
-
-    def get_provider_profile(self, provider_access_token):
-        """Get provider profile from Provider ID service (ขั้นตอนที่ 4)"""
-        url = f"https://provider.id.th/api/v1/services/profile?position_type=1"
-        headers = {
-            "client-id": AUTH_CONFIG["PROVIDER_CLIENT_ID"],
-            "secret-key": AUTH_CONFIG["PROVIDER_CLIENT_SECRET"],
-            "Authorization": f"Bearer {provider_access_token}",
-        }
-
-        try:
-            response = requests.get(url, headers=headers)
-            print("Provider Profile Response:", response.json())
-
-            if response.status_code == 200:
-                profile_data = response.json().get("data")
-                if profile_data:
-                    title_th = profile_data.get("title_th")
-                    name_th = profile_data.get("name_th")
-                    hash_cid = profile_data.get("hash_cid")
-                    self.hash_cid = hash_cid  # Store hash_cid
-                    organization = profile_data.get("organization")
-                    org = organization[0] if organization else None
-
-                    hcode = org.get("hcode") if org else None
-                    position = org.get("position") if org else None
-                    organization_name = (
-                        org.get("hname_th") if org else None
-                    )  # Update username with real data
-                    self.username = f"{title_th}{name_th}"                    # Add step 4 progress first
-                    self.append_progress_step("ขั้นตอนที่ 4: ได้รับข้อมูลโปรไฟล์แล้ว กำลังเตรียมระบบ...")
-                    
-                    # Then show final success message
-                    self.set_progress_final(
-                        f"🎉 เข้าสู่ระบบสำเร็จ!\n\n{title_th}{name_th}\nตำแหน่ง: {position}\nหน่วยงาน: ({hcode}) {organization_name}"
-                    )
-
-                    # Update status bar
-
-                    # Show the start button only after getting hash_cid
-                    self.btn_start_main_window.setVisible(True)
-                else:
-                    QMessageBox.warning(self, "ข้อผิดพลาด", "ไม่พบข้อมูลโปรไฟล์ผู้ให้บริการ")
-            else:
-                print("Error getting provider profile:", response.text)
-
-        except Exception as e:
-            print(f"Error getting provider profile: {str(e)}")
+        self.auth_worker = LoginAuthWorker(auth_code, self.auth_client)
+        self.auth_worker.step_completed.connect(self.on_auth_step_completed)
+        self.auth_worker.auth_succeeded.connect(self.on_auth_succeeded)
+        self.auth_worker.auth_failed.connect(self.on_auth_failed)
+        self.auth_worker.start()
+
+    def on_auth_step_completed(self, step, seconds):
+        """Show the progress of one login step with its latency"""
+        self.auth_step_timings[step] = seconds
+        message = AUTH_STEP_MESSAGES.get(step)
+        if message:
+            self.append_progress_step(f"{message} ({seconds:.2f}s)")
+
+    def on_auth_succeeded(self, entry):
+        """Show the provider profile (ขั้นตอนที่ 4), cache the login and enable the start button"""
+        startup_profiler.mark("login.profile_received")
+        self.print_auth_timings()
+
+        if not entry.get("profile"):
+            QMessageBox.warning(self, "ข้อผิดพลาด", "ไม่พบข้อมูลโปรไฟล์ผู้ให้บริการ")
+            return
+
+        self.credentials = entry
+        credential_cache.save(entry)
+        self.schedule_refresh()
+        self.show_profile(entry["profile"])
+
+    def show_profile(self, profile_data, cached=False):
+        """Show the provider profile and the start button"""
+        title_th = profile_data.get("title_th")
+        name_th = profile_data.get("name_th")
+        hash_cid = profile_data.get("hash_cid")
+        self.hash_cid = hash_cid  # Store hash_cid
+        organization = profile_data.get("organization")
+        org = organization[0] if organization else None
+
+        hcode = org.get("hcode") if org else None
+        position = org.get("position") if org else None
+        organization_name = (
+            org.get("hname_th") if org else None
+        )  # Update username with real data
+        self.username = f"{title_th}{name_th}"
+
+        # Show final success message
+        heading = "🔑 เข้าสู่ระบบด้วยข้อมูลที่บันทึกไว้" if cached else "🎉 เข้าสู่ระบบสำเร็จ!"
+        self.set_progress_final(
+            f"{heading}\n\n{title_th}{name_th}\nตำแหน่ง: {position}\nหน่วยงาน: ({hcode}) {organization_name}"
+        )
+
+        # Show the start button only after getting hash_cid
+        self.btn_start_main_window.setVisible(True)
+
+    def show_cached_login(self, entry):
+        """Skip the OAuth page and offer to start Main with the cached identity"""
+        print("Using cached login credentials")
+        self.credentials = entry
+        self.panel1.setVisible(False)
+        self.panel2.setVisible(True)
+        self.show_profile(entry["profile"], cached=True)
+
+        # Revalidate in the background; Main can be started meanwhile
+        self.refresh_credentials()
+
+    def schedule_refresh(self):
+        """Refresh the provider token shortly before it expires"""
+        if self.credentials is None or not credential_cache.can_refresh(self.credentials):
+            return
+        delay = credential_cache.seconds_until_refresh(self.credentials)
+        # QTimer intervals are limited to about 24 days
+        self.refresh_timer.start(int(min(delay, 24 * 3600) * 1000))
+
+    def refresh_credentials(self):
+        """Renew the provider token and profile of the current credentials in the background"""
+        if self.credentials is None or (self.refresh_worker is not None and self.refresh_worker.isRunning()):
+            return
+        self.refresh_worker = CredentialRefreshWorker(self.credentials, self.auth_client)
+        self.refresh_worker.refresh_succeeded.connect(self.on_refresh_succeeded)
+        self.refresh_worker.refresh_failed.connect(self.on_refresh_failed)
+        self.refresh_worker.start()
+
+    def on_refresh_succeeded(self, entry):
+        """Store the renewed credentials"""
+        print(f"Login credentials revalidated in {self.refresh_worker.refresh_time * 1000:.0f} ms")
+        self.credentials = entry
+        self.username = f"{entry['profile'].get('title_th')}{entry['profile'].get('name_th')}"
+        credential_cache.save(entry)
+        self.schedule_refresh()
+
+    def on_refresh_failed(self, message, invalid):
+        """Drop rejected credentials; keep them (and retry later) on network errors"""
+        print(f"Credential refresh failed: {message}")
+        if self.credentials is None:
+            return
+        if not invalid:
+            self.refresh_timer.start(REFRESH_RETRY_MS)
+            return
+
+        credential_cache.remove(self.credentials["hash_cid"])
+        self.credentials = None
+        if self.main_window is not None:
+            # Main is already running with the cached identity - log in again next launch
+            self.main_window.statusbar.showMessage("Login session expired - please log in again on next start")
+        else:
+            # Back to the OAuth page
+            self.btn_start_main_window.setVisible(False)
+            self.hash_cid = None
+            self.set_progress_final("")
+            self.panel2.setVisible(False)
+            self.panel1.setVisible(True)
+            self.load_initial_url()
+
+    def on_auth_failed(self, message):
+        """Show a failed login step"""
+        print(f"Login failed: {message}")
+        self.print_auth_timings()
+        self.append_progress_step(f"❌ เข้าสู่ระบบไม่สำเร็จ: {message}", "#d63031", "#d63031")
+
+    def print_auth_timings(self):
+        """Print the latency of each login step"""
+        timings = ", ".join(f"{AUTH_STEP_NAMES.get(step, step)} {seconds * 1000:.0f} ms"
+                            for step, seconds in sorted(self.auth_step_timings.items()))
+        total = sum(self.auth_step_timings.values())
+        print(f"Login step latency: {timings} (total {total * 1000:.0f} ms)")
+
+    def wait_for_workers(self):
+        """Let running login and refresh requests finish before the application exits"""
+        for worker in (self.auth_worker, self.refresh_worker):
+            if worker is not None and worker.isRunning():
+                worker.wait()
 
     def start_main_form(self):
         """Close the login form and start the main application form."""
         print("Attempting to start MainForm...")
 
         # Import Main here to avoid circular imports
-        from Main import Main
+        with startup_profiler.phase("main.import"):
+            from Main import Main
 
         # Create Main instance with  hash_cid passed at constructor
-        self.main_window = Main(hash_cid=self.hash_cid)
+        with startup_profiler.phase("main.create"):
+            self.main_window = Main(hash_cid=self.hash_cid)
         # Show main window
-        self.main_window.show()
+        with startup_profiler.phase("main.show"):
+            self.main_window.show()
 
         # Close the login window
         self.close()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setApplicationName("Hospital Management System")
-    window = Login()
-    window.show()
+    startup_profiler.mark("login.imports_done")
+    # QtWebEngine is imported after the QApplication exists (and only when the
+    # OAuth page is shown), which requires shared OpenGL contexts
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    with startup_profiler.phase("login.qapplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName("Hospital Management System")
+    with startup_profiler.phase("login.create"):
+        window = Login()
+    with startup_profiler.phase("login.show"):
+        window.show()
+    # The first event loop iteration after show is when the window responds
+    QTimer.singleShot(0, lambda: startup_profiler.mark("login.interactive"))
     sys.exit(app.exec())
@@ -7,16 +7,14 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QApplication,
 )
-from PyQt6.QtCore import Qt, QUrl
-from PyQt6.QtGui import QFont
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-
-from config_auth import AUTH_CONFIG
+from PyQt6.QtCore import Qt
 
 
 class Login_ui(object):
     """
     UI class for Login window with WebEngine support.
+    QtWebEngine is imported only when create_web_view() is called, so a
+    login from cached credentials never starts Chromium.
     """
 
     def setupUi(self, Login_ui):
@@ -34,23 +32,17 @@ class Login_ui(object):
 
         # Panel 1: WebView Panel (for OAuth/web authentication)
         self.panel1 = QWidget()
-        panel1_layout = QVBoxLayout(self.panel1)
+        self.panel1_layout = QVBoxLayout(self.panel1)
         # Calculate margins for 95% width (2.5% on each side)
         screen = QApplication.primaryScreen()
         screen_width = int(screen.availableGeometry().width() * 0.8)  # Window is 80% of screen
         margin_x = int(screen_width * 0.025)  # 2.5% margin for 95% content width
-        panel1_layout.setContentsMargins(margin_x, 10, margin_x, 10)
-        panel1_layout.setSpacing(0)
+        self.panel1_layout.setContentsMargins(margin_x, 10, margin_x, 10)
+        self.panel1_layout.setSpacing(0)
 
-        # Web view - 95% of parent width, centered
-        self.web_view = QWebEngineView()
-        self.web_view.setStyleSheet("""
-            QWebEngineView { 
-                border: 1px solid #dfe6e9; 
-                border-radius: 8px;
-            }
-        """)
-        panel1_layout.addWidget(self.web_view, 1)  # stretch factor = 1 for full area
+        # Web view and its profile are created on demand by create_web_view()
+        self.web_view = None
+        self.web_profile = None
         
         # Panel 2: Progress Status and Button Panel (single column)
         self.panel2 = QWidget()
@@ -119,6 +111,29 @@ class Login_ui(object):
         # Apply main window styles
         self.set_ui_styles(Login_ui)
 
+    def create_web_view(self, parent):
+        """
+        Create the OAuth web view with its own off-the-record profile.
+        """
+        from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+        # A private profile (instead of the shared default one) can be deleted
+        # after login, which shuts down the Chromium processes
+        self.web_profile = QWebEngineProfile(parent)
+
+        # Web view - 95% of parent width, centered
+        self.web_view = QWebEngineView()
+        self.web_view.setPage(QWebEnginePage(self.web_profile, self.web_view))
+        self.web_view.setStyleSheet("""
+            QWebEngineView { 
+                border: 1px solid #dfe6e9; 
+                border-radius: 8px;
+            }
+        """)
+        self.panel1_layout.addWidget(self.web_view, 1)  # stretch factor = 1 for full area
+        return self.web_view
+
     def set_ui_styles(self, Login_ui):
         """Set the UI style for the main window and all components"""
         Login_ui.setStyleSheet(
@@ -1,28 +1,54 @@
 import sys
 import os
+import time
+
+# Imported first so the startup profiler (when enabled) also times the imports below
+from StartupProfiler import startup_profiler
 
 from PyQt6.QtWidgets import QMainWindow, QMdiSubWindow, QTextEdit, QApplication, QDialog, QDialog
 from PyQt6.QtGui import QAction, QShortcut, QKeySequence, QIcon
 from PyQt6.QtCore import QTimer
 
 from Main_ui import Main_ui
-from About import About
-from House import House
-from Patient import Patient
-from Person import Person
-from Visit import Visit
-from Query import Query
-from HisConSetting import HisConSetting
+from AppSetting import app_settings
+from ModuleRegistry import ModuleRegistry, PrewarmWorker
+
+
+# Modules opened from the toolbar and menus are imported on first use, so
+# startup does not pay for the database drivers they pull in:
+# key -> (module name, attribute)
+LAZY_MODULES = {
+    "house": ("House", "House"),
+    "patient": ("Patient", "Patient"),
+    "person": ("Person", "Person"),
+    "visit": ("Visit", "Visit"),
+    "query": ("QueryWorkspace", "QueryWorkspace"),
+    "settings": ("HisConSetting", "HisConSetting"),
+    "db_engines": ("DbEngine", "db_engines"),
+    "about": ("About", "About"),
+}
+
+# Delay after the main window is shown before pre-warming the lazy modules
+PREWARM_DELAY_MS = 500
 
 
 class Main(QMainWindow, Main_ui):
     def __init__(self, parent=None, username=None, hash_cid=None):
+        self.startup_start_time = time.perf_counter()
         super().__init__(parent)
-        self.setupUi(self)
+        # Includes painting the toolbar icons (create_icon_from_text)
+        with startup_profiler.phase("main.setupUi"):
+            self.setupUi(self)
         print("Main hash_cid:", hash_cid)
 
+        # Lazily imported modules and the startup report
+        self.modules = ModuleRegistry(LAZY_MODULES)
+        self.startup_ready_time = None
+        self.prewarm_worker = None
+
         # Set custom application icon
-        self.set_application_icon()
+        with startup_profiler.phase("main.set_application_icon"):
+            self.set_application_icon()
 
         # Track open windows
         self.open_windows = {}
@@ -54,6 +80,62 @@ class Main(QMainWindow, Main_ui):
         self.cancel_timer_shortcut = QShortcut(QKeySequence("Ctrl+K"), self)
         self.cancel_timer_shortcut.activated.connect(self.cancel_auto_quit)
 
+    def showEvent(self, event):
+        """Record startup time and schedule the module pre-warm when first shown"""
+        super().showEvent(event)
+        if self.startup_ready_time is not None:
+            return
+
+        self.startup_ready_time = time.perf_counter() - self.startup_start_time
+        print(f"Startup: Main window ready in {self.startup_ready_time * 1000:.0f} ms")
+        startup_profiler.mark("main.shown")
+        QTimer.singleShot(0, self.on_startup_interactive)
+
+        # Pre-warming can be turned off with the "prewarm_modules" setting
+        prewarm_value = app_settings.get_value('prewarm_modules', True)
+        prewarm = prewarm_value == 'true' if isinstance(prewarm_value, str) else bool(prewarm_value)
+        if prewarm:
+            QTimer.singleShot(PREWARM_DELAY_MS, self.start_prewarm)
+
+    def on_startup_interactive(self):
+        """Called on the first event loop iteration after the window is shown"""
+        startup_profiler.mark("main.interactive")
+        startup_profiler.finish()
+
+    def start_prewarm(self):
+        """Import the lazy modules in the background so first use is instant"""
+        if self.prewarm_worker is not None:
+            return
+        self.prewarm_worker = PrewarmWorker(self.modules)
+        self.prewarm_worker.prewarm_finished.connect(self.on_prewarm_finished)
+        self.prewarm_worker.start()
+
+    def on_prewarm_finished(self, total_time):
+        """Report the startup time saved by loading the modules lazily"""
+        print(self.get_startup_report())
+
+    def get_startup_report(self):
+        """Return a text report of startup time and the module imports kept out of it"""
+        lines = []
+        if self.startup_ready_time is not None:
+            lines.append(f"Startup report: Main window ready in {self.startup_ready_time * 1000:.0f} ms")
+        else:
+            lines.append("Startup report: Main window not shown yet")
+
+        load_times = self.modules.load_times()
+        for key, load_time in sorted(load_times.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"  {key}: {load_time * 1000:.0f} ms (loaded lazily)")
+        saved_time = sum(load_times.values())
+        lines.append(f"  Saved at startup: {saved_time * 1000:.0f} ms")
+        return "\n".join(lines)
+
+    def closeEvent(self, event):
+        """Handle window close event - wait for a running pre-warm"""
+        if self.prewarm_worker is not None and self.prewarm_worker.isRunning():
+            self.prewarm_worker.cancel()
+            self.prewarm_worker.wait()
+        super().closeEvent(event)
+
     def set_application_icon(self):
         """
         Set custom application icon with Finding Data theme.
@@ -174,6 +256,7 @@ class Main(QMainWindow, Main_ui):
         """
         Show the About dialog as a child window.
         """
+        About = self.modules.get("about")
         about_dialog = About(self)
         about_dialog.exec()
 
@@ -181,25 +264,25 @@ class Main(QMainWindow, Main_ui):
         """
         Show the House management view.
         """
-        self.show_window_single_instance("house", "House Management", House)
+        self.show_window_single_instance("house", "House Management", self.modules.get("house"))
 
     def show_person(self):
         """
         Show the Person management view.
         """
-        self.show_window_single_instance("person", "Person Management", Person)
+        self.show_window_single_instance("person", "Person Management", self.modules.get("person"))
 
     def show_patient(self):
         """
         Show the Patient management view.
         """
-        self.show_window_single_instance("patient", "Patient Management", Patient)
+        self.show_window_single_instance("patient", "Patient Management", self.modules.get("patient"))
 
     def show_visit(self):
         """
         Show the Visit management view.
         """
-        self.show_window_single_instance("visit", "Visit Management", Visit)
+        self.show_window_single_instance("visit", "Visit Management", self.modules.get("visit"))
 
     def show_appoint(self):
         """
@@ -221,17 +304,19 @@ class Main(QMainWindow, Main_ui):
         """
         Show the Database Query tool.
         """
-        self.show_window_single_instance("query", "Database Query Tool", Query)
+        self.show_window_single_instance("query", "Database Query Tool", self.modules.get("query"))
 
     def show_settings(self):
         """
         Show the HIS Database Connection Settings dialog.
         """
+        HisConSetting = self.modules.get("settings")
         settings_dialog = HisConSetting(self)
         result = settings_dialog.exec()
         
         if result == QDialog.DialogCode.Accepted:
-            # Settings were saved, you might want to update connections or notify other components
+            # Settings were saved - drop pooled connections so the new profile is used
+            self.modules.get("db_engines").dispose_all()
             self.statusbar.showMessage("Database settings updated successfully")
             print("HIS Database settings were updated")
 
@@ -320,9 +405,13 @@ class Main(QMainWindow, Main_ui):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-
-    window = Main()
-    window.show()
+    startup_profiler.mark("main.imports_done")
+    with startup_profiler.phase("main.qapplication"):
+        app = QApplication(sys.argv)
+
+    with startup_profiler.phase("main.create"):
+        window = Main()
+    with startup_profiler.phase("main.show"):
+        window.show()
 
     sys.exit(app.exec())
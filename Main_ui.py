@@ -4,6 +4,8 @@ from PyQt6.QtWidgets import QVBoxLayout, QWidget, QLabel, QMenuBar, QStatusBar,
 from PyQt6.QtGui import QAction, QIcon, QPixmap, QPainter, QFont
 from PyQt6.QtCore import Qt
 
+from StartupProfiler import startup_profiler
+
 class Main_ui(object):
     """
     UI class for Main.
@@ -11,6 +13,11 @@ class Main_ui(object):
     
     def create_icon_from_text(self, text, size=32, color="#2d3436"):
         """Create an icon from Unicode text symbol"""
+        with startup_profiler.phase("main.create_icon_from_text"):
+            return self._paint_text_icon(text, size, color)
+
+    def _paint_text_icon(self, text, size, color):
+        """Paint text centered on a transparent pixmap"""
         pixmap = QPixmap(size, size)
         pixmap.fill(Qt.GlobalColor.transparent)
         
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy loading of the application modules opened from Main.
+A module (and the database drivers it pulls in) is imported the first time
+its window is opened, or earlier by a background pre-warm after startup.
+
+using by
+from ModuleRegistry import ModuleRegistry, PrewarmWorker
+"""
+import importlib
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ModuleRegistry:
+    """Maps keys to (module name, attribute name) and imports them on first use"""
+
+    def __init__(self, entries=None):
+        self._entries = dict(entries or {})
+        self._load_times = {}
+        self._lock = threading.Lock()
+
+    def register(self, key, module_name, attribute):
+        """Register an attribute (usually a class) of a module under key"""
+        self._entries[key] = (module_name, attribute)
+
+    def keys(self):
+        """Return the registered keys"""
+        return list(self._entries)
+
+    def is_loaded(self, key):
+        """Return True if the module of key has been imported"""
+        module_name, _ = self._entries[key]
+        return module_name in sys.modules
+
+    def get(self, key):
+        """Import the module of key if needed and return the registered attribute"""
+        module_name, attribute = self._entries[key]
+        already_loaded = module_name in sys.modules
+
+        start_time = time.perf_counter()
+        module = importlib.import_module(module_name)
+        load_time = time.perf_counter() - start_time
+
+        if not already_loaded:
+            with self._lock:
+                self._load_times.setdefault(key, load_time)
+        return getattr(module, attribute)
+
+    def load_times(self):
+        """Return {key: seconds} spent importing each lazily loaded module"""
+        with self._lock:
+            return dict(self._load_times)
+
+
+class PrewarmWorker(QThread):
+    """Thread for importing registered modules in the background"""
+
+    # Signals
+    module_loaded = pyqtSignal(str, float)  # key, import time in seconds
+    prewarm_finished = pyqtSignal(float)  # total import time in seconds
+
+    def __init__(self, registry, keys=None):
+        super().__init__()
+        self.registry = registry
+        self.keys = keys if keys is not None else registry.keys()
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop before importing the next module"""
+        self.cancelled = True
+
+    def run(self):
+        """Import every module that is not loaded yet"""
+        total_time = 0.0
+        for key in self.keys:
+            if self.cancelled:
+                break
+            if self.registry.is_loaded(key):
+                continue
+            try:
+                start_time = time.perf_counter()
+                self.registry.get(key)
+                load_time = time.perf_counter() - start_time
+            except Exception as e:
+                # The module is imported again (and the error shown) when it is opened
+                print(f"Pre-warm of {key} failed: {str(e)}")
+                continue
+            total_time += load_time
+            self.module_loaded.emit(key, load_time)
+        self.prewarm_finished.emit(total_time)
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""
+Shared page-by-page table loading for the management windows
+(House, Patient, Person, Visit).
+
+using by
+from PagedTable import PagedTable
+class House(QWidget, House_ui, PagedTable)
+"""
+from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from KeysetPager import KeysetPager
+from ResultTableModel import ResultTableModel
+from AppSetting import app_settings
+from DbEngine import db_engines
+from TableChangeMonitor import table_monitor
+
+
+def read_cached_probes(cache_prefix):
+    """Return {cache key: probe} of the probes cached under cache_prefix, one per database fingerprint"""
+    settings = app_settings.settings
+    settings.beginGroup(cache_prefix)
+    try:
+        fingerprints = settings.childKeys()
+    finally:
+        settings.endGroup()
+    cache_keys = [f"{cache_prefix}/{fingerprint}" for fingerprint in fingerprints]
+    return {cache_key: str(app_settings.get_value(cache_key, "") or "") for cache_key in cache_keys}
+
+
+class LoadCancelled(Exception):
+    """Raised inside a worker to stop streaming rows after cancel()"""
+
+
+class PagedLoadWorker(QThread):
+    """Thread for finding a working data source and loading its first page"""
+
+    # Signals
+    pager_ready = pyqtSignal(object)  # KeysetPager of the source being loaded
+    rows_loaded = pyqtSignal(list)  # batch of rows of the first page
+    probe_resolved = pyqtSignal(str, str)  # cache key, probe ("" when the cached probe is stale)
+    load_finished = pyqtSignal(bool, str)  # success, message
+
+    def __init__(self, db, sources, cache_prefix, table_patterns=None, cached_probes=None):
+        """
+        sources is a priority-ordered list of (columns, table, key_column)
+        candidates for the different HIS systems. table_patterns are LIKE
+        patterns used to search for a table when no candidate works.
+        cached_probes is read_cached_probes(cache_prefix), read on the GUI
+        thread because the QSettings behind app_settings is not thread-safe.
+        """
+        super().__init__()
+        self.db = db
+        self.sources = sources
+        self.cache_prefix = cache_prefix
+        self.table_patterns = table_patterns or []
+        self.cached_probes = cached_probes or {}
+        self.cancelled = False
+        self.last_error = ""
+
+    def cancel(self):
+        """Ask the worker to stop; rows still in flight are discarded"""
+        self.cancelled = True
+
+    def run(self):
+        """Find a working source and stream its first page"""
+        try:
+            success, message = self._load()
+        except LoadCancelled:
+            return
+        except Exception as e:
+            success, message = False, str(e)
+
+        if not self.cancelled:
+            self.load_finished.emit(success, message)
+
+    def _load(self):
+        """Try the cached probe, then the candidate sources, then a table search"""
+        success, fingerprint = self.db.get_schema_fingerprint()
+        cache_key = f"{self.cache_prefix}/{fingerprint}" if success else ""
+
+        # Go straight to the source that worked last time for this database.
+        # The fingerprint includes the schema version, so a schema change
+        # means a cache miss and a fresh probe.
+        if cache_key:
+            cached_probe = self.cached_probes.get(cache_key, "")
+            if cached_probe:
+                if self._load_probe(cached_probe):
+                    return True, f"Loaded using cached probe {cached_probe}"
+                self.probe_resolved.emit(cache_key, "")
+
+        # Check all candidates against the schema in one round trip, then
+        # load the highest-priority source that can succeed
+        candidates = [self._create_pager(index).probe_query() for index in range(len(self.sources))]
+        unavailable = self.db.find_unavailable_candidates(candidates)
+        for index in range(len(self.sources)):
+            if index in unavailable:
+                continue
+            probe = f"query:{index}"
+            if self._load_probe(probe):
+                if cache_key:
+                    self.probe_resolved.emit(cache_key, probe)
+                return True, f"Loaded using query {index + 1}"
+
+        # If specific sources fail, try to find related tables
+        if self.table_patterns:
+            print("Specific queries failed, searching for related tables...")
+            success, tables = self.db.find_tables_by_pattern(self.table_patterns)
+            if success and tables:
+                print(f"Found related tables: {tables}")
+                for table_name in tables:
+                    probe = f"table:{table_name}"
+                    if self._load_probe(probe):
+                        if cache_key:
+                            self.probe_resolved.emit(cache_key, probe)
+                        return True, f"Loaded from table {table_name}"
+            elif not success:
+                self.last_error = tables
+
+        return False, self.last_error or "No matching table found in this database"
+
+    def _create_pager(self, index):
+        """Create the pager of a candidate source"""
+        columns, table, key_column = self.sources[index]
+        return KeysetPager(self.db, columns, table, key_column)
+
+    def _create_table_pager(self, table):
+        """
+        Create the pager of a discovered table: keyset-paged on its primary
+        key, or only its first page when it has no single-column primary key
+        (paging on a non-unique column would skip rows at page boundaries)
+        """
+        success, key_columns = self.db.get_primary_key(table)
+        quoted_table = self.db.quote_identifier(table)
+        key_column = None
+        if success and len(key_columns) == 1:
+            key_column = self.db.quote_identifier(key_columns[0])
+        return KeysetPager(self.db, f"{quoted_table}.*", quoted_table, key_column)
+
+    def _load_probe(self, probe):
+        """Load the first page of a probe ("query:<index>" or "table:<name>"), returning True if it has rows"""
+        kind, _, value = probe.partition(":")
+        if kind == "query" and value.isdigit() and int(value) < len(self.sources):
+            pager = self._create_pager(int(value))
+            table = pager.table
+        elif kind == "table" and value:
+            pager = self._create_table_pager(value)
+            table = value
+        else:
+            return False
+
+        def on_batch(rows):
+            if self.cancelled:
+                raise LoadCancelled()
+            self.rows_loaded.emit(rows)
+
+        self.pager_ready.emit(pager)
+        self._read_table_versions(pager, table)
+        try:
+            rows = pager.fetch_page(0, on_batch)
+        except LoadCancelled:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            return False
+
+        return len(rows) > 0
+
+
+    def _read_table_versions(self, pager, table):
+        """Remember the change token of the pager's table before its first page is read"""
+        table = table.lower()
+        success, versions = self.db.get_table_versions([table])
+        if success and versions and table in versions:
+            pager.table_versions = versions
+
+
+class PageLoadWorker(QThread):
+    """Thread for reading one page without blocking the UI"""
+
+    # Signals
+    page_loaded = pyqtSignal(int, list)  # page number, rows
+    page_failed = pyqtSignal(int, str)  # page number, error message
+
+    def __init__(self, pager, page_number):
+        super().__init__()
+        self.pager = pager
+        self.page_number = page_number
+
+    def run(self):
+        """Read the page (usually already prefetched)"""
+        try:
+            rows = self.pager.fetch_page(self.page_number)
+            self.page_loaded.emit(self.page_number, rows)
+        except Exception as e:
+            self.page_failed.emit(self.page_number, str(e))
+
+
+class PagedTable(object):
+    """
+    Mixin for management windows that show a database table page by page.
+
+    The window calls setup_paging() from __init__ and load_table_data() to
+    (re)load. The *_ui class provides status_label, page_label,
+    prev_page_button, next_page_button and setup_table_model() (sample data).
+    """
+
+    # Workers still finishing after their window was closed
+    _active_workers = set()
+
+    def setup_paging(self, table_view, headers, sources, cache_prefix, table_patterns=None, warn_on_fallback=False):
+        """Configure paging for table_view and connect the paging buttons"""
+        self.paged_view = table_view
+        self.paged_headers = headers
+        self.paged_sources = sources
+        self.paged_cache_prefix = cache_prefix
+        self.paged_table_patterns = table_patterns
+        self.warn_on_fallback = warn_on_fallback
+
+        self.pager = None
+        self.current_page = 0
+        self.load_worker = None
+        self.page_worker = None
+        self.refresh_requested = False
+        # TableChangeMonitor subscription dropping the pager's cached pages on change
+        self.table_watch = None
+
+        self.prev_page_button.clicked.connect(self.show_previous_page)
+        self.next_page_button.clicked.connect(self.show_next_page)
+
+    def _start_worker(self, worker):
+        """Keep a worker alive until it finishes, even if the window is closed"""
+        PagedTable._active_workers.add(worker)
+        worker.finished.connect(lambda: PagedTable._active_workers.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+
+    def load_table_data(self):
+        """Start loading the first page from the database in a worker thread"""
+        self.cancel_loading()
+
+        # Show an empty table with a loading placeholder while the worker runs
+        self.pager = None
+        self.current_page = 0
+        self.create_empty_model()
+        self.status_label.setText("Loading data...")
+        self.refresh_button.setEnabled(False)
+        self.update_page_controls()
+
+        # QSettings is not thread-safe: the profile and the cached probes are
+        # read here, so the worker, the pager and its prefetch threads never
+        # touch app_settings
+        self.db.connection_settings = db_engines.get_settings()
+        cached_probes = read_cached_probes(self.paged_cache_prefix)
+        self.load_worker = PagedLoadWorker(self.db, self.paged_sources, self.paged_cache_prefix,
+                                           self.paged_table_patterns, cached_probes)
+        self.load_worker.pager_ready.connect(self.on_pager_ready)
+        self.load_worker.rows_loaded.connect(self.on_rows_loaded)
+        self.load_worker.probe_resolved.connect(self.on_probe_resolved)
+        self.load_worker.load_finished.connect(self.on_load_finished)
+        self._start_worker(self.load_worker)
+
+    def cancel_loading(self):
+        """Cancel a running load, ignore any rows it still delivers and stop watching the table"""
+        if self.table_watch is not None:
+            table_monitor.unwatch(self.table_watch)
+            self.table_watch = None
+        if self.load_worker is None:
+            return
+        try:
+            self.load_worker.pager_ready.disconnect(self.on_pager_ready)
+            self.load_worker.rows_loaded.disconnect(self.on_rows_loaded)
+            self.load_worker.probe_resolved.disconnect(self.on_probe_resolved)
+            self.load_worker.load_finished.disconnect(self.on_load_finished)
+            self.load_worker.cancel()
+        except (TypeError, RuntimeError):
+            pass
+        self.load_worker = None
+
+    def on_pager_ready(self, pager):
+        """Use the pager of the source being loaded (rows from failed sources are discarded)"""
+        self.pager = pager
+        if self.model.rowCount() > 0:
+            self.create_empty_model()
+
+    def on_rows_loaded(self, rows):
+        """Append a batch of first-page rows to the table"""
+        first_batch = self.model.rowCount() == 0
+        self.append_rows_to_model(rows)
+        if first_batch:
+            self.paged_view.resizeColumnsToContents()
+        self.status_label.setText(f"Loading data... {self.model.rowCount()} records")
+
+    def on_probe_resolved(self, cache_key, probe):
+        """Remember (or forget) which source works for this database fingerprint"""
+        if probe:
+            app_settings.set_value(cache_key, probe)
+        else:
+            app_settings.remove_key(cache_key)
+
+    def on_load_finished(self, success, message):
+        """Handle the end of the first page load"""
+        self.load_worker = None
+        self.refresh_button.setEnabled(True)
+
+        if success:
+            # Sort the streamed first page once, not batch by batch
+            self.model.refresh_view()
+            self.paged_view.resizeColumnsToContents()
+            self.status_label.setText(f"{self.model.rowCount()} records on this page")
+            print(f"Successfully loaded {self.model.rowCount()} records from database ({message})")
+            self.update_page_controls()
+            self.pager.prefetch(1)
+            if self.pager.table_versions:
+                self.table_watch = table_monitor.watch(self.db.profile_key(), self.pager.table_versions,
+                                                       self.pager.invalidate)
+                table_monitor.start()
+            if self.refresh_requested:
+                QMessageBox.information(self, "Refresh", "Data refreshed successfully from database.")
+        else:
+            # Fallback to sample data if all database attempts fail
+            print(f"All database queries failed: {message}")
+            self.pager = None
+            self.setup_table_model()
+            self.status_label.setText("Showing sample data")
+            self.update_page_controls()
+            if self.warn_on_fallback:
+                QMessageBox.warning(self, "Database Warning",
+                                  f"Could not load data from database.\nUsing sample data instead.")
+
+        self.refresh_requested = False
+
+    def show_next_page(self):
+        """Show the next page"""
+        self.show_page(self.current_page + 1)
+
+    def show_previous_page(self):
+        """Show the previous page"""
+        if self.current_page > 0:
+            self.show_page(self.current_page - 1)
+
+    def show_page(self, page_number):
+        """Show a page - instantly when cached, otherwise read it in a worker"""
+        if self.pager is None or self.page_worker is not None:
+            return
+
+        rows = self.pager.cached_page(page_number)
+        if rows is not None:
+            self.on_page_loaded(page_number, rows)
+            return
+
+        self.status_label.setText(f"Loading page {page_number + 1}...")
+        self.prev_page_button.setEnabled(False)
+        self.next_page_button.setEnabled(False)
+
+        self.page_worker = PageLoadWorker(self.pager, page_number)
+        self.page_worker.page_loaded.connect(self.on_page_loaded)
+        self.page_worker.page_failed.connect(self.on_page_failed)
+        self._start_worker(self.page_worker)
+
+    def on_page_loaded(self, page_number, rows):
+        """Display a loaded page and prefetch the one after it"""
+        self.page_worker = None
+        if not rows and page_number > 0:
+            # The previous page was exactly full - there is nothing after it
+            self.status_label.setText("No more records")
+            self.update_page_controls()
+            return
+
+        self.current_page = page_number
+        self.create_empty_model()
+        self.append_rows_to_model(rows)
+        self.model.refresh_view()
+        self.status_label.setText(f"{len(rows)} records on this page")
+        self.update_page_controls()
+        self.pager.prefetch(page_number + 1)
+
+    def on_page_failed(self, page_number, error_message):
+        """Handle a page that could not be read"""
+        self.page_worker = None
+        self.status_label.setText(f"Could not load page {page_number + 1}")
+        self.update_page_controls()
+        QMessageBox.warning(self, "Database Warning", f"Could not load page {page_number + 1}:\n{error_message}")
+
+    def update_page_controls(self):
+        """Enable the paging buttons according to the current page"""
+        self.page_label.setText(f"Page {self.current_page + 1}")
+        has_pager = self.pager is not None
+        self.prev_page_button.setEnabled(has_pager and self.current_page > 0)
+        self.next_page_button.setEnabled(has_pager and not self.pager.is_last_page(self.current_page))
+
+    def create_empty_model(self):
+        """Create an empty model with the table headers and attach it to the view"""
+        previous = getattr(self, "model", None)
+        self.model = ResultTableModel(self.paged_view)
+        self.model.set_results([], self.paged_headers)
+        # Keep a local sort chosen on the previous page (rows keep their database values, so it is type-aware)
+        if isinstance(previous, ResultTableModel) and previous.sort_columns():
+            self.model.sort_by(previous.sort_columns())
+        self.paged_view.setModel(self.model)
+
+    def append_rows_to_model(self, data):
+        """Append database rows to the table model"""
+        column_count = len(self.paged_headers)
+        rows = []
+        for row_data in data:
+            # Ensure we have the right number of columns, pad with empty strings if needed
+            row_values = list(row_data)
+            while len(row_values) < column_count:
+                row_values.append("")
+
+            # Take only the displayed columns
+            rows.append(row_values[:column_count])
+        self.model.append_rows(rows)
@@ -3,17 +3,51 @@ import sys
 from PyQt6.QtWidgets import QWidget, QMessageBox, QApplication
 
 from Patient_ui import Patient_ui
+from DbPerform import DbPerform
+from PagedTable import PagedTable
 
-class Patient(QWidget, Patient_ui):
+
+# Patient data sources for different HIS systems, in priority order:
+# (select columns, table, unique key column used for keyset paging)
+PATIENT_SOURCES = [
+    # HOSXP patient table
+    ("hn as patient_id, fname, lname, birthday, sex, hometel as phone, '' as email, 'Active' as status", "patient", "hn"),
+    
+    # JHCIS person table
+    ("pid as patient_id, fname, lname, birth, sex, telephoneperson as phone, '' as email, 'Active' as status", "person", "pid"),
+]
+
+# AppSetting key prefix for the cached probe result of each database fingerprint
+PROBE_CACHE_KEY = "patient_probe_cache"
+
+
+class Patient(QWidget, Patient_ui, PagedTable):
+    PATIENT_HEADERS = ["Patient ID", "First Name", "Last Name", "Birth Date", "Gender", "Phone", "Email", "Status"]
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setupUi(self)
         
+        # Initialize database performance class
+        self.db = DbPerform()
+        
         # Connect button signals
         self.add_button.clicked.connect(self.add_patient)
         self.edit_button.clicked.connect(self.edit_patient)
         self.delete_button.clicked.connect(self.delete_patient)
         self.refresh_button.clicked.connect(self.refresh_data)
+        
+        # Page through the patient table (keyset paging on the patient key)
+        self.setup_paging(self.patient_table, self.PATIENT_HEADERS, PATIENT_SOURCES, PROBE_CACHE_KEY)
+        
+        # Load patient data on startup (in the background); sample data stays
+        # visible if no database is configured
+        self.load_table_data()
+    
+    def closeEvent(self, event):
+        """Handle window close event - cancel a running load"""
+        self.cancel_loading()
+        event.accept()
     
     def add_patient(self):
         """
@@ -53,11 +87,11 @@ class Patient(QWidget, Patient_ui):
     
     def refresh_data(self):
         """
-        Handle refresh button click.
+        Handle refresh button click - reload data from database.
         """
-        # Re-setup the table model with fresh data
-        self.setup_table_model()
-        QMessageBox.information(self, "Refresh", "Data refreshed successfully.")
+        # Reload data from database; the result is reported when loading finishes
+        self.refresh_requested = True
+        self.load_table_data()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -151,6 +151,28 @@ class Patient_ui(object):
         # Add table to layout
         self.main_layout.addWidget(self.patient_table)
         
+        # Create paging bar
+        self.paging_layout = QHBoxLayout()
+        
+        self.status_label = QLabel("", Patient_ui)
+        self.status_label.setStyleSheet("color: #6c757d; font-style: italic;")
+        self.paging_layout.addWidget(self.status_label)
+        self.paging_layout.addStretch()
+        
+        self.prev_page_button = QPushButton("< Previous", Patient_ui)
+        self.prev_page_button.setEnabled(False)
+        self.paging_layout.addWidget(self.prev_page_button)
+        
+        self.page_label = QLabel("Page 1", Patient_ui)
+        self.page_label.setStyleSheet("color: #2c3e50; padding: 0 10px;")
+        self.paging_layout.addWidget(self.page_label)
+        
+        self.next_page_button = QPushButton("Next >", Patient_ui)
+        self.next_page_button.setEnabled(False)
+        self.paging_layout.addWidget(self.next_page_button)
+        
+        self.main_layout.addLayout(self.paging_layout)
+        
     def setup_table_model(self):
         """
         Set up the table model with sample data.
@@ -159,19 +181,19 @@ class Patient_ui(object):
         self.model = QStandardItemModel(0, 8)
         
         # Set headers
-        headers = ["Patient ID", "First Name", "Last Name", "Age", "Gender", "Phone", "Email", "Status"]
+        headers = ["Patient ID", "First Name", "Last Name", "Birth Date", "Gender", "Phone", "Email", "Status"]
         self.model.setHorizontalHeaderLabels(headers)
         
         # Add sample data
         sample_data = [
-            ["P001", "John", "Doe", "35", "Male", "555-0101", "john.doe@email.com", "Active"],
-            ["P002", "Jane", "Smith", "28", "Female", "555-0102", "jane.smith@email.com", "Active"],
-            ["P003", "Robert", "Johnson", "42", "Male", "555-0103", "robert.johnson@email.com", "Inactive"],
-            ["P004", "Emily", "Davis", "31", "Female", "555-0104", "emily.davis@email.com", "Active"],
-            ["P005", "Michael", "Wilson", "55", "Male", "555-0105", "michael.wilson@email.com", "Active"],
-            ["P006", "Sarah", "Brown", "27", "Female", "555-0106", "sarah.brown@email.com", "Active"],
-            ["P007", "David", "Taylor", "39", "Male", "555-0107", "david.taylor@email.com", "Inactive"],
-            ["P008", "Lisa", "Anderson", "33", "Female", "555-0108", "lisa.anderson@email.com", "Active"],
+            ["P001", "John", "Doe", "1989-04-12", "Male", "555-0101", "john.doe@email.com", "Active"],
+            ["P002", "Jane", "Smith", "1996-08-03", "Female", "555-0102", "jane.smith@email.com", "Active"],
+            ["P003", "Robert", "Johnson", "1982-01-27", "Male", "555-0103", "robert.johnson@email.com", "Inactive"],
+            ["P004", "Emily", "Davis", "1993-06-15", "Female", "555-0104", "emily.davis@email.com", "Active"],
+            ["P005", "Michael", "Wilson", "1969-11-02", "Male", "555-0105", "michael.wilson@email.com", "Active"],
+            ["P006", "Sarah", "Brown", "1997-02-20", "Female", "555-0106", "sarah.brown@email.com", "Active"],
+            ["P007", "David", "Taylor", "1985-09-08", "Male", "555-0107", "david.taylor@email.com", "Inactive"],
+            ["P008", "Lisa", "Anderson", "1991-12-30", "Female", "555-0108", "lisa.anderson@email.com", "Active"],
         ]
         
         for row_data in sample_data:
@@ -198,6 +220,8 @@ class Patient_ui(object):
         self.edit_button.setText("Edit Patient")
         self.delete_button.setText("Delete Patient")
         self.refresh_button.setText("Refresh")
+        self.prev_page_button.setText("< Previous")
+        self.next_page_button.setText("Next >")
 
 
 if __name__ == "__main__":
@@ -3,17 +3,51 @@ import sys
 from PyQt6.QtWidgets import QWidget, QMessageBox, QApplication
 
 from Person_ui import Person_ui
+from DbPerform import DbPerform
+from PagedTable import PagedTable
 
-class Person(QWidget, Person_ui):
+
+# Person data sources for different HIS systems, in priority order:
+# (select columns, table, unique key column used for keyset paging)
+PERSON_SOURCES = [
+    # HOSXP person table
+    ("person_id, fname, lname, birthdate, sex, '' as address, '' as phone, '' as email, '' as type", "person", "person_id"),
+    
+    # JHCIS person table
+    ("pid as person_id, fname, lname, birth, sex, '' as address, telephoneperson as phone, '' as email, '' as type", "person", "pid"),
+]
+
+# AppSetting key prefix for the cached probe result of each database fingerprint
+PROBE_CACHE_KEY = "person_probe_cache"
+
+
+class Person(QWidget, Person_ui, PagedTable):
+    PERSON_HEADERS = ["Person ID", "First Name", "Last Name", "Date of Birth", "Gender", "Address", "Phone", "Email", "Type"]
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setupUi(self)
         
+        # Initialize database performance class
+        self.db = DbPerform()
+        
         # Connect button signals
         self.add_button.clicked.connect(self.add_person)
         self.edit_button.clicked.connect(self.edit_person)
         self.delete_button.clicked.connect(self.delete_person)
         self.refresh_button.clicked.connect(self.refresh_data)
+        
+        # Page through the person table (keyset paging on the person key)
+        self.setup_paging(self.person_table, self.PERSON_HEADERS, PERSON_SOURCES, PROBE_CACHE_KEY)
+        
+        # Load person data on startup (in the background); sample data stays
+        # visible if no database is configured
+        self.load_table_data()
+    
+    def closeEvent(self, event):
+        """Handle window close event - cancel a running load"""
+        self.cancel_loading()
+        event.accept()
     
     def add_person(self):
         """
@@ -53,11 +87,11 @@ class Person(QWidget, Person_ui):
     
     def refresh_data(self):
         """
-        Handle refresh button click.
+        Handle refresh button click - reload data from database.
         """
-        # Re-setup the table model with fresh data
-        self.setup_table_model()
-        QMessageBox.information(self, "Refresh", "Data refreshed successfully.")
+        # Reload data from database; the result is reported when loading finishes
+        self.refresh_requested = True
+        self.load_table_data()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
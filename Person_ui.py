@@ -151,6 +151,28 @@ class Person_ui(object):
         # Add table to layout
         self.main_layout.addWidget(self.person_table)
         
+        # Create paging bar
+        self.paging_layout = QHBoxLayout()
+        
+        self.status_label = QLabel("", Person_ui)
+        self.status_label.setStyleSheet("color: #6c757d; font-style: italic;")
+        self.paging_layout.addWidget(self.status_label)
+        self.paging_layout.addStretch()
+        
+        self.prev_page_button = QPushButton("< Previous", Person_ui)
+        self.prev_page_button.setEnabled(False)
+        self.paging_layout.addWidget(self.prev_page_button)
+        
+        self.page_label = QLabel("Page 1", Person_ui)
+        self.page_label.setStyleSheet("color: #2c3e50; padding: 0 10px;")
+        self.paging_layout.addWidget(self.page_label)
+        
+        self.next_page_button = QPushButton("Next >", Person_ui)
+        self.next_page_button.setEnabled(False)
+        self.paging_layout.addWidget(self.next_page_button)
+        
+        self.main_layout.addLayout(self.paging_layout)
+        
     def setup_table_model(self):
         """
         Set up the table model with sample data.
@@ -198,6 +220,8 @@ class Person_ui(object):
         self.edit_button.setText("Edit Person")
         self.delete_button.setText("Delete Person")
         self.refresh_button.setText("Refresh")
+        self.prev_page_button.setText("< Previous")
+        self.next_page_button.setText("Next >")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,31 @@
 import sys
+import os
 import time
 import csv
+import threading
 from datetime import datetime
 
-from PyQt6.QtWidgets import QWidget, QApplication, QMessageBox, QFileDialog, QMenu, QTableWidgetItem
+from PyQt6.QtWidgets import QWidget, QApplication, QMessageBox, QFileDialog, QMenu
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from sqlalchemy import text
 
 from Query_ui import Query_ui
+from DbEngine import db_engines
+from ResultTableModel import ResultTableModel, resize_columns_to_sample
+from QueryExport import EXPORT_CHUNK_SIZE, open_export_writer, is_read_only_query, is_streamable_query
+from ResultSnapshot import write_snapshot, ResultSnapshot, SNAPSHOT_EXTENSION
+from QueryCache import query_cache, estimate_row_bytes
+from TableChangeMonitor import table_monitor, extract_tables, read_table_versions
+from QueryHistoryStore import query_history
+from QueryHistory import QueryHistory
+from ExplainPlan import explain_query
+from QueryPlan import QueryPlan
+from QueryGuard import QueryGuard
+
+
+class QueryCancelled(Exception):
+    """Raised inside a worker when the query was cancelled before it started"""
 
 
 class QueryThread(QThread):
@@ -15,26 +33,262 @@ class QueryThread(QThread):
     
     query_finished = pyqtSignal(list, list, float)  # results, headers, execution_time
     query_error = pyqtSignal(str)  # error_message
+    query_cancelled = pyqtSignal(int, float)  # rows fetched before the cancel, execution_time
+    query_queued = pyqtSignal()  # waiting for a free query slot on the server
+    
+    # Streaming mode signals
+    query_started = pyqtSignal(list)  # headers
+    rows_batch = pyqtSignal(list)  # rows fetched since the previous batch
+    stream_finished = pyqtSignal(int, float)  # row_count, execution_time
+    
+    # A batch is emitted every BATCH_SIZE rows or BATCH_INTERVAL_MS, whichever comes first
+    BATCH_SIZE = 1000
+    BATCH_INTERVAL_MS = 200
     
-    def __init__(self, query, database_type):
+    # How often a queued query checks whether it was cancelled
+    SLOT_POLL_SECONDS = 0.1
+    
+    def __init__(self, query, database_type, settings, streaming=False):
+        """
+        settings is the connection profile (DbEngine.get_settings), read on
+        the GUI thread because the QSettings behind it is not thread-safe.
+        """
         super().__init__()
         self.query = query
         self.database_type = database_type
+        self.settings = settings
+        self.streaming = streaming
+        self.pool_wait_time = 0.0
+        # Approximate memory of the fetched rows
+        self.bytes_fetched = 0
+        # Tables whose change tokens are read before the query runs (for the result cache)
+        self.tables = ()
+        self.table_versions = None
+        # Wall-clock start of the execution (for the query history)
+        self.started_at = time.time()
+        self.row_count = 0
+        
+        # Server session running the statement (None once the connection is released)
+        self.backend_id = None
+        self.dbapi_connection = None
+        self.cancelled = False
+        self._cancel_lock = threading.Lock()
+        
+        # Guardrails of the profile (None = unguarded, as for exports);
+        # fetch_all lifts the automatic row limit
+        self.guard = None
+        self.fetch_all = False
+        self.row_limit = 0
+        self.limit_reached = False
+        self.size_limit_reached = False
+        # Concurrent query slot of the server, held until the connection is released
+        self.query_slot = None
+    
+    def cancel(self):
+        """
+        Stop the query: fetching stops at the next row and the statement is
+        cancelled on the server from a side connection (KILL QUERY /
+        pg_cancel_backend), so it does not keep running after the client gave up.
+        """
+        with self._cancel_lock:
+            self.cancelled = True
+            backend_id = self.backend_id
+            dbapi_connection = self.dbapi_connection
+        if backend_id is not None:
+            threading.Thread(target=self.cancel_on_server, args=(backend_id,), daemon=True).start()
+        elif dbapi_connection is not None and hasattr(dbapi_connection, "interrupt"):
+            # SQLite (local testing) interrupts the statement in-process
+            dbapi_connection.interrupt()
+    
+    def cancel_on_server(self, backend_id):
+        try:
+            db_engines.cancel_backend(self.settings, backend_id)
+        except Exception as e:
+            print(f"Could not cancel the query on the server: {str(e)}")
     
     def run(self):
         """Execute the query in a separate thread"""
         try:
-            start_time = time.time()
+            self.started_at = start_time = time.time()
+            
+            if self.streaming:
+                row_count = self.run_streaming()
+                execution_time = time.time() - start_time
+                if self.cancelled:
+                    self.query_cancelled.emit(row_count, execution_time)
+                else:
+                    self.stream_finished.emit(row_count, execution_time)
+                return
             
-            # Simulate database connection and query execution
-            # In a real implementation, you would connect to actual databases here
-            results, headers = self.execute_mock_query(self.query, self.database_type)
+            headers, rows = self.execute_streaming_query(self.query, self.database_type)
+            results = [list(row) for row in rows]
             
             execution_time = time.time() - start_time
             self.query_finished.emit(results, headers, execution_time)
             
         except Exception as e:
-            self.query_error.emit(str(e))
+            if self.cancelled:
+                # The driver reports the interrupted statement as an error
+                self.query_cancelled.emit(self.row_count, time.time() - self.started_at)
+            else:
+                self.query_error.emit(str(e))
+    
+    def run_streaming(self):
+        """Fetch rows incrementally and emit them in batches, returning the row count"""
+        headers, rows = self.execute_streaming_query(self.query, self.database_type)
+        self.query_started.emit(headers)
+        
+        batch = []
+        last_emit = time.monotonic()
+        max_bytes = self.guard.max_result_bytes if self.guard is not None else 0
+        
+        try:
+            for row in rows:
+                if self.cancelled:
+                    break
+                if self.row_limit and self.row_count + len(batch) >= self.row_limit:
+                    # The extra row fetched past the limit shows more rows exist
+                    self.limit_reached = True
+                    break
+                batch.append(row)
+                self.bytes_fetched += estimate_row_bytes(row)
+                if max_bytes and self.bytes_fetched >= max_bytes:
+                    self.size_limit_reached = True
+                    break
+                elapsed_ms = (time.monotonic() - last_emit) * 1000
+                if len(batch) >= self.BATCH_SIZE or elapsed_ms >= self.BATCH_INTERVAL_MS:
+                    self.row_count += len(batch)
+                    self.rows_batch.emit(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+        finally:
+            # Closing the generator releases the connection when stopping early
+            if hasattr(rows, "close"):
+                rows.close()
+        
+        if batch:
+            self.row_count += len(batch)
+            self.rows_batch.emit(batch)
+        
+        return self.row_count
+    
+    def execute_streaming_query(self, query, database_type):
+        """Return headers and an iterator over the result rows"""
+        settings = self.settings
+        if not db_engines.is_configured(settings):
+            # No HIS connection saved yet - fall back to sample data
+            results, headers = self.execute_mock_query(query, database_type)
+            return headers, iter(results)
+        
+        if self.guard is not None:
+            self.acquire_query_slot(settings)
+        try:
+            connection, self.pool_wait_time = db_engines.checkout(settings)
+        except Exception:
+            self.release_query_slot()
+            raise
+        try:
+            backend_id = db_engines.backend_id(connection)
+            with self._cancel_lock:
+                self.backend_id = backend_id
+                self.dbapi_connection = connection.connection.dbapi_connection
+                if self.cancelled:
+                    raise QueryCancelled("Query cancelled")
+            
+            if self.tables:
+                self.table_versions = self.record_table_versions(connection)
+            
+            statement = query
+            if self.guard is not None:
+                if not self.fetch_all:
+                    self.row_limit = self.guard.row_limit_for(query)
+                statement = self.guard.prepare(connection, query, self.row_limit)
+            
+            if not is_streamable_query(query):
+                # DML, DDL, SHOW, CALL ...: a plain cursor, committed once its
+                # rows (e.g. INSERT ... RETURNING) are read, so the change is
+                # not rolled back when the connection goes back to the pool
+                result = connection.execute(text(statement))
+                if result.returns_rows:
+                    headers = list(result.keys())
+                    rows = [tuple(row) for row in result]
+                else:
+                    headers = ["Result"]
+                    rows = [[f"Query executed successfully - {result.rowcount} row(s) affected"]]
+                connection.commit()
+                self.release_connection(connection)
+                return headers, iter(rows)
+            
+            # stream_results makes the driver use a server-side cursor
+            # (PyMySQL SSCursor / psycopg2 named cursor)
+            result = connection.execution_options(stream_results=True).execute(text(statement))
+            headers = list(result.keys())
+        except Exception:
+            self.release_connection(connection)
+            raise
+        
+        return headers, self.iterate_result(connection, result)
+    
+    def release_connection(self, connection, result=None):
+        """Return the connection to the pool, or discard it if fetching stopped before the end"""
+        with self._cancel_lock:
+            self.backend_id = None
+            self.dbapi_connection = None
+            discard = self.cancelled or self.size_limit_reached
+        if discard:
+            # Closing the session drops the rest of the result on the server
+            # instead of reading it, and a late KILL cannot reach a reused connection
+            connection.invalidate()
+        elif result is not None:
+            result.close()
+        connection.close()
+        self.release_query_slot()
+    
+    def acquire_query_slot(self, settings):
+        """Wait until fewer than the allowed number of queries run on the server (from all Query tabs)"""
+        slot = db_engines.query_slot(settings)
+        if slot is None:
+            return
+        if not slot.acquire(blocking=False):
+            self.query_queued.emit()
+            while not slot.acquire(timeout=self.SLOT_POLL_SECONDS):
+                if self.cancelled:
+                    raise QueryCancelled("Query cancelled while waiting for a free slot")
+        self.query_slot = slot
+    
+    def release_query_slot(self):
+        slot, self.query_slot = self.query_slot, None
+        if slot is not None:
+            slot.release()
+    
+    def record_table_versions(self, connection):
+        """Return the change tokens of self.tables, or None if any of them cannot be tracked"""
+        try:
+            versions = read_table_versions(connection, self.tables)
+        except Exception as e:
+            # Missing catalog privileges etc. - the result falls back to the plain TTL
+            print(f"Could not read table change tokens: {str(e)}")
+            connection.rollback()
+            return None
+        if versions is None or set(versions) != set(self.tables):
+            return None
+        return versions
+    
+    def iterate_result(self, connection, result):
+        """Return an iterator over the rows of a streaming result that returns the connection to the pool"""
+        rows = self._iterate_rows(connection, result)
+        # Enter the generator's try block, so closing it releases the
+        # connection even if no row is ever read
+        next(rows)
+        return rows
+    
+    def _iterate_rows(self, connection, result):
+        try:
+            yield None
+            for row in result:
+                yield tuple(row)
+        finally:
+            self.release_connection(connection, result)
     
     def execute_mock_query(self, query, database_type):
         """Mock query execution - replace with actual database connections"""
@@ -87,11 +341,199 @@ class QueryThread(QThread):
         return results, headers
 
 
+class QueryExportThread(QueryThread):
+    """Thread for re-executing a query and streaming its rows to a file"""
+    
+    export_progress = pyqtSignal(int, float, float)  # rows written, rows/sec, ETA seconds (-1 = unknown)
+    export_finished = pyqtSignal(int, float, str)  # row_count, export_time, filename
+    export_cancelled = pyqtSignal(int)  # rows written before the cancel
+    
+    # Progress is reported at most every PROGRESS_INTERVAL_MS
+    PROGRESS_INTERVAL_MS = 250
+    
+    def __init__(self, query, database_type, settings, filename, expected_rows=0, source=None):
+        """
+        expected_rows (e.g. the row count of the last execution) is used for
+        the ETA. source is an optional (headers, rows) pair exported instead
+        of executing the query, e.g. the rows of an opened snapshot.
+        """
+        super().__init__(query, database_type, settings, streaming=True)
+        self.filename = filename
+        self.expected_rows = expected_rows
+        self.source = source
+    
+    def run(self):
+        """Execute the query with a server-side cursor and write rows in chunks; a cancel removes the partial file"""
+        writer = None
+        row_count = 0
+        try:
+            start_time = time.time()
+            if self.source is None and not is_read_only_query(self.query):
+                raise ValueError("Only SELECT queries can be exported to a file")
+            # Opened before the query runs, so a bad path or a missing openpyxl
+            # fails without holding a pooled connection and query slot
+            writer = open_export_writer(self.filename)
+            if self.source is not None:
+                headers, rows = self.source[0], iter(self.source[1])
+            else:
+                headers, rows = self.execute_streaming_query(self.query, self.database_type)
+            
+            chunk = []
+            last_progress = time.monotonic()
+            try:
+                writer.write_header(headers)
+                for row in rows:
+                    if self.cancelled:
+                        break
+                    chunk.append(row)
+                    if len(chunk) >= EXPORT_CHUNK_SIZE:
+                        writer.write_rows(chunk)
+                        row_count += len(chunk)
+                        chunk = []
+                        if (time.monotonic() - last_progress) * 1000 >= self.PROGRESS_INTERVAL_MS:
+                            self.emit_progress(row_count, time.time() - start_time)
+                            last_progress = time.monotonic()
+            finally:
+                # Closing the generator returns the connection to the pool when stopping early
+                if hasattr(rows, "close"):
+                    rows.close()
+            
+            if self.cancelled:
+                writer.abort()
+                self.export_cancelled.emit(row_count)
+                return
+            
+            if chunk:
+                writer.write_rows(chunk)
+                row_count += len(chunk)
+            writer.close()
+            self.export_finished.emit(row_count, time.time() - start_time, self.filename)
+            
+        except Exception as e:
+            if writer is not None:
+                writer.abort()
+            if self.cancelled:
+                self.export_cancelled.emit(row_count)
+            else:
+                self.query_error.emit(str(e))
+    
+    def emit_progress(self, row_count, elapsed):
+        """Report the rows written, the throughput and the remaining time if known"""
+        rate = row_count / elapsed if elapsed > 0 else 0.0
+        eta = -1.0
+        if self.expected_rows > row_count and rate > 0:
+            eta = (self.expected_rows - row_count) / rate
+        self.export_progress.emit(row_count, rate, eta)
+
+
+class SnapshotSaveThread(QThread):
+    """Thread for writing loaded results to a columnar snapshot file"""
+    
+    snapshot_saved = pyqtSignal(str, int, int, float)  # filename, row_count, file size, save_time
+    snapshot_error = pyqtSignal(str)  # error_message
+    
+    def __init__(self, filename, headers, rows, metadata):
+        super().__init__()
+        self.filename = filename
+        self.headers = headers
+        self.rows = rows
+        self.metadata = metadata
+    
+    def run(self):
+        """Write the snapshot"""
+        try:
+            start_time = time.time()
+            size = write_snapshot(self.filename, self.headers, self.rows, self.metadata)
+            self.snapshot_saved.emit(self.filename, len(self.rows), size, time.time() - start_time)
+        except Exception as e:
+            self.snapshot_error.emit(str(e))
+
+
+class ConnectionRefreshThread(QThread):
+    """Thread for recycling the connection pool and checking the connection"""
+    
+    refresh_completed = pyqtSignal(bool, str)  # success, message
+    
+    def __init__(self, settings):
+        super().__init__()
+        # Read on the GUI thread (QSettings is not thread-safe)
+        self.settings = settings
+    
+    def run(self):
+        """Dispose the pooled connections and check out a fresh one"""
+        try:
+            settings = self.settings
+            if not db_engines.is_configured(settings):
+                self.refresh_completed.emit(False, "Status: Not configured")
+                return
+            
+            db_engines.dispose(settings)
+            connection, wait_time = db_engines.checkout(settings)
+            try:
+                connection.execute(text("SELECT 1")).fetchone()
+            finally:
+                connection.close()
+            self.refresh_completed.emit(True, f"Status: Connected ({wait_time * 1000:.0f} ms)")
+        except Exception as e:
+            self.refresh_completed.emit(False, f"Status: Connection failed - {str(e)}")
+
+
+class ExplainThread(QueryThread):
+    """Thread for reading the execution plan of a query"""
+    
+    plan_ready = pyqtSignal(str, list, bool)  # query, root PlanNodes, analyzed
+    explain_error = pyqtSignal(str)  # error_message
+    
+    def __init__(self, query, settings, analyze=False):
+        """
+        analyze executes the statement, so the plan is read within the
+        profile's statement timeout and query slots, and can be cancelled.
+        """
+        super().__init__(query, None, settings)
+        self.analyze = analyze
+    
+    def run(self):
+        """Run the dialect's EXPLAIN on a pooled connection"""
+        try:
+            settings = self.settings
+            if not db_engines.is_configured(settings):
+                self.explain_error.emit("Configure a database connection to explain queries.")
+                return
+            
+            self.guard = QueryGuard.from_settings(settings)
+            self.acquire_query_slot(settings)
+            try:
+                connection, self.pool_wait_time = db_engines.checkout(settings)
+            except Exception:
+                self.release_query_slot()
+                raise
+            try:
+                backend_id = db_engines.backend_id(connection)
+                with self._cancel_lock:
+                    self.backend_id = backend_id
+                    self.dbapi_connection = connection.connection.dbapi_connection
+                    if self.cancelled:
+                        raise QueryCancelled("Explain cancelled")
+                roots = explain_query(connection, self.query, self.analyze, self.guard)
+            finally:
+                self.release_connection(connection)
+            self.plan_ready.emit(self.query, roots, self.analyze)
+        except Exception as e:
+            # A cancelled EXPLAIN ANALYZE fails with the server's cancel error
+            if not self.cancelled:
+                self.explain_error.emit(str(e))
+
+
 class Query(QWidget, Query_ui):
     """
     Query module for database queries and data analysis.
     """
     
+    running_changed = pyqtSignal(bool)  # a query started (True) or ended (False)
+    
+    # Delay after the last keystroke before the loaded rows are filtered
+    FILTER_DELAY_MS = 250
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setupUi(self)
@@ -100,6 +542,33 @@ class Query(QWidget, Query_ui):
         self.current_results = []
         self.current_headers = []
         self.query_thread = None
+        self.refresh_thread = None
+        self.export_thread = None
+        self.snapshot_thread = None
+        self.explain_thread = None
+        self.plan_dialog = None
+        
+        # Memory-mapped snapshot currently shown in the grid
+        self.snapshot = None
+        
+        # Connection profile of the running query in the result cache key
+        self.cache_profile = None
+        
+        # Profile name of the running query in the query history
+        self.history_profile = ""
+        self.history_dialog = None
+        
+        # Query and row count of the last completed execution (used for the export ETA)
+        self.last_query = ""
+        self.last_row_count = 0
+        
+        # Results are shown through a lazily paged model instead of per-cell items
+        self.results_model = ResultTableModel(self)
+        self.table_results.setModel(self.results_model)
+        
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.FILTER_DELAY_MS)
         
         # Connect signals
         self.setup_connections()
@@ -113,11 +582,20 @@ class Query(QWidget, Query_ui):
     def setup_connections(self):
         """Connect UI signals to their handlers"""
         self.btn_execute.clicked.connect(self.execute_query)
+        self.btn_cancel_query.clicked.connect(self.cancel_query)
+        self.btn_fetch_all.clicked.connect(self.fetch_all_rows)
+        self.edit_filter.textChanged.connect(self.filter_timer.start)
+        self.filter_timer.timeout.connect(self.apply_result_filter)
+        self.btn_explain.clicked.connect(self.explain_current_query)
         self.btn_clear.clicked.connect(self.clear_query)
         self.btn_samples.clicked.connect(self.show_sample_queries)
+        self.btn_history.clicked.connect(self.show_history)
         self.btn_refresh.clicked.connect(self.refresh_connection)
         self.btn_export_csv.clicked.connect(self.export_to_csv)
         self.btn_export_excel.clicked.connect(self.export_to_excel)
+        self.btn_export_query.clicked.connect(self.export_query_to_file)
+        self.btn_save_snapshot.clicked.connect(self.save_snapshot)
+        self.btn_open_snapshot.clicked.connect(self.open_snapshot)
         self.combo_database.currentTextChanged.connect(self.on_database_changed)
     
     def execute_query(self):
@@ -128,26 +606,191 @@ class Query(QWidget, Query_ui):
             QMessageBox.warning(self, "Warning", "Please enter a SQL query")
             return
         
+        self.run_query(query)
+    
+    def fetch_all_rows(self):
+        """Re-run the last query without the automatic row limit"""
+        if self.last_query:
+            self.run_query(self.last_query, fetch_all=True)
+    
+    def run_query(self, query, fetch_all=False):
+        """Run query in a worker thread (or show its cached result)"""
+        # Serve repeated read-only queries from the result cache
+        database_type = self.combo_database.currentText()
+        settings = db_engines.get_settings()
+        profile = self.get_cache_profile(database_type, settings)
+        bypass_cache = self.check_bypass_cache.isChecked()
+        if profile is not None and not bypass_cache and is_read_only_query(query):
+            entry = query_cache.get(query, profile)
+            if entry is not None:
+                self.show_cached_result(query, entry)
+                return
+        
         # Disable execute button during query execution
         self.btn_execute.setEnabled(False)
         self.btn_execute.setText("Executing...")
+        self.btn_fetch_all.setVisible(False)
         
         # Clear previous results
-        self.table_results.clear()
-        self.table_results.setRowCount(0)
-        self.table_results.setColumnCount(0)
+        self.results_model.clear()
+        self.reset_local_view()
+        self.release_snapshot()
+        
+        self.last_query = query
+        self.last_row_count = 0
+        self.cache_profile = profile
+        self.history_profile = self.get_history_profile(database_type, settings)
         
         # Update status
         self.label_results_info.setText("Executing query...")
         self.label_execution_time.setText("Execution time: --")
         self.label_row_count.setText("Rows: --")
         
-        # Start query execution in a separate thread
-        database_type = self.combo_database.currentText()
-        self.query_thread = QueryThread(query, database_type)
+        self.set_cache_status("BYPASS" if bypass_cache else "MISS")
+        
+        # The previous thread re-enables the button just before it exits
+        if self.query_thread is not None and self.query_thread.isRunning():
+            self.query_thread.wait()
+        
+        # Start query execution in a separate thread; rows are streamed to the
+        # grid in batches so the first page shows while the rest is fetched
+        self.query_thread = QueryThread(query, database_type, settings, streaming=True)
+        self.query_thread.query_started.connect(self.on_query_started)
+        self.query_thread.rows_batch.connect(self.on_rows_batch)
+        self.query_thread.stream_finished.connect(self.on_stream_finished)
         self.query_thread.query_finished.connect(self.on_query_finished)
         self.query_thread.query_error.connect(self.on_query_error)
+        self.query_thread.query_cancelled.connect(self.on_query_cancelled)
+        if profile is not None and is_read_only_query(query):
+            self.query_thread.tables = extract_tables(query)
+        self.query_thread.guard = QueryGuard.from_settings(settings)
+        self.query_thread.fetch_all = fetch_all
+        self.query_thread.query_queued.connect(self.on_query_queued)
         self.query_thread.start()
+        self.set_running(True)
+    
+    def set_running(self, running):
+        """Enable Cancel while a query runs and tell the workspace tab"""
+        self.btn_cancel_query.setEnabled(running)
+        self.btn_cancel_query.setText("Cancel")
+        # Sort and filter once the rows are loaded, not while they stream in
+        self.table_results.setSortingEnabled(not running)
+        self.edit_filter.setEnabled(not running)
+        self.running_changed.emit(running)
+    
+    def is_running(self):
+        return self.query_thread is not None and self.query_thread.isRunning()
+    
+    def on_query_queued(self):
+        """Show that the query waits for other tabs' queries on the same server"""
+        self.label_results_info.setText("Waiting for a free query slot on the server...")
+    
+    def cancel_query(self):
+        """Stop the running query on the server and keep the rows fetched so far"""
+        if self.query_thread is None or not self.query_thread.isRunning():
+            return
+        self.btn_cancel_query.setEnabled(False)
+        self.btn_cancel_query.setText("Cancelling...")
+        self.label_results_info.setText("Cancelling query...")
+        self.query_thread.cancel()
+    
+    def on_query_cancelled(self, row_count, execution_time):
+        """Handle a cancelled query; a partial result is shown but not cached"""
+        self.label_execution_time.setText(self.format_execution_time(execution_time))
+        self.label_row_count.setText(f"Rows: {row_count}")
+        self.label_results_info.setText(f"Query cancelled - {row_count} rows fetched")
+        self.last_row_count = row_count
+        self.record_history(execution_time, row_count, error="Cancelled by user")
+        
+        self.btn_execute.setEnabled(True)
+        self.btn_execute.setText("Execute Query")
+        self.set_running(False)
+        self.update_ui_state(row_count > 0)
+    
+    def explain_current_query(self):
+        """Show the execution plan of the query in the editor"""
+        query = self.text_query.toPlainText().strip()
+        if not query:
+            QMessageBox.warning(self, "Warning", "Please enter a SQL query")
+            return
+        
+        self.btn_explain.setEnabled(False)
+        self.btn_explain.setText("Explaining...")
+        
+        self.explain_thread = ExplainThread(query, db_engines.get_settings(), self.check_explain_analyze.isChecked())
+        self.explain_thread.plan_ready.connect(self.on_plan_ready)
+        self.explain_thread.explain_error.connect(self.on_explain_error)
+        self.explain_thread.finished.connect(self.reset_explain_button)
+        self.explain_thread.start()
+    
+    def on_plan_ready(self, query, roots, analyzed):
+        """Show a plan in the plan dialog"""
+        if self.plan_dialog is None:
+            self.plan_dialog = QueryPlan(self)
+        self.plan_dialog.show_plan(query, roots, analyzed)
+        self.plan_dialog.show()
+        self.plan_dialog.raise_()
+    
+    def on_explain_error(self, error_message):
+        """Handle a failed EXPLAIN"""
+        QMessageBox.warning(self, "Explain", f"Could not explain the query:\n\n{error_message}")
+    
+    def reset_explain_button(self):
+        self.btn_explain.setEnabled(True)
+        self.btn_explain.setText("Explain")
+    
+    def on_query_started(self, headers):
+        """Prepare an empty result buffer once the column headers are known"""
+        self.current_results = []
+        self.current_headers = headers
+        self.results_model.set_results(self.current_results, headers)
+        self.label_results_info.setText("Fetching rows...")
+    
+    def on_rows_batch(self, rows):
+        """Append a batch of streamed rows to the result grid"""
+        first_batch = self.results_model.total_row_count() == 0
+        self.results_model.append_rows(rows)
+        
+        if first_batch:
+            resize_columns_to_sample(self.table_results)
+        
+        self.label_row_count.setText(f"Rows: {self.results_model.total_row_count()}")
+    
+    def on_stream_finished(self, row_count, execution_time):
+        """Handle completion of a streamed query"""
+        thread = self.query_thread
+        complete = not (thread.limit_reached or thread.size_limit_reached)
+        
+        # Update status
+        self.label_execution_time.setText(self.format_execution_time(execution_time))
+        self.label_row_count.setText(f"Rows: {row_count}")
+        if thread.limit_reached:
+            self.label_results_info.setText(f"Showing the first {row_count} rows - more rows available")
+            self.btn_fetch_all.setVisible(True)
+        elif thread.size_limit_reached:
+            self.label_results_info.setText(
+                f"Result stopped at the {thread.guard.max_result_mb} MB size cap - {row_count} rows loaded")
+        else:
+            self.label_results_info.setText(f"Query completed successfully - {row_count} rows returned")
+        self.last_row_count = row_count
+        self.record_history(execution_time, row_count)
+        
+        # Keep the complete result for the next run of the same query
+        if complete and self.cache_profile is not None and is_read_only_query(thread.query):
+            query_cache.put(self.query_thread.query, self.cache_profile, self.current_headers,
+                            self.current_results, self.query_thread.bytes_fetched, execution_time,
+                            self.query_thread.table_versions)
+            if self.query_thread.table_versions:
+                # Drop the result as soon as one of its tables changes on the server
+                table_monitor.start()
+        
+        # Re-enable execute button
+        self.btn_execute.setEnabled(True)
+        self.btn_execute.setText("Execute Query")
+        self.set_running(False)
+        
+        # Enable export buttons
+        self.update_ui_state(row_count > 0)
     
     def on_query_finished(self, results, headers, execution_time):
         """Handle successful query completion"""
@@ -158,19 +801,90 @@ class Query(QWidget, Query_ui):
         self.populate_results_table(results, headers)
         
         # Update status
-        self.label_execution_time.setText(f"Execution time: {execution_time:.3f}s")
+        self.label_execution_time.setText(self.format_execution_time(execution_time))
         self.label_row_count.setText(f"Rows: {len(results)}")
         self.label_results_info.setText(f"Query completed successfully - {len(results)} rows returned")
+        self.last_row_count = len(results)
+        self.record_history(execution_time, len(results))
         
         # Re-enable execute button
         self.btn_execute.setEnabled(True)
         self.btn_execute.setText("Execute Query")
+        self.set_running(False)
         
         # Enable export buttons
         self.update_ui_state(True)
     
+    def get_cache_profile(self, database_type, settings):
+        """Return the connection profile part of the cache key (None = do not cache)"""
+        if not db_engines.is_configured(settings):
+            # Sample data of the selected database
+            return ("sample", database_type)
+        try:
+            return db_engines.profile_key(settings)
+        except ValueError:
+            return None
+    
+    def get_history_profile(self, database_type, settings):
+        """Return the connection profile recorded in the query history"""
+        if not db_engines.is_configured(settings):
+            return f"sample:{database_type}"
+        try:
+            return db_engines.profile_label(settings)
+        except Exception:
+            return "unknown"
+    
+    def record_history(self, execution_time, row_count=None, error=None):
+        """Add the execution of the current query thread to the query history"""
+        thread = self.query_thread
+        query_history.record(thread.query, self.history_profile, thread.started_at, execution_time,
+                             row_count, thread.bytes_fetched, error)
+        if self.history_dialog is not None and self.history_dialog.isVisible():
+            self.history_dialog.refresh()
+    
+    def show_history(self):
+        """Show the query history dialog"""
+        if self.history_dialog is None:
+            self.history_dialog = QueryHistory(self)
+            self.history_dialog.query_selected.connect(self.text_query.setPlainText)
+        else:
+            self.history_dialog.refresh()
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.history_dialog.activateWindow()
+    
+    def show_cached_result(self, query, entry):
+        """Show a result from the query cache without contacting the server"""
+        self.results_model.clear()
+        self.release_snapshot()
+        self.current_results = entry.rows
+        self.current_headers = entry.headers
+        self.last_query = query
+        self.last_row_count = len(entry.rows)
+        self.populate_results_table(entry.rows, entry.headers)
+        
+        age = query_cache.age(entry)
+        self.set_cache_status("HIT")
+        self.label_execution_time.setText(
+            f"Execution time: cached {age:.0f}s ago (original run {entry.execution_time:.3f}s)")
+        self.label_row_count.setText(f"Rows: {len(entry.rows)}")
+        self.label_results_info.setText(f"Cached result - {len(entry.rows)} rows")
+        self.update_ui_state(len(entry.rows) > 0)
+    
+    def set_cache_status(self, status):
+        """Show whether the last result came from the cache"""
+        colors = {"HIT": "#28a745", "MISS": "#6c757d", "BYPASS": "#fd7e14"}
+        self.label_cache_status.setText(f"Cache: {status}")
+        self.label_cache_status.setStyleSheet(f"color: {colors.get(status, '#6c757d')}; font-weight: bold;")
+    
+    def format_execution_time(self, execution_time):
+        """Format the execution time label, including the pool checkout wait"""
+        pool_wait_time = self.query_thread.pool_wait_time if self.query_thread else 0.0
+        return f"Execution time: {execution_time:.3f}s (pool wait: {pool_wait_time * 1000:.1f} ms)"
+    
     def on_query_error(self, error_message):
         """Handle query execution error"""
+        self.record_history(time.time() - self.query_thread.started_at, error=error_message)
         QMessageBox.critical(self, "Query Error", f"Error executing query:\n\n{error_message}")
         
         # Update status
@@ -181,6 +895,7 @@ class Query(QWidget, Query_ui):
         # Re-enable execute button
         self.btn_execute.setEnabled(True)
         self.btn_execute.setText("Execute Query")
+        self.set_running(False)
         
         # Disable export buttons
         self.update_ui_state(False)
@@ -190,28 +905,37 @@ class Query(QWidget, Query_ui):
         if not results or not headers:
             return
         
-        # Set table dimensions
-        self.table_results.setRowCount(len(results))
-        self.table_results.setColumnCount(len(headers))
+        # The model keeps a reference to the row buffer and only exposes
+        # rows to the view page by page as it scrolls (fetchMore)
+        self.results_model.set_results(results, headers)
+        self.reset_local_view()
         
-        # Set headers
-        self.table_results.setHorizontalHeaderLabels(headers)
-        
-        # Populate data
-        for row_idx, row_data in enumerate(results):
-            for col_idx, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))
-                self.table_results.setItem(row_idx, col_idx, item)
-        
-        # Auto-resize columns
-        self.table_results.resizeColumnsToContents()
+        # Size columns from a sample of rows instead of every cell
+        resize_columns_to_sample(self.table_results)
+    
+    def reset_local_view(self):
+        """Clear the filter box and sort indicator left from the previous results"""
+        self.filter_timer.stop()
+        self.edit_filter.blockSignals(True)
+        self.edit_filter.clear()
+        self.edit_filter.blockSignals(False)
+        self.table_results.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+    
+    def apply_result_filter(self):
+        """Filter the loaded rows by the text of the filter box"""
+        self.filter_timer.stop()
+        self.results_model.set_filter(self.edit_filter.text())
+        total = self.results_model.total_row_count()
+        if self.results_model.is_filtered():
+            self.label_row_count.setText(f"Rows: {self.results_model.view_row_count()} of {total}")
+        else:
+            self.label_row_count.setText(f"Rows: {total}")
     
     def clear_query(self):
         """Clear the query text and results"""
         self.text_query.clear()
-        self.table_results.clear()
-        self.table_results.setRowCount(0)
-        self.table_results.setColumnCount(0)
+        self.results_model.clear()
+        self.release_snapshot()
         
         self.current_results = []
         self.current_headers = []
@@ -243,13 +967,22 @@ class Query(QWidget, Query_ui):
         """Refresh database connection"""
         database = self.combo_database.currentText()
         self.label_connection_status.setText(f"Refreshing {database}...")
+        self.label_connection_status.setStyleSheet("color: #0066cc; font-weight: bold;")
+        self.btn_refresh.setEnabled(False)
         
-        # Simulate connection refresh
-        QApplication.processEvents()
-        time.sleep(0.5)
-        
-        self.label_connection_status.setText("Status: Connected")
-        self.label_connection_status.setStyleSheet("color: green; font-weight: bold;")
+        # Recycle the pool and check the connection in a worker thread
+        self.refresh_thread = ConnectionRefreshThread(db_engines.get_settings())
+        self.refresh_thread.refresh_completed.connect(self.on_refresh_completed)
+        self.refresh_thread.start()
+    
+    def on_refresh_completed(self, success, message):
+        """Handle connection refresh result"""
+        self.btn_refresh.setEnabled(True)
+        self.label_connection_status.setText(message)
+        if success:
+            self.label_connection_status.setStyleSheet("color: green; font-weight: bold;")
+        else:
+            self.label_connection_status.setStyleSheet("color: #cc0000; font-weight: bold;")
     
     def on_database_changed(self, database_name):
         """Handle database selection change"""
@@ -272,26 +1005,240 @@ class Query(QWidget, Query_ui):
                 with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                     writer = csv.writer(csvfile)
                     writer.writerow(self.current_headers)
-                    writer.writerows(self.current_results)
+                    # In the order and with the filter shown in the grid
+                    writer.writerows(self.results_model.view_rows())
                 
                 QMessageBox.information(self, "Success", f"Data exported to {filename}")
             except Exception as e:
                 QMessageBox.critical(self, "Export Error", f"Failed to export data:\n{str(e)}")
     
     def export_to_excel(self):
-        """Export results to Excel file (placeholder)"""
+        """Export the loaded results to an Excel file with typed cells"""
         if not self.current_results:
             QMessageBox.warning(self, "Warning", "No data to export")
             return
         
-        QMessageBox.information(self, "Excel Export", 
-                               "Excel export functionality would require additional libraries (e.g., openpyxl).\n"
-                               "For now, please use CSV export.")
+        # Re-running the query on the server only when the user asks for the
+        # rows the row limit left out
+        full_result = False
+        if not self.btn_fetch_all.isHidden() and self.last_query:
+            reply = QMessageBox.question(
+                self, "Export to Excel",
+                f"Only the first {len(self.current_results):,} rows are loaded.\n\n"
+                "Re-run the query on the server and export all rows?\n"
+                "(No exports the loaded rows.)",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel)
+            if reply == QMessageBox.StandardButton.Cancel:
+                return
+            full_result = reply == QMessageBox.StandardButton.Yes
+        
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export to Excel", f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+        if not filename:
+            return
+        if not filename.lower().endswith(".xlsx"):
+            filename += ".xlsx"
+        
+        if full_result:
+            self.start_query_export(self.last_query, filename)
+        else:
+            # The loaded rows keep the driver types (as do snapshots); they are
+            # written in the grid's sort order and filter, without querying the server
+            self.start_query_export("", filename, source=(self.current_headers, self.results_model.view_rows()))
+    
+    def export_query_to_file(self):
+        """Re-execute the query and stream all rows to a file (or cancel a running export)"""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            self.export_thread.cancel()
+            self.btn_export_query.setEnabled(False)
+            self.label_results_info.setText("Cancelling export...")
+            return
+        
+        query = self.text_query.toPlainText().strip()
+        if not query:
+            QMessageBox.warning(self, "Warning", "Please enter a SQL query")
+            return
+        if not is_read_only_query(query):
+            QMessageBox.warning(self, "Warning", "Only SELECT queries can be exported to a file")
+            return
+        
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Query to File", f"query_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            "CSV Files (*.csv);;Excel Files (*.xlsx)"
+        )
+        if not filename:
+            return
+        if "xlsx" in selected_filter and not filename.lower().endswith(".xlsx"):
+            filename = os.path.splitext(filename)[0] + ".xlsx"
+        
+        self.start_query_export(query, filename)
+    
+    def start_query_export(self, query, filename, source=None):
+        """Start streaming the rows of query (or of source) to filename in a worker thread"""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "An export is already running")
+            return
+        
+        # The row count of the last run of the same query gives the ETA
+        if source is not None:
+            expected_rows = len(source[1])
+        else:
+            expected_rows = self.last_row_count if query == self.last_query else 0
+        database_type = self.combo_database.currentText()
+        self.export_thread = QueryExportThread(query, database_type, db_engines.get_settings(), filename,
+                                               expected_rows, source)
+        self.export_thread.export_progress.connect(self.on_export_progress)
+        self.export_thread.export_finished.connect(self.on_export_finished)
+        self.export_thread.export_cancelled.connect(self.on_export_cancelled)
+        self.export_thread.query_error.connect(self.on_export_error)
+        self.export_thread.start()
+        
+        self.btn_export_query.setText("Cancel Export")
+        self.btn_export_excel.setEnabled(False)
+        self.label_results_info.setText("Exporting query...")
+    
+    def on_export_progress(self, row_count, rate, eta):
+        """Show the rows written, throughput and remaining time of the export"""
+        eta_text = f"ETA {eta:.0f}s" if eta >= 0 else "ETA --"
+        self.label_results_info.setText(f"Exporting... {row_count:,} rows ({rate:,.0f} rows/s, {eta_text})")
+    
+    def on_export_finished(self, row_count, export_time, filename):
+        """Handle a completed export"""
+        self.reset_export_button()
+        self.label_results_info.setText(f"Exported {row_count:,} rows in {export_time:.1f}s")
+        QMessageBox.information(self, "Success", f"{row_count:,} rows exported to {filename}")
+    
+    def on_export_cancelled(self, row_count):
+        """Handle a cancelled export"""
+        self.reset_export_button()
+        self.label_results_info.setText(f"Export cancelled after {row_count:,} rows")
+    
+    def on_export_error(self, error_message):
+        """Handle an export error"""
+        self.reset_export_button()
+        self.label_results_info.setText("Export failed")
+        QMessageBox.critical(self, "Export Error", f"Failed to export query:\n{error_message}")
+    
+    def reset_export_button(self):
+        """Return the export button to its idle state"""
+        self.btn_export_query.setText("Export Query to File")
+        self.btn_export_query.setEnabled(True)
+        self.btn_export_excel.setEnabled(bool(self.current_results))
+    
+    def save_snapshot(self):
+        """Save the loaded results to a columnar snapshot file in a worker thread"""
+        if not self.current_results:
+            QMessageBox.warning(self, "Warning", "No data to save")
+            return
+        
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save Results Snapshot",
+            f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}{SNAPSHOT_EXTENSION}",
+            f"Query Snapshots (*{SNAPSHOT_EXTENSION})"
+        )
+        if not filename:
+            return
+        if not filename.lower().endswith(SNAPSHOT_EXTENSION):
+            filename += SNAPSHOT_EXTENSION
+        
+        metadata = dict(self.snapshot.metadata) if self.snapshot is not None else {
+            "query": self.last_query,
+            "database": self.combo_database.currentText(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.snapshot_thread = SnapshotSaveThread(filename, self.current_headers, self.current_results, metadata)
+        self.snapshot_thread.snapshot_saved.connect(self.on_snapshot_saved)
+        self.snapshot_thread.snapshot_error.connect(self.on_snapshot_error)
+        self.snapshot_thread.start()
+        
+        self.btn_save_snapshot.setEnabled(False)
+        self.label_results_info.setText("Saving snapshot...")
+    
+    def on_snapshot_saved(self, filename, row_count, size, save_time):
+        """Handle a saved snapshot"""
+        self.btn_save_snapshot.setEnabled(bool(self.current_results))
+        self.label_results_info.setText(
+            f"Snapshot saved - {row_count:,} rows, {size / 1024 / 1024:.1f} MB in {save_time:.1f}s")
+    
+    def on_snapshot_error(self, error_message):
+        """Handle a failed snapshot save"""
+        self.btn_save_snapshot.setEnabled(bool(self.current_results))
+        self.label_results_info.setText("Saving snapshot failed")
+        QMessageBox.critical(self, "Snapshot Error", f"Failed to save snapshot:\n{error_message}")
+    
+    def open_snapshot(self):
+        """Show the rows of a snapshot file in the grid (memory-mapped, rows decoded on demand)"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Open Results Snapshot", "", f"Query Snapshots (*{SNAPSHOT_EXTENSION});;All Files (*)"
+        )
+        if filename:
+            self.load_snapshot(filename)
+    
+    def load_snapshot(self, filename):
+        """Open a snapshot file and show it in the grid"""
+        start_time = time.time()
+        try:
+            snapshot = ResultSnapshot(filename)
+        except Exception as e:
+            QMessageBox.critical(self, "Snapshot Error", f"Failed to open snapshot:\n{str(e)}")
+            return
+        
+        # Replace the grid contents before unmapping a previously opened snapshot
+        self.results_model.clear()
+        self.release_snapshot()
+        self.snapshot = snapshot
+        self.current_results = snapshot.rows
+        self.current_headers = snapshot.headers
+        self.last_query = ""
+        self.last_row_count = 0
+        self.populate_results_table(snapshot.rows, snapshot.headers)
+        
+        open_time = time.time() - start_time
+        saved_query = snapshot.metadata.get("query", "")
+        if saved_query:
+            self.text_query.setPlainText(saved_query)
+        created_at = snapshot.metadata.get("created_at", "unknown time")
+        self.label_results_info.setText(f"Snapshot from {created_at} - {snapshot.row_count:,} rows")
+        self.label_execution_time.setText(f"Snapshot opened in {open_time * 1000:.1f} ms")
+        self.label_row_count.setText(f"Rows: {snapshot.row_count}")
+        self.update_ui_state(snapshot.row_count > 0)
+    
+    def release_snapshot(self):
+        """Unmap the snapshot shown before (the grid must no longer reference its rows)"""
+        if self.snapshot is None:
+            return
+        for thread in (self.export_thread, self.snapshot_thread):
+            if thread is not None and thread.isRunning():
+                if isinstance(thread, QueryExportThread):
+                    thread.cancel()
+                thread.wait()
+        self.snapshot.close()
+        self.snapshot = None
+    
+    def closeEvent(self, event):
+        """Handle window close event - stop a running query or export"""
+        if self.query_thread is not None and self.query_thread.isRunning():
+            self.query_thread.cancel()
+            self.query_thread.wait()
+        if self.export_thread is not None and self.export_thread.isRunning():
+            self.export_thread.cancel()
+            self.export_thread.wait()
+        if self.snapshot_thread is not None and self.snapshot_thread.isRunning():
+            self.snapshot_thread.wait()
+        if self.explain_thread is not None and self.explain_thread.isRunning():
+            self.explain_thread.cancel()
+            self.explain_thread.wait()
+        self.results_model.clear()
+        self.release_snapshot()
+        event.accept()
     
     def update_ui_state(self, has_results):
         """Update UI state based on whether we have results"""
         self.btn_export_csv.setEnabled(has_results)
         self.btn_export_excel.setEnabled(has_results)
+        self.btn_save_snapshot.setEnabled(has_results)
     
     def get_sample_queries(self):
         """Return sample queries organized by category"""
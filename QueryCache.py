@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory cache of Query window results.
+Entries are keyed by the normalized SQL text (whitespace and keyword case
+ignored, string literals kept as they are) plus the connection profile,
+expire after a TTL and are evicted least-recently-used once the cache
+holds more than its byte budget.
+
+Entries stored with the change tokens of the tables they read are dropped
+by TableChangeMonitor as soon as one of those tables changes, so they may
+live for the longer tracked TTL.
+
+Settings (AppSetting):
+    query_cache/ttl_seconds         - entry lifetime (default 300)
+    query_cache/tracked_ttl_seconds - lifetime of change-tracked entries (default 3600)
+    query_cache/max_mb              - memory budget (default 256)
+
+using by
+from QueryCache import query_cache, normalize_sql, estimate_row_bytes
+"""
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from AppSetting import app_settings
+
+
+# Quoted parts of a statement, which keep their case and spacing
+_QUOTED_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """Return query with whitespace collapsed and unquoted text lower-cased"""
+    parts = []
+    position = 0
+    for match in _QUOTED_RE.finditer(query):
+        parts.append(_SPACE_RE.sub(" ", query[position:match.start()]).lower())
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_SPACE_RE.sub(" ", query[position:]).lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def estimate_row_bytes(row):
+    """Approximate memory held by one result row"""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+class CachedResult:
+    """One cached result set"""
+
+    def __init__(self, headers, rows, size, execution_time, created_at, versions=None):
+        self.headers = headers
+        self.rows = rows
+        self.size = size
+        self.execution_time = execution_time
+        self.created_at = created_at
+        # {table: change token} when the query started, None when the tables are not tracked
+        self.versions = versions
+        self.hits = 0
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache of result sets bounded by TTL and bytes"""
+
+    DEFAULT_TTL_SECONDS = 300
+    DEFAULT_TRACKED_TTL_SECONDS = 3600
+    DEFAULT_MAX_MB = 256
+
+    def __init__(self, clock=time.monotonic):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+        # None follows the query_cache/* settings; a number overrides them (e.g. in tests)
+        self.ttl = None
+        self.tracked_ttl = None
+        self.max_mb = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_seconds(self):
+        if self.ttl is not None:
+            return self.ttl
+        return float(app_settings.get_value('query_cache/ttl_seconds', self.DEFAULT_TTL_SECONDS))
+
+    def tracked_ttl_seconds(self):
+        if self.tracked_ttl is not None:
+            return self.tracked_ttl
+        return float(app_settings.get_value('query_cache/tracked_ttl_seconds', self.DEFAULT_TRACKED_TTL_SECONDS))
+
+    def max_bytes(self):
+        max_mb = self.max_mb
+        if max_mb is None:
+            max_mb = float(app_settings.get_value('query_cache/max_mb', self.DEFAULT_MAX_MB))
+        return int(max_mb * 1024 * 1024)
+
+    @staticmethod
+    def make_key(query, profile):
+        return (normalize_sql(query), profile)
+
+    def age(self, entry):
+        """Seconds since entry was stored"""
+        return self._clock() - entry.created_at
+
+    def get(self, query, profile):
+        """Return the CachedResult of query on profile, or None if missing or expired"""
+        key = self.make_key(query, profile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.created_at > self.entry_ttl(entry):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def entry_ttl(self, entry):
+        """Lifetime of entry - longer when its tables are checked for changes"""
+        return self.ttl_seconds() if entry.versions is None else self.tracked_ttl_seconds()
+
+    def put(self, query, profile, headers, rows, size, execution_time, versions=None):
+        """
+        Store a complete result set; returns False if it is larger than the whole budget.
+
+        versions ({table: change token} read before the query ran) lets the
+        entry be invalidated when one of its tables changes.
+        """
+        max_bytes = self.max_bytes()
+        if size > max_bytes:
+            return False
+        key = self.make_key(query, profile)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedResult(headers, rows, size, execution_time, self._clock(), versions)
+            self.total_bytes += size
+            # Evict least recently used entries until the budget fits
+            while self.total_bytes > max_bytes:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, query, profile):
+        """Drop the entry of one query"""
+        with self._lock:
+            self._remove(self.make_key(query, profile))
+
+    def tracked_tables(self):
+        """Return {profile: set of tables} of the change-tracked entries"""
+        with self._lock:
+            tables = {}
+            for (_, profile), entry in self._entries.items():
+                if entry.versions:
+                    tables.setdefault(profile, set()).update(entry.versions)
+            return tables
+
+    def invalidate_changed(self, profile, versions):
+        """Drop the entries of profile whose tables no longer have the tokens in versions"""
+        with self._lock:
+            changed = [key for key, entry in self._entries.items()
+                       if key[1] == profile and entry.versions
+                       and any(versions.get(table) != token for table, token in entry.versions.items())]
+            for key in changed:
+                self._remove(key)
+            return len(changed)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+
+query_cache = QueryResultCache()
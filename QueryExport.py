@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+File writers for exporting query results straight from a streaming cursor.
+Rows are written in chunks as they arrive, so an export needs constant
+memory however many rows the query returns. Each writer writes to a
+temporary ".part" file that only replaces the target when the export
+completes. Excel files are written with a write-only openpyxl workbook,
+keeping the database types (numbers, dates) of each cell.
+
+using by
+from QueryExport import open_export_writer, is_read_only_query, is_streamable_query
+"""
+import csv
+import datetime
+import decimal
+import os
+import re
+
+
+# Rows handed to a writer at a time
+EXPORT_CHUNK_SIZE = 5000
+
+# Statements that only read data and can safely be re-executed for an export
+READ_ONLY_KEYWORDS = ("select", "with", "show", "describe", "desc", "explain", "values", "table")
+
+# Read-only statements a server-side cursor can stream (a psycopg2 named
+# cursor DECLAREs the statement, which only takes SELECT and VALUES)
+STREAMING_KEYWORDS = ("select", "with", "values")
+
+
+# Comments and quoted text, blanked (keeping positions) before looking for keywords
+_QUOTED_RE = re.compile(r"--[^\n]*|#[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.|'')*'|\"[^\"]*\"|`[^`]*`", re.DOTALL)
+_PARENTHESES_RE = re.compile(r"\([^()]*\)")
+# Statement keywords: the first one at the top level of a WITH is its main statement
+_STATEMENT_RE = re.compile(r"\b(select|insert|update|delete|merge|replace|values|table)\b", re.IGNORECASE)
+# Data-modifying statements inside a CTE body (SELECT ... FOR UPDATE only locks)
+_MODIFYING_RE = re.compile(r"\b(insert|delete|merge)\b|(?<!\bfor\s)(?<!\bkey\s)\bupdate\b", re.IGNORECASE)
+
+
+def blank_quoted(query):
+    """Return query with comments and quoted text blanked out (same length)"""
+    return _QUOTED_RE.sub(lambda match: " " * len(match.group(0)), query)
+
+
+def top_level_sql(query):
+    """Return query with comments, quoted text and parenthesized parts blanked out (same length)"""
+    blanked = blank_quoted(query)
+    while True:
+        reduced = _PARENTHESES_RE.sub(lambda match: " " * len(match.group(0)), blanked)
+        if reduced == blanked:
+            return blanked
+        blanked = reduced
+
+
+def first_keyword(query):
+    """Return the first keyword of query in lower case (comments and opening parentheses are skipped)"""
+    stripped = re.sub(r"^(\s*(--[^\n]*(\n|$)|/\*.*?\*/))*", "", query, flags=re.DOTALL).lstrip(" \t\r\n(")
+    match = re.match(r"[a-zA-Z]+", stripped)
+    return match.group(0).lower() if match else ""
+
+
+def is_read_only_query(query):
+    """
+    Return True if query starts with a read-only keyword (comments are
+    skipped). A WITH must be followed by a SELECT/VALUES/TABLE and its CTEs
+    must not modify data (PostgreSQL WITH d AS (DELETE ... RETURNING *)).
+    """
+    keyword = first_keyword(query)
+    if keyword != "with":
+        return keyword in READ_ONLY_KEYWORDS
+    if _MODIFYING_RE.search(blank_quoted(query)):
+        return False
+    main_statement = _STATEMENT_RE.search(top_level_sql(query))
+    return main_statement is not None and main_statement.group(1).lower() in READ_ONLY_KEYWORDS
+
+
+def is_streamable_query(query):
+    """Return True for a read-only SELECT-shaped query that can be fetched with a server-side cursor"""
+    return is_read_only_query(query) and first_keyword(query) in STREAMING_KEYWORDS
+
+
+class CsvExportWriter:
+    """Writes rows to a UTF-8 CSV file (with BOM so Excel detects Thai text)"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.temp_filename = filename + ".part"
+        self._file = open(self.temp_filename, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+
+    def write_header(self, headers):
+        self._writer.writerow(headers)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        """Finish the file and move it to its final name"""
+        self._file.close()
+        os.replace(self.temp_filename, self.filename)
+
+    def abort(self):
+        """Discard the partly written file"""
+        self._file.close()
+        try:
+            os.remove(self.temp_filename)
+        except OSError:
+            pass
+
+
+class XlsxExportWriter:
+    """Writes rows to an Excel workbook, starting a new sheet at the Excel row limit"""
+
+    # Rows per sheet in Excel, including the header row
+    MAX_SHEET_ROWS = 1048576
+    # Characters per cell in Excel
+    MAX_CELL_LENGTH = 32767
+    SHEET_TITLE = "Results"
+
+    def __init__(self, filename):
+        # Imported here so the Query window opens without openpyxl installed
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        self.filename = filename
+        self.temp_filename = filename + ".part"
+        self._illegal_characters = ILLEGAL_CHARACTERS_RE
+        # Write-only: rows go straight to a temporary file instead of being kept per cell
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._headers = []
+        self.sheet_count = 0
+
+    def write_header(self, headers):
+        self._headers = list(headers)
+        self._add_sheet()
+
+    def _add_sheet(self):
+        """Start a new sheet with the header row"""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        self.sheet_count += 1
+        title = self.SHEET_TITLE if self.sheet_count == 1 else f"{self.SHEET_TITLE} {self.sheet_count}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.freeze_panes = "A2"
+
+        header_cells = []
+        for header in self._headers:
+            cell = WriteOnlyCell(self._sheet, value=self._cell_value(header))
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        self._sheet.append(header_cells)
+        self._sheet_rows = 1
+
+    def _cell_value(self, value):
+        """Convert a database value to a type openpyxl writes as a typed cell"""
+        if value is None or isinstance(value, (bool, int, float, decimal.Decimal)):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).decode("utf-8", errors="replace")
+        if isinstance(value, str):
+            return self._illegal_characters.sub("", value)[:self.MAX_CELL_LENGTH]
+        if isinstance(value, (datetime.datetime, datetime.time)) and value.tzinfo is not None:
+            # Excel has no time zones
+            return value.replace(tzinfo=None)
+        if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+            return value
+        # UUIDs, JSON columns and other driver types
+        return self._cell_value(str(value))
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._sheet_rows >= self.MAX_SHEET_ROWS:
+                self._add_sheet()
+            self._sheet.append([self._cell_value(value) for value in row])
+            self._sheet_rows += 1
+
+    def close(self):
+        """Save the workbook and move it to its final name"""
+        self._workbook.save(self.temp_filename)
+        os.replace(self.temp_filename, self.filename)
+
+    def abort(self):
+        """Discard the workbook (openpyxl removes its temporary sheet files at exit)"""
+        self._workbook = None
+        try:
+            os.remove(self.temp_filename)
+        except OSError:
+            pass
+
+
+# Writer class per file extension
+EXPORT_WRITERS = {
+    ".csv": CsvExportWriter,
+    ".xlsx": XlsxExportWriter,
+}
+
+
+def open_export_writer(filename):
+    """Return a writer for filename chosen by its extension (CSV when unknown)"""
+    extension = os.path.splitext(filename)[1].lower()
+    return EXPORT_WRITERS.get(extension, CsvExportWriter)(filename)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Guardrails for interactive queries from the Query window, so ad-hoc SQL
+cannot tie up the shared HIS server or the client:
+    statement timeout   the server aborts statements running longer
+                        (MySQL MAX_EXECUTION_TIME hint, MariaDB SET STATEMENT
+                        max_statement_time, PostgreSQL SET LOCAL statement_timeout)
+    row limit           unbounded SELECTs get a LIMIT; the user can fetch all
+    result size cap     fetching stops once the loaded rows reach the cap
+
+Profile settings (saved by HisConSetting, read through DbEngine.get_settings):
+    statement_timeout      - seconds, 0 = no timeout (default 120)
+    row_limit              - rows, 0 = no automatic LIMIT (default 5000)
+    max_result_mb          - MB of fetched rows, 0 = no cap (default 256)
+    max_concurrent_queries - queries running at once on the server from all
+                             Query tabs, 0 = no limit (default 3, see DbEngine.query_slot)
+DbEngine.get_settings fills in the defaults for a profile saved before these
+settings existed, so every saved profile is guarded unless a value is set
+to 0. A settings dict built by hand (tests, exports) without the keys runs
+unguarded.
+
+using by
+from QueryGuard import QueryGuard
+"""
+import re
+
+from sqlalchemy import text
+
+from QueryExport import is_read_only_query, top_level_sql
+
+
+DEFAULT_STATEMENT_TIMEOUT = 120
+DEFAULT_ROW_LIMIT = 5000
+DEFAULT_MAX_RESULT_MB = 256
+DEFAULT_MAX_CONCURRENT_QUERIES = 3
+
+_SELECT_RE = re.compile(r"\bselect\b", re.IGNORECASE)
+# A statement with one of these at the top level is bounded or cannot take a trailing LIMIT
+_NO_LIMIT_RE = re.compile(r"\b(?:limit|fetch\s+(?:first|next)|into|for\s+update|for\s+share|lock\s+in\s+share\s+mode)\b",
+                          re.IGNORECASE)
+
+
+def is_unbounded_select(query):
+    """Return True for a SELECT (or WITH ... SELECT) without a top-level LIMIT"""
+    if not is_read_only_query(query):
+        return False
+    top_level = top_level_sql(query.strip().rstrip(";"))
+    first_word = top_level.split(None, 1)[0].lower() if top_level.strip() else ""
+    if first_word not in ("select", "with"):
+        return False
+    return _SELECT_RE.search(top_level) is not None and _NO_LIMIT_RE.search(top_level) is None
+
+
+def add_limit(query, limit):
+    """Append LIMIT to query (on its own line, so a trailing comment cannot swallow it)"""
+    return f"{query.strip().rstrip(';').rstrip()}\nLIMIT {int(limit)}"
+
+
+def add_mysql_timeout_hint(query, milliseconds):
+    """Add a MAX_EXECUTION_TIME hint after the main SELECT keyword (MySQL only times out SELECTs)"""
+    if "/*+" in query:
+        # Hints already given by the user are kept as they are
+        return query
+    match = _SELECT_RE.search(top_level_sql(query))
+    if match is None:
+        return query
+    return f"{query[:match.end()]} /*+ MAX_EXECUTION_TIME({int(milliseconds)}) */{query[match.end():]}"
+
+
+class QueryGuard:
+    """Statement timeout, automatic row limit and result size cap of a connection profile"""
+
+    def __init__(self, statement_timeout=0, row_limit=0, max_result_mb=0):
+        self.statement_timeout = statement_timeout
+        self.row_limit = row_limit
+        self.max_result_mb = max_result_mb
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create the guard of a profile from DbEngine.get_settings() (missing keys = off)"""
+        return cls(int(settings.get('statement_timeout') or 0), int(settings.get('row_limit') or 0),
+                   int(settings.get('max_result_mb') or 0))
+
+    @property
+    def max_result_bytes(self):
+        return self.max_result_mb * 1024 * 1024
+
+    def row_limit_for(self, query):
+        """Return the LIMIT to apply to query, or 0 if it is bounded or not a SELECT"""
+        return self.row_limit if self.row_limit and is_unbounded_select(query) else 0
+
+    def prepare(self, connection, query, row_limit=0):
+        """
+        Return the statement to execute on connection for query: with
+        row_limit + 1 rows fetched (the extra row shows more rows exist) and
+        the statement timeout of connection's dialect.
+        """
+        if row_limit:
+            query = add_limit(query, row_limit + 1)
+        if not self.statement_timeout:
+            return query
+
+        dialect = connection.dialect
+        milliseconds = self.statement_timeout * 1000
+        if dialect.name == 'mysql':
+            if getattr(dialect, 'is_mariadb', False):
+                return f"SET STATEMENT max_statement_time={int(self.statement_timeout)} FOR {query}"
+            return add_mysql_timeout_hint(query, milliseconds)
+        if dialect.name == 'postgresql':
+            # Ends with the transaction, so the pooled connection keeps its default
+            connection.execute(text(f"SET LOCAL statement_timeout = {int(milliseconds)}"))
+        return query
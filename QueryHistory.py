@@ -0,0 +1,159 @@
+import sys
+import time
+from datetime import datetime
+
+from PyQt6.QtWidgets import QDialog, QApplication, QMessageBox
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+from QueryHistory_ui import QueryHistory_ui
+from QueryHistoryStore import query_history
+
+
+# Seconds covered by each entry of the "Period" combo box (None = all history)
+PERIODS = [24 * 3600, 7 * 24 * 3600, 30 * 24 * 3600, None]
+
+
+def format_bytes(size):
+    """Format a byte count for display"""
+    if size is None:
+        return ""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def one_line(sql, length=200):
+    """First part of a statement on a single line"""
+    text = " ".join(sql.split())
+    return text if len(text) <= length else text[:length - 3] + "..."
+
+
+class QueryHistory(QDialog, QueryHistory_ui):
+    """Searchable history of executed statements and their execution time statistics"""
+
+    # Statement chosen with "Use Query" or a double click
+    query_selected = pyqtSignal(str)
+
+    HISTORY_HEADERS = ["Started", "Time (s)", "Rows", "Fetched", "Profile", "SQL", "Error"]
+    SLOWEST_HEADERS = ["p95 (s)", "p50 (s)", "Max (s)", "Runs", "Total (s)", "Last Run", "Statement"]
+
+    # Delay before searching while the user types
+    SEARCH_DELAY_MS = 250
+
+    def __init__(self, parent=None, store=None):
+        super().__init__(parent)
+        self.setupUi(self)
+        self.store = store or query_history
+
+        self.history_model = QStandardItemModel(0, len(self.HISTORY_HEADERS), self)
+        self.history_model.setHorizontalHeaderLabels(self.HISTORY_HEADERS)
+        self.table_history.setModel(self.history_model)
+
+        self.slowest_model = QStandardItemModel(0, len(self.SLOWEST_HEADERS), self)
+        self.slowest_model.setHorizontalHeaderLabels(self.SLOWEST_HEADERS)
+        self.table_slowest.setModel(self.slowest_model)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+
+        self.setup_connections()
+        self.refresh()
+
+    def setup_connections(self):
+        """Connect UI signals to their handlers"""
+        self.edit_search.textChanged.connect(self.search_timer.start)
+        self.search_timer.timeout.connect(self.load_history)
+        self.combo_period.currentIndexChanged.connect(self.load_slowest)
+        self.tabs.currentChanged.connect(self.update_buttons)
+        self.table_history.selectionModel().selectionChanged.connect(self.update_buttons)
+        self.table_slowest.selectionModel().selectionChanged.connect(self.update_buttons)
+        self.table_history.doubleClicked.connect(self.use_selected_query)
+        self.table_slowest.doubleClicked.connect(self.use_selected_query)
+        self.btn_use_query.clicked.connect(self.use_selected_query)
+        self.btn_clear_history.clicked.connect(self.clear_history)
+        self.btn_close.clicked.connect(self.close)
+
+    def refresh(self):
+        """Reload both views from the store"""
+        self.load_history()
+        self.load_slowest()
+
+    def load_history(self):
+        """Show the newest statements matching the search text"""
+        search_text = self.edit_search.text().strip()
+        entries = self.store.search(search_text)
+        self.history_model.removeRows(0, self.history_model.rowCount())
+        for entry in entries:
+            values = [format_time(entry.started_at), f"{entry.execution_time:.3f}",
+                      "" if entry.row_count is None else str(entry.row_count), format_bytes(entry.bytes_fetched),
+                      entry.profile, one_line(entry.sql), entry.error or ""]
+            self.history_model.appendRow(self.create_row(values, entry.sql))
+            if entry.error:
+                for column in range(len(values)):
+                    self.history_model.item(self.history_model.rowCount() - 1, column).setForeground(Qt.GlobalColor.red)
+        self.table_history.resizeColumnsToContents()
+        matched = f" matching '{search_text}'" if search_text else ""
+        self.label_history_info.setText(f"{len(entries)} statements{matched}")
+        self.update_buttons()
+
+    def load_slowest(self):
+        """Show per-statement statistics of the selected period, slowest p95 first"""
+        period = PERIODS[self.combo_period.currentIndex()]
+        since = time.time() - period if period is not None else None
+        self.slowest_model.removeRows(0, self.slowest_model.rowCount())
+        for stats in self.store.slowest_statements(since=since):
+            values = [f"{stats.p95:.3f}", f"{stats.p50:.3f}", f"{stats.max_time:.3f}", str(stats.runs),
+                      f"{stats.total_time:.1f}", format_time(stats.last_run), one_line(stats.sql)]
+            self.slowest_model.appendRow(self.create_row(values, stats.sql))
+        self.table_slowest.resizeColumnsToContents()
+        self.update_buttons()
+
+    def create_row(self, values, sql):
+        """Create read-only items, keeping the full statement on the first one"""
+        row = []
+        for value in values:
+            item = QStandardItem(value)
+            item.setEditable(False)
+            row.append(item)
+        row[0].setData(sql, Qt.ItemDataRole.UserRole)
+        return row
+
+    def selected_query(self):
+        """Return the full SQL of the selected row of the current tab, or None"""
+        table = self.table_history if self.tabs.currentIndex() == 0 else self.table_slowest
+        rows = table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return table.model().index(rows[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+
+    def update_buttons(self):
+        self.btn_use_query.setEnabled(self.selected_query() is not None)
+
+    def use_selected_query(self):
+        """Send the selected statement to the query editor"""
+        sql = self.selected_query()
+        if sql:
+            self.query_selected.emit(sql)
+
+    def clear_history(self):
+        """Delete the whole history after confirmation"""
+        reply = QMessageBox.question(self, "Clear History", "Delete the whole query history?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.store.clear()
+            self.refresh()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = QueryHistory()
+    window.show()
+    sys.exit(app.exec())
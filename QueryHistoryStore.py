@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent history of the statements executed in the Query window.
+Every server execution is stored in a local SQLite database with its SQL
+text, connection profile (password masked), start time, execution time,
+row count, bytes fetched and error. The history can be searched, and
+slowest_statements() groups successful runs by normalized statement with
+their p50/p95 execution time to find the reports that load the server most.
+
+using by
+from QueryHistoryStore import query_history
+"""
+import math
+import os
+import sqlite3
+import threading
+from itertools import groupby
+
+from QueryCache import normalize_sql
+
+
+class HistoryEntry:
+    """One executed statement"""
+
+    def __init__(self, entry_id, sql, profile, started_at, execution_time, row_count, bytes_fetched, error):
+        self.id = entry_id
+        self.sql = sql
+        self.profile = profile
+        self.started_at = started_at
+        self.execution_time = execution_time
+        self.row_count = row_count
+        self.bytes_fetched = bytes_fetched
+        self.error = error
+
+
+class StatementStats:
+    """Execution time statistics of one normalized statement"""
+
+    def __init__(self, normalized_sql, sql, runs, p50, p95, max_time, total_time, last_run):
+        self.normalized_sql = normalized_sql
+        # Most recent original text of the statement
+        self.sql = sql
+        self.runs = runs
+        self.p50 = p50
+        self.p95 = p95
+        self.max_time = max_time
+        self.total_time = total_time
+        self.last_run = last_run
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class QueryHistoryStore:
+    """SQLite-backed query history (thread-safe, opened on first use)"""
+
+    # Oldest entries are deleted beyond this many
+    MAX_ENTRIES = 20000
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS query_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sql TEXT NOT NULL,
+            normalized_sql TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            execution_time REAL NOT NULL,
+            row_count INTEGER,
+            bytes_fetched INTEGER,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS query_history_normalized ON query_history (normalized_sql);
+        CREATE INDEX IF NOT EXISTS query_history_started ON query_history (started_at);
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".plk_super_app", "query_history.db")
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Return the open database connection, creating the file and schema if needed"""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def record(self, sql, profile, started_at, execution_time, row_count=None, bytes_fetched=None, error=None):
+        """Add one execution; returns False (after logging) if the history could not be written"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    cursor = connection.execute(
+                        "INSERT INTO query_history (sql, normalized_sql, profile, started_at, execution_time, "
+                        "row_count, bytes_fetched, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (sql, normalize_sql(sql), profile, started_at, execution_time, row_count,
+                         bytes_fetched, error))
+                    connection.execute("DELETE FROM query_history WHERE id <= ?",
+                                       (cursor.lastrowid - self.MAX_ENTRIES,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Could not record query history: {str(e)}")
+            return False
+
+    def search(self, text="", limit=500):
+        """Return the newest entries whose SQL, profile or error contain text"""
+        query = ("SELECT id, sql, profile, started_at, execution_time, row_count, bytes_fetched, error "
+                 "FROM query_history")
+        params = []
+        if text:
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            query += (" WHERE sql LIKE ? ESCAPE '\\' OR profile LIKE ? ESCAPE '\\' "
+                      "OR error LIKE ? ESCAPE '\\'")
+            params = [pattern, pattern, pattern]
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def slowest_statements(self, limit=50, since=None):
+        """
+        Return StatementStats of the successful runs (started after since, a
+        time.time() value) grouped by normalized statement, slowest p95 first.
+        """
+        query = ("SELECT normalized_sql, sql, execution_time, started_at FROM query_history "
+                 "WHERE error IS NULL")
+        params = []
+        if since is not None:
+            query += " AND started_at >= ?"
+            params.append(since)
+        query += " ORDER BY normalized_sql, started_at"
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+
+        stats = []
+        for normalized_sql, group in groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            times = sorted(row[2] for row in group)
+            stats.append(StatementStats(normalized_sql, group[-1][1], len(times), percentile(times, 0.5),
+                                        percentile(times, 0.95), times[-1], sum(times), group[-1][3]))
+
+        stats.sort(key=lambda item: item.p95, reverse=True)
+        return stats[:limit]
+
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM query_history")
+
+    def close(self):
+        """Close the database (it is reopened on the next use)"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+query_history = QueryHistoryStore()
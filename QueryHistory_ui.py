@@ -0,0 +1,114 @@
+import sys
+
+from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableView,
+                             QTabWidget, QWidget, QComboBox, QDialog, QApplication)
+
+
+class QueryHistory_ui(object):
+    """
+    UI class for the Query history dialog.
+    """
+
+    TABLE_STYLE = """
+        QTableView {
+            gridline-color: #d0d0d0;
+            background-color: white;
+        }
+        QHeaderView::section {
+            background-color: #f8f9fa;
+            border: 1px solid #dee2e6;
+            padding: 5px;
+            font-weight: bold;
+        }
+    """
+
+    def setupUi(self, QueryHistory_ui):
+        """
+        Set up the user interface for the Query history dialog.
+        """
+        QueryHistory_ui.setWindowTitle("Query History")
+        QueryHistory_ui.setMinimumSize(900, 500)
+
+        main_layout = QVBoxLayout(QueryHistory_ui)
+        main_layout.setSpacing(10)
+        main_layout.setContentsMargins(10, 10, 10, 10)
+
+        self.tabs = QTabWidget()
+        self.create_history_tab()
+        self.create_slowest_tab()
+        main_layout.addWidget(self.tabs)
+
+        # Dialog buttons
+        button_layout = QHBoxLayout()
+
+        # Copies the selected statement into the query editor
+        self.btn_use_query = QPushButton("Use Query")
+        self.btn_use_query.setEnabled(False)
+
+        self.btn_clear_history = QPushButton("Clear History")
+
+        self.btn_close = QPushButton("Close")
+
+        button_layout.addWidget(self.btn_use_query)
+        button_layout.addStretch()
+        button_layout.addWidget(self.btn_clear_history)
+        button_layout.addWidget(self.btn_close)
+        main_layout.addLayout(button_layout)
+
+    def create_history_tab(self):
+        """Create the searchable list of executed statements"""
+        history_tab = QWidget()
+        history_layout = QVBoxLayout(history_tab)
+
+        self.edit_search = QLineEdit()
+        self.edit_search.setPlaceholderText("Search SQL, profile or error...")
+        self.edit_search.setClearButtonEnabled(True)
+
+        self.table_history = QTableView()
+        self.table_history.setAlternatingRowColors(True)
+        self.table_history.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_history.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table_history.setStyleSheet(self.TABLE_STYLE)
+
+        self.label_history_info = QLabel("")
+        self.label_history_info.setStyleSheet("color: #6c757d; font-style: italic;")
+
+        history_layout.addWidget(self.edit_search)
+        history_layout.addWidget(self.table_history)
+        history_layout.addWidget(self.label_history_info)
+
+        self.tabs.addTab(history_tab, "History")
+
+    def create_slowest_tab(self):
+        """Create the per-statement execution time statistics"""
+        slowest_tab = QWidget()
+        slowest_layout = QVBoxLayout(slowest_tab)
+
+        period_layout = QHBoxLayout()
+        period_label = QLabel("Period:")
+        self.combo_period = QComboBox()
+        self.combo_period.addItems(["Last 24 hours", "Last 7 days", "Last 30 days", "All"])
+        self.combo_period.setCurrentIndex(1)
+        period_layout.addWidget(period_label)
+        period_layout.addWidget(self.combo_period)
+        period_layout.addStretch()
+
+        self.table_slowest = QTableView()
+        self.table_slowest.setAlternatingRowColors(True)
+        self.table_slowest.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_slowest.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table_slowest.setStyleSheet(self.TABLE_STYLE)
+
+        slowest_layout.addLayout(period_layout)
+        slowest_layout.addWidget(self.table_slowest)
+
+        self.tabs.addTab(slowest_tab, "Slowest Queries")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    dialog = QDialog()
+    ui = QueryHistory_ui()
+    ui.setupUi(dialog)
+    dialog.show()
+    sys.exit(app.exec())
@@ -0,0 +1,96 @@
+import sys
+
+from PyQt6.QtWidgets import QDialog, QApplication, QTreeWidgetItem
+from PyQt6.QtGui import QColor, QFont
+
+from QueryPlan_ui import QueryPlan_ui
+from ExplainPlan import plan_warnings
+
+
+# Row backgrounds of flagged plan nodes
+SEVERE_COLOR = "#f8d7da"
+WARNING_COLOR = "#fff3cd"
+
+# Actual rows this many times off the estimate are shown in bold
+ESTIMATE_ERROR_RATIO = 10
+
+
+def format_rows(rows):
+    if rows is None:
+        return ""
+    return f"{rows:,.0f}" if rows >= 1 or rows == 0 else f"{rows:.2f}"
+
+
+class QueryPlan(QDialog, QueryPlan_ui):
+    """Shows an EXPLAIN plan as a tree with its full scans, filesorts and temporary tables"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+
+        self.btn_expand_all.clicked.connect(self.tree_plan.expandAll)
+        self.btn_close.clicked.connect(self.close)
+
+    def show_plan(self, query, roots, analyzed):
+        """Fill the tree with the plan of query"""
+        mode = "EXPLAIN ANALYZE (statement executed)" if analyzed else "EXPLAIN (estimates only)"
+        self.label_plan_query.setText(f"{mode}: {' '.join(query.split())}")
+
+        self.tree_plan.clear()
+        for root in roots:
+            self.tree_plan.addTopLevelItem(self.create_item(root))
+        self.tree_plan.expandAll()
+        for column in range(self.tree_plan.columnCount() - 1):
+            self.tree_plan.resizeColumnToContents(column)
+
+        warnings = plan_warnings(roots)
+        if not warnings:
+            self.label_plan_summary.setText("No full table scans, filesorts or temporary tables.")
+            self.label_plan_summary.setStyleSheet("color: #28a745; font-weight: bold;")
+            return
+        severe = [f"{warning} on {node.table}" for node, warning, is_severe in warnings if is_severe]
+        other = len(warnings) - len(severe)
+        parts = []
+        if severe:
+            parts.append("Large HOSxP tables: " + ", ".join(dict.fromkeys(severe)))
+        if other:
+            parts.append(f"{other} other warning(s)")
+        self.label_plan_summary.setText("; ".join(parts))
+        color = "#cc0000" if severe else "#856404"
+        self.label_plan_summary.setStyleSheet(f"color: {color}; font-weight: bold;")
+
+    def create_item(self, node):
+        """Create the tree item of a plan node and its children"""
+        item = QTreeWidgetItem([
+            node.operation,
+            node.table or "",
+            format_rows(node.estimated_rows),
+            format_rows(node.actual_rows),
+            "" if node.cost is None else f"{node.cost:,.2f}",
+            ", ".join(node.warnings),
+            node.details,
+        ])
+        if node.warnings:
+            color = QColor(SEVERE_COLOR if node.is_big_table() else WARNING_COLOR)
+            for column in range(item.columnCount()):
+                item.setBackground(column, color)
+            item.setToolTip(0, ", ".join(node.warnings))
+
+        if node.estimated_rows is not None and node.actual_rows is not None:
+            low, high = sorted((max(node.estimated_rows, 1), max(node.actual_rows, 1)))
+            if high / low >= ESTIMATE_ERROR_RATIO:
+                font = QFont()
+                font.setBold(True)
+                item.setFont(3, font)
+                item.setToolTip(3, "Actual rows differ greatly from the estimate - statistics may be stale")
+
+        for child in node.children:
+            item.addChild(self.create_item(child))
+        return item
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = QueryPlan()
+    window.show()
+    sys.exit(app.exec())
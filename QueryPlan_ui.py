@@ -0,0 +1,58 @@
+import sys
+
+from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTreeWidget,
+                             QDialog, QApplication)
+
+
+class QueryPlan_ui(object):
+    """
+    UI class for the query plan dialog.
+    """
+
+    PLAN_HEADERS = ["Operation", "Table", "Est. Rows", "Actual Rows", "Cost", "Warnings", "Details"]
+
+    def setupUi(self, QueryPlan_ui):
+        """
+        Set up the user interface for the query plan dialog.
+        """
+        QueryPlan_ui.setWindowTitle("Query Plan")
+        QueryPlan_ui.setMinimumSize(900, 450)
+
+        main_layout = QVBoxLayout(QueryPlan_ui)
+        main_layout.setSpacing(10)
+        main_layout.setContentsMargins(10, 10, 10, 10)
+
+        # Statement and how the plan was obtained
+        self.label_plan_query = QLabel("")
+        self.label_plan_query.setWordWrap(True)
+        self.label_plan_query.setStyleSheet("color: #495057; font-family: monospace;")
+
+        self.tree_plan = QTreeWidget()
+        self.tree_plan.setColumnCount(len(self.PLAN_HEADERS))
+        self.tree_plan.setHeaderLabels(self.PLAN_HEADERS)
+        self.tree_plan.setAlternatingRowColors(True)
+
+        # Full scans, filesorts and temporary tables found in the plan
+        self.label_plan_summary = QLabel("")
+        self.label_plan_summary.setWordWrap(True)
+
+        button_layout = QHBoxLayout()
+        self.btn_expand_all = QPushButton("Expand All")
+        self.btn_close = QPushButton("Close")
+        button_layout.addWidget(self.btn_expand_all)
+        button_layout.addStretch()
+        button_layout.addWidget(self.btn_close)
+
+        main_layout.addWidget(self.label_plan_query)
+        main_layout.addWidget(self.tree_plan)
+        main_layout.addWidget(self.label_plan_summary)
+        main_layout.addLayout(button_layout)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    dialog = QDialog()
+    ui = QueryPlan_ui()
+    ui.setupUi(dialog)
+    dialog.show()
+    sys.exit(app.exec())
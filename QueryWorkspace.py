@@ -0,0 +1,82 @@
+import sys
+
+from PyQt6.QtWidgets import QWidget, QApplication
+from PyQt6.QtGui import QShortcut, QKeySequence
+
+from QueryWorkspace_ui import QueryWorkspace_ui
+from Query import Query
+
+
+class QueryWorkspace(QWidget, QueryWorkspace_ui):
+    """
+    Tabbed Query window. Every tab is a Query with its own worker thread,
+    pooled connection and results, so a long report can run in one tab
+    while the user keeps working in another. Queries from all tabs share
+    the concurrency limit of their server (DbEngine.query_slot).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+
+        # Numbers the tab titles ("Query 1", "Query 2", ...)
+        self.tab_counter = 0
+
+        self.btn_new_tab.clicked.connect(self.new_tab)
+        self.tab_queries.tabCloseRequested.connect(self.close_tab)
+        QShortcut(QKeySequence("Ctrl+T"), self, self.new_tab)
+        QShortcut(QKeySequence("Ctrl+W"), self, lambda: self.close_tab(self.tab_queries.currentIndex()))
+
+        self.new_tab()
+
+    def new_tab(self):
+        """Open a new Query tab and make it current"""
+        self.tab_counter += 1
+        query = Query(self)
+        query.setProperty("tab_title", f"Query {self.tab_counter}")
+        query.running_changed.connect(lambda running, query=query: self.update_tab_title(query, running))
+        index = self.tab_queries.addTab(query, query.property("tab_title"))
+        self.tab_queries.setCurrentIndex(index)
+        query.text_query.setFocus()
+        return query
+
+    def queries(self):
+        """Return the Query widgets of all tabs"""
+        return [self.tab_queries.widget(index) for index in range(self.tab_queries.count())]
+
+    def current_query(self):
+        return self.tab_queries.currentWidget()
+
+    def update_tab_title(self, query, running):
+        """Mark the tabs with a running query"""
+        index = self.tab_queries.indexOf(query)
+        if index < 0:
+            return
+        title = query.property("tab_title")
+        self.tab_queries.setTabText(index, f"{title} (running)" if running else title)
+        self.tab_queries.setTabToolTip(index, " ".join(query.last_query.split())[:200])
+
+    def close_tab(self, index):
+        """Close a tab, cancelling its running query; the last tab is replaced by an empty one"""
+        query = self.tab_queries.widget(index)
+        if query is None:
+            return
+        # Query.closeEvent cancels the query and waits for its workers
+        query.close()
+        self.tab_queries.removeTab(index)
+        query.deleteLater()
+        if self.tab_queries.count() == 0:
+            self.new_tab()
+
+    def closeEvent(self, event):
+        """Stop the queries of all tabs"""
+        for query in self.queries():
+            query.close()
+        event.accept()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = QueryWorkspace()
+    window.show()
+    sys.exit(app.exec())
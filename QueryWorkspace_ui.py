@@ -0,0 +1,41 @@
+import sys
+
+from PyQt6.QtWidgets import QVBoxLayout, QTabWidget, QToolButton, QWidget, QApplication
+
+
+class QueryWorkspace_ui(object):
+    """
+    UI class for the tabbed query workspace.
+    """
+
+    def setupUi(self, QueryWorkspace_ui):
+        """
+        Set up the user interface for the query workspace.
+        """
+        QueryWorkspace_ui.setWindowTitle("Database Query Tool")
+
+        main_layout = QVBoxLayout(QueryWorkspace_ui)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+
+        # One Query tab per independent query (own worker and connection)
+        self.tab_queries = QTabWidget()
+        self.tab_queries.setTabsClosable(True)
+        self.tab_queries.setMovable(True)
+        self.tab_queries.setDocumentMode(True)
+
+        self.btn_new_tab = QToolButton()
+        self.btn_new_tab.setText("+")
+        self.btn_new_tab.setToolTip("New query tab (Ctrl+T)")
+        self.btn_new_tab.setAutoRaise(True)
+        self.tab_queries.setCornerWidget(self.btn_new_tab)
+
+        main_layout.addWidget(self.tab_queries)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    widget = QWidget()
+    ui = QueryWorkspace_ui()
+    ui.setupUi(widget)
+    widget.show()
+    sys.exit(app.exec())
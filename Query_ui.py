@@ -1,7 +1,7 @@
 import sys
 
 from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QWidget, QLabel, 
-                             QTextEdit, QPushButton, QTableWidget, QTableWidgetItem,
+                             QTextEdit, QPushButton, QTableView, QCheckBox,
                              QSplitter, QComboBox, QLineEdit, QGroupBox, QApplication)
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
@@ -100,6 +100,18 @@ class Query_ui(object):
             }
         """)
         
+        # Stops the running query on the server
+        self.btn_cancel_query = QPushButton("Cancel")
+        self.btn_cancel_query.setMaximumWidth(100)
+        self.btn_cancel_query.setEnabled(False)
+        
+        # Shows the execution plan of the query
+        self.btn_explain = QPushButton("Explain")
+        self.btn_explain.setMaximumWidth(80)
+        
+        # Run the statement to get actual row counts (EXPLAIN ANALYZE)
+        self.check_explain_analyze = QCheckBox("Analyze")
+        
         # Clear button
         self.btn_clear = QPushButton("Clear")
         self.btn_clear.setMaximumWidth(80)
@@ -108,9 +120,21 @@ class Query_ui(object):
         self.btn_samples = QPushButton("Sample Queries")
         self.btn_samples.setMaximumWidth(120)
         
+        # Executed statements and their timing statistics
+        self.btn_history = QPushButton("History")
+        self.btn_history.setMaximumWidth(80)
+        
         button_layout.addWidget(self.btn_execute)
+        button_layout.addWidget(self.btn_cancel_query)
+        button_layout.addWidget(self.btn_explain)
+        button_layout.addWidget(self.check_explain_analyze)
         button_layout.addWidget(self.btn_clear)
+        # Always query the server, even when a cached result exists
+        self.check_bypass_cache = QCheckBox("Bypass cache")
+        
         button_layout.addWidget(self.btn_samples)
+        button_layout.addWidget(self.btn_history)
+        button_layout.addWidget(self.check_bypass_cache)
         button_layout.addStretch()
         
         query_layout.addWidget(self.text_query)
@@ -123,16 +147,25 @@ class Query_ui(object):
         results_group = QGroupBox("Query Results")
         results_layout = QVBoxLayout(results_group)
         
+        # Filters the loaded rows without re-running the query
+        self.edit_filter = QLineEdit()
+        self.edit_filter.setPlaceholderText("Filter loaded rows...")
+        self.edit_filter.setClearButtonEnabled(True)
+        
         # Results table
-        self.table_results = QTableWidget()
+        self.table_results = QTableView()
         self.table_results.setAlternatingRowColors(True)
-        self.table_results.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table_results.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        # Header clicks sort the loaded rows locally (a third click restores the query order)
+        self.table_results.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table_results.horizontalHeader().setSortIndicatorClearable(True)
+        self.table_results.setSortingEnabled(True)
         self.table_results.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 background-color: white;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007bff;
                 color: white;
             }
@@ -153,15 +186,36 @@ class Query_ui(object):
         self.btn_export_excel = QPushButton("Export to Excel")
         self.btn_export_excel.setMaximumWidth(120)
         
+        # Re-runs the query and streams every row to a file
+        self.btn_export_query = QPushButton("Export Query to File")
+        self.btn_export_query.setMaximumWidth(160)
+        
+        # Columnar snapshot of the loaded results
+        self.btn_save_snapshot = QPushButton("Save Snapshot")
+        self.btn_save_snapshot.setMaximumWidth(120)
+        
+        self.btn_open_snapshot = QPushButton("Open Snapshot")
+        self.btn_open_snapshot.setMaximumWidth(120)
+        
+        # Re-runs a query cut by the automatic row limit without the limit
+        self.btn_fetch_all = QPushButton("Fetch All Rows")
+        self.btn_fetch_all.setMaximumWidth(120)
+        self.btn_fetch_all.setVisible(False)
+        
         # Results info label
         self.label_results_info = QLabel("No query executed")
         self.label_results_info.setStyleSheet("color: #6c757d; font-style: italic;")
         
         export_layout.addWidget(self.btn_export_csv)
         export_layout.addWidget(self.btn_export_excel)
+        export_layout.addWidget(self.btn_export_query)
+        export_layout.addWidget(self.btn_save_snapshot)
+        export_layout.addWidget(self.btn_open_snapshot)
         export_layout.addStretch()
         export_layout.addWidget(self.label_results_info)
+        export_layout.addWidget(self.btn_fetch_all)
         
+        results_layout.addWidget(self.edit_filter)
         results_layout.addWidget(self.table_results)
         results_layout.addLayout(export_layout)
         
@@ -175,11 +229,16 @@ class Query_ui(object):
         self.label_execution_time = QLabel("Execution time: --")
         self.label_execution_time.setStyleSheet("color: #6c757d;")
         
+        # Result cache hit/miss indicator
+        self.label_cache_status = QLabel("Cache: --")
+        self.label_cache_status.setStyleSheet("color: #6c757d;")
+        
         # Row count
         self.label_row_count = QLabel("Rows: 0")
         self.label_row_count.setStyleSheet("color: #6c757d;")
         
         status_layout.addWidget(self.label_execution_time)
+        status_layout.addWidget(self.label_cache_status)
         status_layout.addStretch()
         status_layout.addWidget(self.label_row_count)
         
@@ -191,10 +250,20 @@ class Query_ui(object):
         """
         Query_ui.setWindowTitle("Database Query Tool")
         self.btn_execute.setText("Execute Query")
+        self.btn_cancel_query.setText("Cancel")
+        self.btn_explain.setText("Explain")
+        self.check_explain_analyze.setText("Analyze")
         self.btn_clear.setText("Clear")
         self.btn_samples.setText("Sample Queries")
+        self.btn_history.setText("History")
+        self.check_bypass_cache.setText("Bypass cache")
         self.btn_export_csv.setText("Export to CSV")
         self.btn_export_excel.setText("Export to Excel")
+        self.btn_export_query.setText("Export Query to File")
+        self.btn_save_snapshot.setText("Save Snapshot")
+        self.btn_fetch_all.setText("Fetch All Rows")
+        self.edit_filter.setPlaceholderText("Filter loaded rows...")
+        self.btn_open_snapshot.setText("Open Snapshot")
         self.btn_refresh.setText("Refresh")
 
 
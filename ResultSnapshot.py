@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar snapshot files (.qsnap) for query results.
+Each column is stored as one contiguous buffer (fixed-width numbers and
+dates, or offsets + UTF-8 text, dictionary-encoded when the column has few
+distinct values) with an optional null bitmap, followed by a JSON footer.
+Opening a snapshot only reads the footer and memory-maps the file; rows are
+decoded when the grid asks for them, so a multi-million-row extract opens
+instantly.
+
+File layout:
+    MAGIC (8 bytes) | footer offset (uint64) | footer length (uint64)
+    column buffers, each aligned to 8 bytes
+    footer (JSON: headers, row count, column types and buffer positions)
+
+using by
+from ResultSnapshot import write_snapshot, ResultSnapshot
+"""
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+
+MAGIC = b"PLKSNAP1"
+HEADER = struct.Struct("<8sQQ")
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = ".qsnap"
+
+# A text column is dictionary-encoded when it has at most this many distinct
+# values and they repeat (at most half as many distinct values as rows)
+MAX_DICTIONARY_SIZE = 65536
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class SnapshotError(Exception):
+    """The file is not a snapshot this version can read"""
+
+
+def _column_type(values):
+    """Return the storage type of a column from the Python types of its values"""
+    kinds = {type(value) for value in values if value is not None}
+    if not kinds:
+        return "string"
+    if kinds <= {int, bool}:
+        if all(-2 ** 63 <= value < 2 ** 63 for value in values if value is not None):
+            return "int64"
+        return "string"
+    if kinds <= {int, bool, float}:
+        return "float64"
+    if kinds == {datetime.date}:
+        return "date"
+    if kinds == {datetime.datetime} and all(value.tzinfo is None for value in values if value is not None):
+        return "datetime"
+    # Decimal, time, bytes etc. keep their text form
+    return "string"
+
+
+def _text(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return str(value)
+
+
+class _BufferWriter:
+    """Appends aligned buffers to the snapshot file and records their position"""
+
+    def __init__(self, snapshot_file):
+        self.file = snapshot_file
+
+    def write(self, data):
+        position = self.file.tell()
+        padding = -position % 8
+        if padding:
+            self.file.write(b"\0" * padding)
+            position += padding
+        self.file.write(data)
+        return [position, len(data)]
+
+    def write_text(self, texts):
+        """Write offsets + UTF-8 data of a list of strings"""
+        offsets = array("Q", [0])
+        chunks = []
+        total = 0
+        for value in texts:
+            encoded = value.encode("utf-8")
+            chunks.append(encoded)
+            total += len(encoded)
+            offsets.append(total)
+        return {"offsets": self.write(offsets.tobytes()), "data": self.write(b"".join(chunks))}
+
+
+def _null_bitmap(values):
+    """Return the validity bitmap (bit set = not null), or None when there are no nulls"""
+    if all(value is not None for value in values):
+        return None
+    bitmap = bytearray((len(values) + 7) // 8)
+    for index, value in enumerate(values):
+        if value is not None:
+            bitmap[index >> 3] |= 1 << (index & 7)
+    return bytes(bitmap)
+
+
+def write_snapshot(filename, headers, rows, metadata=None):
+    """
+    Write rows (a sequence of row sequences) as a columnar snapshot.
+
+    metadata (e.g. the query text) is stored in the footer. Returns the
+    size of the file in bytes. The file is written to a temporary name and
+    only replaces filename when complete.
+    """
+    row_count = len(rows)
+    # An opened snapshot (SnapshotRows) decodes one column at a time instead of every row per column
+    column_values = getattr(rows, "column_values", None)
+    temp_filename = filename + ".part"
+    columns = []
+    try:
+        with open(temp_filename, "wb") as snapshot_file:
+            snapshot_file.write(HEADER.pack(MAGIC, 0, 0))
+            buffers = _BufferWriter(snapshot_file)
+
+            for col_idx, header in enumerate(headers):
+                if column_values is not None:
+                    values = column_values(col_idx)
+                else:
+                    values = [row[col_idx] if col_idx < len(row) else None for row in rows]
+                column_type = _column_type(values)
+                column = {"name": str(header), "type": column_type}
+                bitmap = _null_bitmap(values)
+                if bitmap is not None:
+                    column["validity"] = buffers.write(bitmap)
+
+                if column_type == "int64":
+                    column["values"] = buffers.write(
+                        array("q", [0 if value is None else int(value) for value in values]).tobytes())
+                elif column_type == "float64":
+                    column["values"] = buffers.write(
+                        array("d", [0.0 if value is None else float(value) for value in values]).tobytes())
+                elif column_type == "date":
+                    column["values"] = buffers.write(
+                        array("i", [0 if value is None else value.toordinal() for value in values]).tobytes())
+                elif column_type == "datetime":
+                    column["values"] = buffers.write(
+                        array("q", [0 if value is None else (value - EPOCH) // datetime.timedelta(microseconds=1)
+                                    for value in values]).tobytes())
+                else:
+                    texts = ["" if value is None else _text(value) for value in values]
+                    distinct = {}
+                    for value in texts:
+                        if value not in distinct:
+                            distinct[value] = len(distinct)
+                            if len(distinct) > MAX_DICTIONARY_SIZE:
+                                break
+                    if len(distinct) <= MAX_DICTIONARY_SIZE and len(distinct) * 2 <= row_count:
+                        column["type"] = "dictionary"
+                        column["dictionary"] = buffers.write_text(list(distinct))
+                        column["values"] = buffers.write(array("I", [distinct[value] for value in texts]).tobytes())
+                    else:
+                        column.update(buffers.write_text(texts))
+                columns.append(column)
+                del values
+
+            footer = json.dumps({
+                "version": SNAPSHOT_VERSION,
+                "byteorder": sys.byteorder,
+                "headers": [str(header) for header in headers],
+                "row_count": row_count,
+                "columns": columns,
+                "metadata": metadata or {},
+            }, ensure_ascii=False).encode("utf-8")
+            footer_offset = snapshot_file.tell()
+            snapshot_file.write(footer)
+            snapshot_file.seek(0)
+            snapshot_file.write(HEADER.pack(MAGIC, footer_offset, len(footer)))
+        size = os.path.getsize(temp_filename)
+        os.replace(temp_filename, filename)
+        return size
+    except Exception:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        raise
+
+
+class _Column:
+    """Decodes the values of one column from the memory-mapped buffers"""
+
+    def __init__(self, view, spec):
+        self.type = spec["type"]
+        self.validity = self._slice(view, spec.get("validity"))
+        if self.type in ("string", "dictionary"):
+            text_spec = spec if self.type == "string" else spec["dictionary"]
+            self.offsets = self._slice(view, text_spec["offsets"]).cast("Q")
+            self.data = self._slice(view, text_spec["data"])
+        value_format = {"int64": "q", "float64": "d", "date": "i", "datetime": "q", "dictionary": "I"}.get(self.type)
+        self.values = self._slice(view, spec["values"]).cast(value_format) if value_format else None
+        self._dictionary = None
+
+    @staticmethod
+    def _slice(view, position):
+        if position is None:
+            return None
+        start, length = position
+        return view[start:start + length]
+
+    def _text(self, index):
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def value(self, index):
+        if self.validity is not None and not self.validity[index >> 3] & (1 << (index & 7)):
+            return None
+        if self.type == "string":
+            return self._text(index)
+        if self.type == "dictionary":
+            if self._dictionary is None:
+                self._dictionary = [self._text(code) for code in range(len(self.offsets) - 1)]
+            return self._dictionary[self.values[index]]
+        value = self.values[index]
+        if self.type == "date":
+            return datetime.date.fromordinal(value)
+        if self.type == "datetime":
+            return EPOCH + datetime.timedelta(microseconds=value)
+        return value
+
+    def release(self):
+        for buffer in (self.validity, getattr(self, "offsets", None), getattr(self, "data", None), self.values):
+            if buffer is not None:
+                buffer.release()
+
+
+class SnapshotRows:
+    """Read-only sequence of the rows of a snapshot (usable as a ResultTableModel buffer)"""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return self._snapshot.row_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("snapshot row index out of range")
+        return self._snapshot.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._snapshot.row(index)
+
+    def column_values(self, column):
+        """Return all values of one column (decodes only that column, for sorting and filtering)"""
+        return self._snapshot.column_values(column)
+
+
+class ResultSnapshot:
+    """A memory-mapped snapshot file"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError("Empty snapshot file")
+        self._view = memoryview(self._mmap)
+        try:
+            magic, footer_offset, footer_length = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise SnapshotError("Not a query result snapshot")
+            footer = json.loads(bytes(self._view[footer_offset:footer_offset + footer_length]).decode("utf-8"))
+            if footer.get("version") != SNAPSHOT_VERSION or footer.get("byteorder") != sys.byteorder:
+                raise SnapshotError("Snapshot was written by an incompatible version")
+            self.headers = footer["headers"]
+            self.row_count = footer["row_count"]
+            self.metadata = footer.get("metadata", {})
+            self._columns = [_Column(self._view, spec) for spec in footer["columns"]]
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            self.close()
+            raise SnapshotError(f"Corrupt snapshot: {str(e)}")
+        except SnapshotError:
+            self.close()
+            raise
+        self.rows = SnapshotRows(self)
+
+    def row(self, index):
+        """Return row index as a tuple"""
+        return tuple(column.value(index) for column in self._columns)
+
+    def column_values(self, column):
+        """Return the values of column for every row"""
+        decoder = self._columns[column]
+        return [decoder.value(index) for index in range(self.row_count)]
+
+    def close(self):
+        """Unmap the file (rows can no longer be read)"""
+        for column in getattr(self, "_columns", []):
+            column.release()
+        self._columns = []
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+            self._file.close()
@@ -0,0 +1,419 @@
+import sys
+import bisect
+import datetime
+import decimal
+
+from PyQt6.QtWidgets import QApplication, QTableView
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def sort_key(value):
+    """
+    Return a key ordering values of any type: NULLs first, then numbers,
+    dates and times, text (case-insensitive) and anything else as text.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (bool, int, float, decimal.Decimal)):
+        if value != value:
+            # NaN does not compare; put it after the numbers
+            return (2, 0)
+        return (1, value)
+    if isinstance(value, datetime.datetime):
+        return (3, value.replace(tzinfo=None))
+    if isinstance(value, datetime.date):
+        return (3, datetime.datetime(value.year, value.month, value.day))
+    if isinstance(value, datetime.time):
+        return (4, value.replace(tzinfo=None))
+    if isinstance(value, datetime.timedelta):
+        return (5, value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return (7, bytes(value))
+    return (6, str(value).casefold())
+
+
+# Column value types that compare directly (no sort_key needed)
+_NUMBER_TYPES = {bool, int, float, decimal.Decimal}
+_DIRECT_TYPES = [{datetime.date}, {datetime.datetime}, {datetime.time}, {datetime.timedelta}]
+
+
+def _value_keys(values):
+    """Return comparable keys for the non-NULL values of a column, converting only mixed columns"""
+    types = set(map(type, values))
+    if types <= _NUMBER_TYPES and not (float in types and any(value != value for value in values)):
+        return values
+    if types == {str}:
+        return [value.casefold() for value in values]
+    if types in _DIRECT_TYPES:
+        return values
+    return [sort_key(value) for value in values]
+
+
+def column_ranks(values):
+    """
+    Return the dense rank of each value (equal values share a rank, NULLs
+    rank 0), so sorting by a column becomes sorting small integers.
+    """
+    if any(value is None for value in values):
+        present = [index for index, value in enumerate(values) if value is not None]
+        ranks = [0] * len(values)
+        for index, rank in zip(present, column_ranks([values[index] for index in present])):
+            ranks[index] = rank + 1
+        return ranks
+
+    keys = _value_keys(values)
+    try:
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+    except TypeError:
+        # e.g. naive and timezone-aware datetimes in one column
+        keys = [sort_key(value) for value in values]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+    ranks = [0] * len(keys)
+    rank = 0
+    previous = None
+    for position, index in enumerate(order):
+        key = keys[index]
+        if position and key != previous:
+            rank += 1
+        ranks[index] = rank
+        previous = key
+    return ranks
+
+
+class ViewRows:
+    """Read-only sequence of buffer rows in display order (rows are read on access)"""
+
+    def __init__(self, rows, order):
+        self._rows = rows
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, index):
+        return self._rows[self._order[index]]
+
+    def __iter__(self):
+        rows = self._rows
+        return (rows[index] for index in self._order)
+
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a row buffer.
+
+    The buffer is any sequence of row sequences (a list of lists, or a lazy
+    buffer that implements __len__ and __getitem__). Rows are exposed to the
+    view in pages through canFetchMore/fetchMore, and cell text is only built
+    when the view asks for a visible cell.
+
+    Sorting and filtering work on the loaded buffer without re-querying:
+    the view shows a permutation of buffer row indexes. The rank of every
+    value of a column is computed once per buffer (column_ranks), after
+    which any single or multi-column sort is a stable sort of integers.
+    A buffer may provide column_values(column) to read one column faster.
+    Rows appended while a sort is active are shown after the sorted rows
+    until refresh_view() sorts once loading finishes.
+    """
+
+    FETCH_BATCH_SIZE = 1000
+    # Columns remembered as tie-breakers when sorting by header clicks
+    MAX_SORT_COLUMNS = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers = []
+        self._rows = []
+        self._loaded_rows = 0
+        # Buffer row indexes in display order (None = buffer order, unfiltered)
+        self._order = None
+        # [(column, ascending)], most significant first
+        self._sort_columns = []
+        self._filter_text = ""
+        self._filter_column = None
+        # Per-buffer caches: column -> ranks, and the lower-cased text of each row
+        self._ranks = {}
+        self._row_texts = None
+        # Rows were appended to a sorted view since the last apply_view
+        self._view_pending = False
+
+    def set_results(self, rows, headers):
+        """Replace the buffer and headers, exposing only the first page (any sort or filter is cleared)"""
+        self.beginResetModel()
+        self._headers = list(headers)
+        self._rows = rows
+        self._order = None
+        self._sort_columns = []
+        self._filter_text = ""
+        self._filter_column = None
+        self._ranks = {}
+        self._row_texts = None
+        self._view_pending = False
+        self._loaded_rows = min(len(rows), self.FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """
+        Append rows to a list buffer (used while a query is still streaming).
+
+        Rows are exposed right away until the first page is full; after that
+        they are picked up by fetchMore as the user scrolls. With a sort or
+        filter active, new rows are filtered and added after the displayed
+        rows; re-sorting the whole buffer for every batch would make a
+        streamed load quadratic, so call refresh_view() when loading ends.
+        """
+        if not rows:
+            return
+        start = len(self._rows)
+        self._rows.extend(rows)
+        if self._order is not None:
+            # The ranks and texts no longer cover the buffer
+            self._ranks = {}
+            self._row_texts = None
+            self._order.extend(index for index, row in enumerate(rows, start) if self._row_matches(row))
+            self._view_pending = bool(self._sort_columns)
+        visible = min(self.view_row_count(), max(self._loaded_rows, self.FETCH_BATCH_SIZE))
+        if visible > self._loaded_rows:
+            self.beginInsertRows(QModelIndex(), self._loaded_rows, visible - 1)
+            self._loaded_rows = visible
+            self.endInsertRows()
+
+    def clear(self):
+        """Remove all rows and headers"""
+        self.set_results([], [])
+
+    def headers(self):
+        """Return the column headers"""
+        return self._headers
+
+    def rows(self):
+        """Return the full row buffer (including rows not yet fetched by the view)"""
+        return self._rows
+
+    def view_rows(self):
+        """Return the rows as displayed: sorted and filtered (the buffer itself when neither is active)"""
+        if self._order is None:
+            return self._rows
+        return ViewRows(self._rows, list(self._order))
+
+    def total_row_count(self):
+        """Return the number of rows in the buffer"""
+        return len(self._rows)
+
+    def view_row_count(self):
+        """Return the number of rows passing the filter"""
+        return len(self._rows) if self._order is None else len(self._order)
+
+    def buffer_row(self, view_row):
+        """Return the buffer index of a displayed row"""
+        return view_row if self._order is None else self._order[view_row]
+
+    def sort_columns(self):
+        """Return the current sort as [(column, ascending)]"""
+        return list(self._sort_columns)
+
+    def is_filtered(self):
+        return bool(self._filter_text)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Sort by column (called by the view on header clicks). The columns
+        sorted before stay as tie-breakers; column -1 removes the sort.
+        """
+        if column < 0 or column >= len(self._headers):
+            if self._sort_columns:
+                self.sort_by([])
+            return
+        previous = [item for item in self._sort_columns if item[0] != column]
+        self.sort_by([(column, order == Qt.SortOrder.AscendingOrder)] + previous[:self.MAX_SORT_COLUMNS - 1])
+
+    def sort_by(self, columns):
+        """Sort by [(column, ascending)], most significant first (stable; [] = buffer order)"""
+        self._sort_columns = [(column, bool(ascending)) for column, ascending in columns]
+        self.apply_view()
+
+    def set_filter(self, text, column=None):
+        """Show only rows containing text (case-insensitive) in column, or in any column if None"""
+        self._filter_text = text.strip().casefold()
+        self._filter_column = column
+        self.apply_view()
+
+    def refresh_view(self):
+        """Sort the rows appended since the last sort into place (call when loading finishes)"""
+        if self._view_pending:
+            self.apply_view()
+
+    def apply_view(self):
+        """Recompute the displayed row order from the filter and sort"""
+        indexes = range(len(self._rows))
+        if self._filter_text:
+            needle = self._filter_text
+            texts = self._column_texts(self._filter_column) if self._filter_column is not None \
+                else self._all_row_texts()
+            indexes = [index for index in indexes if needle in texts[index]]
+
+        if self._sort_columns:
+            # One integer per row: the ranks of the sort columns combined most significant first
+            keys = None
+            for column, ascending in self._sort_columns:
+                ranks = self._column_ranks(column)
+                top = max(ranks, default=0)
+                if not ascending:
+                    ranks = [top - rank for rank in ranks]
+                keys = ranks if keys is None else [key * (top + 1) + rank for key, rank in zip(keys, ranks)]
+            indexes = sorted(indexes, key=keys.__getitem__)
+
+        self.beginResetModel()
+        self._order = list(indexes) if self._filter_text or self._sort_columns else None
+        self._view_pending = False
+        self._loaded_rows = min(self.view_row_count(), max(self._loaded_rows, self.FETCH_BATCH_SIZE))
+        self.endResetModel()
+
+    def _row_matches(self, row):
+        """Return True if a buffer row passes the filter"""
+        if not self._filter_text:
+            return True
+        if self._filter_column is not None:
+            cells = [row[self._filter_column] if self._filter_column < len(row) else None]
+        else:
+            cells = row
+        return any(cell is not None and self._filter_text in str(cell).casefold() for cell in cells)
+
+    def _column_values(self, column):
+        column_values = getattr(self._rows, "column_values", None)
+        if column_values is not None:
+            return column_values(column)
+        return [row[column] if column < len(row) else None for row in self._rows]
+
+    def _column_ranks(self, column):
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            ranks = self._ranks[column] = column_ranks(self._column_values(column))
+        return ranks
+
+    def _column_texts(self, column):
+        return ["" if value is None else str(value).casefold() for value in self._column_values(column)]
+
+    def _all_row_texts(self):
+        if self._row_texts is None:
+            # Cells are joined with a separator that cannot be typed into the filter
+            columns = [self._column_texts(column) for column in range(len(self._headers))]
+            self._row_texts = ["\x1f".join(cells) for cells in zip(*columns)] if columns else []
+        return self._row_texts
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        """Remove displayed rows from a list buffer"""
+        if parent.isValid() or count <= 0 or row < 0 or row + count > self._loaded_rows \
+                or not isinstance(self._rows, list):
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        removed = sorted((self.buffer_row(view_row) for view_row in range(row, row + count)), reverse=True)
+        for index in removed:
+            del self._rows[index]
+        if self._order is not None:
+            # Shift the buffer indexes of the remaining rows down past the removed ones
+            del self._order[row:row + count]
+            removed.reverse()
+            self._order = [index - bisect.bisect_left(removed, index) for index in self._order]
+        self._ranks = {}
+        self._row_texts = None
+        self._loaded_rows -= count
+        self.endRemoveRows()
+        return True
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            row_data = self._rows[self.buffer_row(index.row())]
+            if index.column() >= len(row_data):
+                return ""
+            value = row_data[index.column()]
+            return "" if value is None else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            if 0 <= section < len(self._headers):
+                return str(self._headers[section])
+            return None
+        # Row numbers of the buffer, so sorted rows keep their original number
+        if 0 <= section < self.view_row_count():
+            return str(self.buffer_row(section) + 1)
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded_rows < self.view_row_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        remaining = self.view_row_count() - self._loaded_rows
+        batch = min(remaining, self.FETCH_BATCH_SIZE)
+        if batch <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + batch - 1)
+        self._loaded_rows += batch
+        self.endInsertRows()
+
+
+def sample_row_indexes(row_count, sample_size):
+    """Return up to sample_size row indexes spread evenly over row_count rows"""
+    if row_count <= sample_size:
+        return range(row_count)
+    step = row_count / sample_size
+    return sorted({int(i * step) for i in range(sample_size)} | {row_count - 1})
+
+
+def resize_columns_to_sample(table_view, sample_size=200, max_width=400, padding=24):
+    """
+    Size the columns of table_view from a sample of rows.
+
+    resizeColumnsToContents() measures every loaded cell; for large results
+    that is the slowest part of showing a query. Measuring an evenly spaced
+    sample of the buffer gives the same widths for typical HIS data at a
+    fixed cost.
+    """
+    model = table_view.model()
+    if model is None or model.columnCount() == 0:
+        return
+
+    rows = model.rows()
+    headers = model.headers()
+    metrics = table_view.fontMetrics()
+    header_metrics = table_view.horizontalHeader().fontMetrics()
+    indexes = sample_row_indexes(len(rows), sample_size)
+
+    for col_idx, header in enumerate(headers):
+        width = header_metrics.horizontalAdvance(str(header))
+        for row_idx in indexes:
+            row_data = rows[row_idx]
+            if col_idx < len(row_data) and row_data[col_idx] is not None:
+                width = max(width, metrics.horizontalAdvance(str(row_data[col_idx])))
+        table_view.setColumnWidth(col_idx, min(width + padding, max_width))
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    view = QTableView()
+    model = ResultTableModel(view)
+    model.set_results([[i, f"Row {i}", i * 2] for i in range(100000)], ["ID", "Name", "Value"])
+    view.setModel(model)
+    resize_columns_to_sample(view)
+    view.resize(600, 400)
+    view.show()
+    sys.exit(app.exec())
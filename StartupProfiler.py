@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Startup profiler for the Login -> Main launch path.
+Records per-phase timings and the cost of every module import (like
+python -X importtime) and writes them to a JSON report.
+
+Enable with the environment variable APP_PROFILE_STARTUP (set it to 1 or
+to a report path) or the command line flag --profile-startup[=path].
+When disabled every call is a no-op.
+
+using by
+from StartupProfiler import startup_profiler
+with startup_profiler.phase("main.setupUi"):
+    ...
+"""
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from importlib.abc import MetaPathFinder
+
+
+ENV_VAR = "APP_PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+DEFAULT_REPORT_PATH = "startup_profile.json"
+
+
+class _TimedLoader:
+    """Loader proxy that times module creation and execution"""
+
+    def __init__(self, loader, recorder, name):
+        self._loader = loader
+        self._recorder = recorder
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+    def create_module(self, spec):
+        # Extension modules (PyQt6, drivers) do their work in create_module
+        self._recorder.begin(self._name)
+        if not hasattr(self._loader, "create_module"):
+            return None
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._recorder.end(self._name)
+            raise
+
+    def exec_module(self, module):
+        # Hand the module its real loader so nothing else sees the proxy
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._recorder.end(self._name)
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Meta path finder recording the self and cumulative import time of each
+    module, in the same terms as python -X importtime.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self._local = threading.local()
+        self._installed = False
+
+    def install(self):
+        """Start timing imports"""
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self):
+        """Stop timing imports"""
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    def find_spec(self, fullname, path=None, target=None):
+        """Find the spec with the other finders and wrap its loader"""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self, fullname)
+            return spec
+        return None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name):
+        """Mark the start of loading a module (nested imports go on a stack)"""
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def end(self, name):
+        """Mark the end of loading a module and record its times"""
+        stack = self._stack()
+        if not stack or stack[-1][0] != name:
+            return
+        _, start_time, child_time = stack.pop()
+        cumulative = time.perf_counter() - start_time
+        if stack:
+            stack[-1][2] += cumulative
+        self.records[name] = {
+            "self_ms": (cumulative - child_time) * 1000,
+            "cumulative_ms": cumulative * 1000,
+            "depth": len(stack),
+        }
+
+
+class StartupProfiler:
+    """Collects startup phases and import times, and writes the JSON report"""
+
+    def __init__(self, report_path=None):
+        self.enabled = report_path is not None
+        self.report_path = report_path
+        self.start_time = time.perf_counter()
+        self.phases = []
+        self.marks = {}
+        self.finished = False
+        self.import_timer = ImportTimer()
+        if self.enabled:
+            self.import_timer.install()
+
+    @classmethod
+    def from_environment(cls, argv=None, environ=None):
+        """Create a profiler enabled by the APP_PROFILE_STARTUP variable or the --profile-startup flag"""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+
+        report_path = None
+        env_value = environ.get(ENV_VAR, "").strip()
+        if env_value and env_value.lower() not in ("0", "false", "no"):
+            report_path = DEFAULT_REPORT_PATH if env_value.lower() in ("1", "true", "yes") else env_value
+
+        for arg in list(argv):
+            if arg == CLI_FLAG or arg.startswith(CLI_FLAG + "="):
+                report_path = arg.partition("=")[2] or DEFAULT_REPORT_PATH
+                # Keep the flag away from QApplication and the modules
+                argv.remove(arg)
+        return cls(report_path)
+
+    def elapsed_ms(self):
+        """Milliseconds since the profiler started"""
+        return (time.perf_counter() - self.start_time) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as a named phase (repeated phases are summed in the report)"""
+        if not self.enabled:
+            yield
+            return
+        start_ms = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, "start_ms": start_ms, "duration_ms": self.elapsed_ms() - start_ms})
+
+    def mark(self, name):
+        """Record a milestone (e.g. "main.interactive") at the current time"""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = self.elapsed_ms()
+
+    def get_report(self, top_imports=50):
+        """Return the report as a dict"""
+        phase_totals = {}
+        for record in self.phases:
+            total = phase_totals.setdefault(record["name"], {"name": record["name"], "calls": 0, "total_ms": 0.0,
+                                                             "first_start_ms": record["start_ms"]})
+            total["calls"] += 1
+            total["total_ms"] += record["duration_ms"]
+
+        imports = [dict(module=name, **times) for name, times in self.import_timer.records.items()]
+        imports.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+        top_level = [item for item in imports if item["depth"] == 0]
+
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "qt_platform": os.environ.get("QT_QPA_PLATFORM", ""),
+            "total_ms": self.elapsed_ms(),
+            "marks": dict(sorted(self.marks.items(), key=lambda item: item[1])),
+            "phases": sorted(phase_totals.values(), key=lambda item: item["first_start_ms"]),
+            "import_total_ms": sum(item["cumulative_ms"] for item in top_level),
+            "import_count": len(imports),
+            "imports": imports[:top_imports],
+        }
+
+    def finish(self):
+        """Stop profiling and write the JSON report; returns the report path or None"""
+        if not self.enabled or self.finished:
+            return None
+        self.finished = True
+        self.import_timer.uninstall()
+
+        report = self.get_report()
+        try:
+            with open(self.report_path, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=2)
+        except Exception as e:
+            print(f"Error writing startup profile: {str(e)}")
+            return None
+
+        print(f"Startup profile written to {self.report_path} "
+              f"({report['total_ms']:.0f} ms total, {report['import_total_ms']:.0f} ms in imports)")
+        return self.report_path
+
+
+startup_profiler = StartupProfiler.from_environment()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Table change detection for cached query results.
+Cached Query results and House pages are tagged with the tables they read
+and the change token of each table when they were read: UPDATE_TIME and
+CHECKSUM from information_schema.TABLES on MySQL/MariaDB, the insert,
+update and delete counters of pg_stat_user_tables on PostgreSQL. A
+background thread re-reads the tokens of the tables in use (one small
+catalog query per profile) and drops exactly the entries whose tables
+changed. Results whose tables have no token (views, CTEs, tables of other
+schemas, SQLite, sample data) keep the plain TTL.
+
+Settings (AppSetting):
+    query_cache/poll_seconds - seconds between change checks (default 15)
+
+using by
+from TableChangeMonitor import table_monitor, extract_tables, read_table_versions
+"""
+import re
+import threading
+
+from sqlalchemy import bindparam, text
+
+from AppSetting import app_settings
+from DbEngine import db_engines
+from QueryCache import query_cache
+
+
+# Comments and quoted literals are blanked before looking for table names
+_IGNORED_RE = re.compile(r"--[^\n]*|#[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.|'')*'", re.DOTALL)
+_IDENT = r'[`"]?[\w$]+[`"]?(?:\.[`"]?[\w$]+[`"]?)?'
+_ALIAS = (r"(?:\s+(?:as\s+)?(?!(?:where|join|inner|left|right|full|cross|natural|straight_join|on|using|"
+          r"group|order|limit|union|having|window|for|lock|into)\b)\w+)?")
+_TABLE_LIST_RE = re.compile(rf"\b(?:from|join)\s+({_IDENT}{_ALIAS}(?:\s*,\s*{_IDENT}{_ALIAS})*)", re.IGNORECASE)
+
+
+def extract_tables(query):
+    """
+    Return the sorted, lower-cased names of the tables after FROM/JOIN in
+    query. Change tokens are read in the current database only, so a query
+    naming any schema-qualified table returns () and keeps the plain TTL.
+    """
+    tables = set()
+    for match in _TABLE_LIST_RE.finditer(_IGNORED_RE.sub(" ", query)):
+        for item in match.group(1).split(","):
+            name = item.split()[0]
+            if "." in name:
+                return ()
+            name = name.strip('`"').lower()
+            if name:
+                tables.add(name)
+    return tuple(sorted(tables))
+
+
+def version_query(dialect_name, tables):
+    """Return the catalog query reading the change tokens of tables, or None if unsupported"""
+    if dialect_name == 'mysql':
+        # UPDATE_TIME is kept in memory by InnoDB (NULL until the first change
+        # after a restart); CHECKSUM is only maintained for CHECKSUM=1 tables
+        query = ("SELECT TABLE_NAME, UPDATE_TIME, CHECKSUM FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tables")
+    elif dialect_name == 'postgresql':
+        query = ("SELECT relname, n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables "
+                 "WHERE schemaname = ANY (current_schemas(false)) AND relname IN :tables")
+    else:
+        return None
+    return text(query).bindparams(bindparam('tables', expanding=True))
+
+
+def read_table_versions(connection, tables):
+    """
+    Return {table: change token} for the tables of connection's database.
+
+    Tables without a usable token (missing, views, NULL UPDATE_TIME) are left
+    out, and None is returned when the dialect has no change counters.
+    """
+    dialect = connection.dialect
+    statement = version_query(dialect.name, tables)
+    if statement is None or not tables:
+        return None
+
+    if dialect.name == 'mysql' and not getattr(dialect, 'is_mariadb', False) \
+            and (dialect.server_version_info or ()) >= (8,):
+        # MySQL 8 caches information_schema statistics for a day by default
+        connection.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+
+    versions = {}
+    for row in connection.execute(statement, {'tables': list(tables)}):
+        name = str(row[0]).lower()
+        if all(value is None for value in row[1:]):
+            continue
+        token = "|".join("" if value is None else str(value) for value in row[1:])
+        # The same name in several schemas on the search path changes with any of them
+        versions[name] = versions[name] + "," + token if name in versions else token
+    return versions
+
+
+class TableWatch:
+    """A subscription to changes of some tables of one profile"""
+
+    def __init__(self, profile, versions, callback):
+        self.profile = profile
+        self.versions = dict(versions)
+        self.callback = callback
+
+
+class TableChangeMonitor:
+    """Polls the change tokens of cached tables and invalidates changed results"""
+
+    DEFAULT_POLL_SECONDS = 15
+
+    def __init__(self, cache, engine_lookup=None, version_reader=read_table_versions):
+        """
+        engine_lookup(profile) returns the pooled engine of a profile already
+        in use (None skips the profile); version_reader(connection, tables)
+        reads the current tokens.
+        """
+        self.cache = cache
+        self.engine_lookup = engine_lookup or db_engines.engine_for_profile
+        self.version_reader = version_reader
+        # None follows the query_cache/poll_seconds setting; a number overrides it
+        self.poll_interval = None
+        self._watches = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def poll_seconds(self):
+        if self.poll_interval is not None:
+            return self.poll_interval
+        return float(app_settings.get_value('query_cache/poll_seconds', self.DEFAULT_POLL_SECONDS))
+
+    def watch(self, profile, versions, callback):
+        """Call callback() once any table of versions ({table: token}) changes"""
+        table_watch = TableWatch(profile, versions, callback)
+        with self._lock:
+            self._watches.append(table_watch)
+        return table_watch
+
+    def unwatch(self, table_watch):
+        with self._lock:
+            if table_watch in self._watches:
+                self._watches.remove(table_watch)
+
+    def poll_once(self):
+        """Check every profile in use once; returns the number of invalidated entries and watches"""
+        tables_by_profile = self.cache.tracked_tables()
+        with self._lock:
+            watches = list(self._watches)
+        for table_watch in watches:
+            tables_by_profile.setdefault(table_watch.profile, set()).update(table_watch.versions)
+
+        invalidated = 0
+        for profile, tables in tables_by_profile.items():
+            engine = self.engine_lookup(profile)
+            if engine is None:
+                continue
+            try:
+                with engine.connect() as connection:
+                    versions = self.version_reader(connection, sorted(tables))
+                    # End the read so PostgreSQL does not keep its statistics snapshot
+                    connection.rollback()
+            except Exception as e:
+                print(f"Table change check failed: {str(e)}")
+                continue
+            if versions is None:
+                continue
+
+            invalidated += self.cache.invalidate_changed(profile, versions)
+            for table_watch in watches:
+                if table_watch.profile != profile:
+                    continue
+                if any(versions.get(table) != token for table, token in table_watch.versions.items()):
+                    table_watch.versions = {table: versions.get(table) for table in table_watch.versions}
+                    invalidated += 1
+                    try:
+                        table_watch.callback()
+                    except Exception as e:
+                        print(f"Table change callback failed: {str(e)}")
+        return invalidated
+
+    def start(self):
+        """Start the background poller (does nothing if it is already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            # The interval is read here because the settings are not used from the poller thread
+            self._thread = threading.Thread(target=self._run, args=(self.poll_seconds(),),
+                                            name="TableChangeMonitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background poller"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._thread = None
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.poll_once()
+
+
+table_monitor = TableChangeMonitor(query_cache)
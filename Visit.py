@@ -3,17 +3,51 @@ import sys
 from PyQt6.QtWidgets import QWidget, QMessageBox, QApplication
 
 from Visit_ui import Visit_ui
+from DbPerform import DbPerform
+from PagedTable import PagedTable
 
-class Visit(QWidget, Visit_ui):
+
+# Visit data sources for different HIS systems, in priority order:
+# (select columns, table, unique key column used for keyset paging)
+VISIT_SOURCES = [
+    # HOSXP ovst (OPD visit) table
+    ("vn as visit_id, hn as patient_id, '' as patient_name, vstdate, vsttime, doctor, main_dep as department, '' as reason, '' as status, '' as notes", "ovst", "vn"),
+    
+    # JHCIS visit table
+    ("visitno as visit_id, pid as patient_id, '' as patient_name, visitdate, timestart, '' as doctor, '' as department, symptoms as reason, '' as status, '' as notes", "visit", "visitno"),
+]
+
+# AppSetting key prefix for the cached probe result of each database fingerprint
+PROBE_CACHE_KEY = "visit_probe_cache"
+
+
+class Visit(QWidget, Visit_ui, PagedTable):
+    VISIT_HEADERS = ["Visit ID", "Patient ID", "Patient Name", "Visit Date", "Visit Time", "Doctor", "Department", "Reason", "Status", "Notes"]
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setupUi(self)
         
+        # Initialize database performance class
+        self.db = DbPerform()
+        
         # Connect button signals
         self.add_button.clicked.connect(self.add_visit)
         self.edit_button.clicked.connect(self.edit_visit)
         self.delete_button.clicked.connect(self.delete_visit)
         self.refresh_button.clicked.connect(self.refresh_data)
+        
+        # Page through the visit table (keyset paging on the visit key)
+        self.setup_paging(self.visit_table, self.VISIT_HEADERS, VISIT_SOURCES, PROBE_CACHE_KEY)
+        
+        # Load visit data on startup (in the background); sample data stays
+        # visible if no database is configured
+        self.load_table_data()
+    
+    def closeEvent(self, event):
+        """Handle window close event - cancel a running load"""
+        self.cancel_loading()
+        event.accept()
     
     def add_visit(self):
         """
@@ -53,11 +87,11 @@ class Visit(QWidget, Visit_ui):
     
     def refresh_data(self):
         """
-        Handle refresh button click.
+        Handle refresh button click - reload data from database.
         """
-        # Re-setup the table model with fresh data
-        self.setup_table_model()
-        QMessageBox.information(self, "Refresh", "Data refreshed successfully.")
+        # Reload data from database; the result is reported when loading finishes
+        self.refresh_requested = True
+        self.load_table_data()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
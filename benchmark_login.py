@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Headless end-to-end login benchmark against the local FakeAuthServer.
+
+Each run creates a Login window (offscreen Qt), lets it complete the
+authorize -> token -> provider token -> profile flow against the fake
+server, opens Main and measures the time until Main is shown. Reports
+p50/p95 time-to-Main and the latency of each login step.
+
+usage:
+python benchmark_login.py --runs 20 --latency 150 --jitter 50
+python benchmark_login.py --runs 20 --cached          # repeat logins from the credential cache
+python benchmark_login.py --runs 20 --direct          # fetch the auth code without the web view
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+from urllib.parse import urlparse, parse_qs
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import requests
+
+from FakeAuthServer import FakeAuthServer
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def configure_auth(server):
+    """Point config_auth.AUTH_CONFIG at the fake server (created if there is no config_auth.py)"""
+    try:
+        from config_auth import AUTH_CONFIG
+    except ImportError:
+        module = types.ModuleType("config_auth")
+        module.AUTH_CONFIG = {
+            "HEALTH_CLIENT_ID": "benchmark",
+            "HEALTH_CLIENT_SECRET": "benchmark",
+            "PROVIDER_CLIENT_ID": "benchmark",
+            "PROVIDER_CLIENT_SECRET": "benchmark",
+        }
+        sys.modules["config_auth"] = module
+        AUTH_CONFIG = module.AUTH_CONFIG
+    AUTH_CONFIG.update(server.auth_config())
+    return AUTH_CONFIG
+
+
+def fetch_auth_code(auth_config):
+    """Follow the authorize redirect without a browser and return the code"""
+    response = requests.get(auth_config["AUTHORIZE_URL"], params={
+        "client_id": auth_config["HEALTH_CLIENT_ID"],
+        "redirect_uri": auth_config["REDIRECT_URI"],
+        "response_type": "code",
+    }, allow_redirects=False, timeout=30)
+    if response.status_code != 302:
+        raise RuntimeError(f"Authorize failed with HTTP {response.status_code}")
+    return parse_qs(urlparse(response.headers["Location"]).query)["code"][0]
+
+
+def wait_until(app, condition, timeout):
+    """Process events until condition() is true; returns False on timeout"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def run_once(app, login_class, auth_config, direct, timeout):
+    """Drive one login to Main; returns a result dict"""
+    start_time = time.perf_counter()
+    login = login_class()
+    login.show()
+    result = {"success": False}
+
+    try:
+        if direct and login.credentials is None:
+            try:
+                login.handle_auth_code(fetch_auth_code(auth_config))
+            except Exception as e:
+                result["error"] = str(e)
+                return result
+
+        def finished():
+            worker = login.auth_worker
+            return login.btn_start_main_window.isVisibleTo(login) or (worker is not None and worker.isFinished())
+
+        if not wait_until(app, finished, timeout):
+            result["error"] = "timeout"
+            return result
+        # Deliver the worker's last queued signals
+        app.processEvents()
+        if login.hash_cid is None:
+            result["error"] = "login failed"
+            return result
+        result["time_to_profile_ms"] = (time.perf_counter() - start_time) * 1000
+        result["cached"] = login.auth_worker is None
+
+        login.start_main_form()
+        main_window = login.main_window
+        main_window.cancel_auto_quit()
+        if not wait_until(app, lambda: main_window.startup_ready_time is not None, timeout):
+            result["error"] = "Main not shown"
+            return result
+        app.processEvents()
+        result["time_to_main_ms"] = (time.perf_counter() - start_time) * 1000
+        result["steps_ms"] = {str(step): seconds * 1000 for step, seconds in login.auth_step_timings.items()}
+        result["success"] = True
+        main_window.close()
+        main_window.deleteLater()
+        return result
+    finally:
+        login.wait_for_workers()
+        login.close()
+        login.deleteLater()
+        app.processEvents()
+
+
+def stats(values):
+    return {
+        "p50_ms": statistics.median(values),
+        "p95_ms": percentile(values, 0.95),
+        "min_ms": min(values),
+        "max_ms": max(values),
+        "mean_ms": statistics.mean(values),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Login -> Main benchmark against a local fake auth server")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=100, help="fake server delay per request in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="random +/- delay in ms")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of an injected HTTP 500")
+    parser.add_argument("--cached", action="store_true", help="allow the credential cache (runs after the first are cached)")
+    parser.add_argument("--direct", action="store_true", help="fetch the auth code without the web view")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds allowed per run")
+    parser.add_argument("--output", help="write the results JSON here")
+    args = parser.parse_args()
+
+    server = FakeAuthServer(latency_ms=args.latency, jitter_ms=args.jitter, failure_rate=args.failure_rate).start()
+    auth_config = configure_auth(server)
+
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    # Login imports QtWebEngine lazily, after the QApplication exists
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+
+    from CredentialCache import credential_cache
+    credential_cache.cache_dir = tempfile.mkdtemp(prefix="login_bench_")
+    credential_cache.enabled = args.cached
+
+    from Login import Login
+
+    results = []
+    for run in range(args.runs):
+        result = run_once(app, Login, auth_config, args.direct, args.timeout)
+        results.append(result)
+        if result["success"]:
+            source = "cache" if result["cached"] else "network"
+            print(f"Run {run + 1}/{args.runs}: {result['time_to_main_ms']:.0f} ms to Main ({source})")
+        else:
+            print(f"Run {run + 1}/{args.runs}: failed ({result.get('error')})")
+    server.stop()
+
+    succeeded = [result for result in results if result["success"]]
+    summary = {
+        "runs": args.runs,
+        "succeeded": len(succeeded),
+        "latency_ms": args.latency,
+        "jitter_ms": args.jitter,
+        "failure_rate": args.failure_rate,
+        "cached": args.cached,
+        "direct": args.direct,
+        "server_requests": server.request_counts,
+        "server_failures": server.failure_counts,
+        # False when every run logged in from the cache without starting Chromium
+        "web_engine_imported": "PyQt6.QtWebEngineWidgets" in sys.modules,
+    }
+    if succeeded:
+        summary["time_to_main"] = stats([result["time_to_main_ms"] for result in succeeded])
+        summary["time_to_profile"] = stats([result["time_to_profile_ms"] for result in succeeded])
+        step_names = {"2": "token", "3": "provider_token", "4": "provider_profile"}
+        summary["steps"] = {}
+        for step, name in step_names.items():
+            values = [result["steps_ms"][step] for result in succeeded if step in result["steps_ms"]]
+            if values:
+                summary["steps"][name] = stats(values)
+
+    print(f"\nLogin benchmark: {len(succeeded)}/{args.runs} runs succeeded "
+          f"(latency {args.latency:.0f}±{args.jitter:.0f} ms, failure rate {args.failure_rate:.0%})")
+    if succeeded:
+        for name, values in [("time to Main", summary["time_to_main"]), ("time to profile", summary["time_to_profile"])] + \
+                [(f"step {name}", values) for name, values in summary["steps"].items()]:
+            print(f"  {name:24} p50 {values['p50_ms']:8.1f} ms   p95 {values['p95_ms']:8.1f} ms")
+    print(f"  QtWebEngine imported: {'yes' if summary['web_engine_imported'] else 'no'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"summary": summary, "results": results}, output_file, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0 if succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Headless startup benchmark for the Login -> Main launch path.
+
+Each run starts a fresh Python process on the offscreen Qt platform with
+the startup profiler enabled, waits until the window is interactive and
+collects the JSON report. The summary (median / p95 per phase, slowest
+imports) can be saved and compared against a baseline to catch regressions.
+
+usage:
+python benchmark_startup.py --runs 10 --output startup_bench.json
+python benchmark_startup.py --target login --baseline startup_bench.json --threshold 0.2
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Seconds to wait for one launch before it counts as failed
+RUN_TIMEOUT = 120
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_child(target):
+    """Launch the target inside this process (used by the spawned benchmark runs)"""
+    # The profiler is enabled by the environment set up by run_once()
+    from StartupProfiler import startup_profiler
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer, Qt
+
+    startup_profiler.mark(f"{target}.imports_done")
+    # Login imports QtWebEngine lazily, after the QApplication exists
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    with startup_profiler.phase(f"{target}.qapplication"):
+        app = QApplication(sys.argv)
+
+    if target == "login":
+        from Login import Login
+        with startup_profiler.phase("login.create"):
+            window = Login()
+        with startup_profiler.phase("login.show"):
+            window.show()
+        QTimer.singleShot(0, lambda: startup_profiler.mark("login.interactive"))
+
+        # Skip the OAuth round trips and open Main as the start button does
+        QTimer.singleShot(0, window.start_main_form)
+    else:
+        from Main import Main
+        with startup_profiler.phase("main.create"):
+            window = Main()
+            # Keep the auto-quit timer out of the measurement
+            window.cancel_auto_quit()
+        with startup_profiler.phase("main.show"):
+            window.show()
+
+    # Main writes the report on its first interactive event loop iteration
+    def check_finished():
+        if startup_profiler.finished:
+            app.quit()
+    timer = QTimer()
+    timer.timeout.connect(check_finished)
+    timer.start(10)
+    QTimer.singleShot(RUN_TIMEOUT * 1000, app.quit)
+    app.exec()
+    return 0 if startup_profiler.finished else 1
+
+
+def run_once(target):
+    """Run one launch in a fresh process and return its startup report"""
+    handle, report_path = tempfile.mkstemp(suffix=".json", prefix="startup_")
+    os.close(handle)
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["APP_PROFILE_STARTUP"] = report_path
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", target],
+            cwd=PROJECT_DIR, env=env, capture_output=True, text=True, timeout=RUN_TIMEOUT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{target} launch failed:\n{result.stderr.strip()[-2000:]}")
+        with open(report_path, encoding="utf-8") as report_file:
+            return json.load(report_file)
+    finally:
+        os.remove(report_path)
+
+
+def summarize(reports, target):
+    """Aggregate the reports of several runs into median / p95 figures"""
+    def stats(values):
+        return {
+            "median_ms": statistics.median(values),
+            "p95_ms": percentile(values, 0.95),
+            "min_ms": min(values),
+            "max_ms": max(values),
+        }
+
+    interactive_mark = "main.interactive"
+    summary = {
+        "target": target,
+        "runs": len(reports),
+        "python": reports[0]["python"],
+        "platform": reports[0]["platform"],
+        "time_to_interactive": stats([report["marks"].get(interactive_mark, report["total_ms"]) for report in reports]),
+        "import_total": stats([report["import_total_ms"] for report in reports]),
+        "phases": {},
+        "slowest_imports": {},
+    }
+
+    for report in reports:
+        for phase in report["phases"]:
+            summary["phases"].setdefault(phase["name"], []).append(phase["total_ms"])
+        for item in report["imports"]:
+            if item["depth"] == 0:
+                summary["slowest_imports"].setdefault(item["module"], []).append(item["cumulative_ms"])
+
+    summary["phases"] = {name: stats(values) for name, values in summary["phases"].items()}
+    slowest = sorted(summary["slowest_imports"].items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    summary["slowest_imports"] = {name: stats(values) for name, values in slowest[:15]}
+    return summary
+
+
+def compare_with_baseline(summary, baseline, threshold):
+    """Return a list of regressions where the median grew by more than threshold"""
+    regressions = []
+    checks = [("time_to_interactive", summary["time_to_interactive"], baseline.get("time_to_interactive"))]
+    checks += [(f"phase {name}", stats, baseline.get("phases", {}).get(name))
+               for name, stats in summary["phases"].items()]
+    for name, current, previous in checks:
+        if not previous or previous["median_ms"] <= 0:
+            continue
+        change = (current["median_ms"] - previous["median_ms"]) / previous["median_ms"]
+        # Ignore sub-millisecond noise
+        if change > threshold and current["median_ms"] - previous["median_ms"] > 1.0:
+            regressions.append(f"{name}: {previous['median_ms']:.1f} ms -> {current['median_ms']:.1f} ms "
+                               f"(+{change * 100:.0f}%)")
+    return regressions
+
+
+def print_summary(summary):
+    """Print the summary as a table"""
+    print(f"\nStartup benchmark ({summary['target']}, {summary['runs']} runs, Python {summary['python']})")
+    print("=" * 72)
+    print(f"{'':40} {'median':>9} {'p95':>9} {'max':>9}")
+
+    def row(name, stats):
+        print(f"{name[:40]:40} {stats['median_ms']:8.1f}ms {stats['p95_ms']:8.1f}ms {stats['max_ms']:8.1f}ms")
+
+    row("Time to interactive", summary["time_to_interactive"])
+    row("Module imports", summary["import_total"])
+    print("-" * 72)
+    for name, stats in summary["phases"].items():
+        row(name, stats)
+    print("-" * 72)
+    for name, stats in list(summary["slowest_imports"].items())[:10]:
+        row(f"import {name}", stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless startup benchmark (offscreen Qt)")
+    parser.add_argument("--target", choices=["main", "login"], default="main",
+                        help="main: Main window only; login: Login window then Main (needs QtWebEngine unless a cached login is valid)")
+    parser.add_argument("--runs", type=int, default=5, help="number of launches")
+    parser.add_argument("--output", help="write the summary JSON here")
+    parser.add_argument("--baseline", help="summary JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slowdown of a median before it counts as a regression")
+    parser.add_argument("--child", choices=["main", "login"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args.child)
+
+    reports = []
+    for run in range(args.runs):
+        try:
+            report = run_once(args.target)
+        except Exception as e:
+            print(f"Run {run + 1} failed: {str(e)}")
+            return 1
+        reports.append(report)
+        print(f"Run {run + 1}/{args.runs}: "
+              f"{report['marks'].get('main.interactive', report['total_ms']):.0f} ms to interactive")
+
+    summary = summarize(reports, args.target)
+    print_summary(summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(summary, output_file, indent=2)
+        print(f"\nSummary written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_with_baseline(summary, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
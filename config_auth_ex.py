@@ -7,5 +7,12 @@ AUTH_CONFIG = {
     "PROVIDER_CLIENT_ID": "sss",
     "PROVIDER_CLIENT_SECRET": "sss",
 
-    "REDIRECT_URI": "https://google.com"
+    "REDIRECT_URI": "https://google.com",
+
+    # Optional endpoint overrides (defaults are the production moph.id.th /
+    # provider.id.th URLs), e.g. for the local FakeAuthServer:
+    # "AUTHORIZE_URL": "http://127.0.0.1:8765/oauth/redirect",
+    # "TOKEN_URL": "http://127.0.0.1:8765/api/v1/token",
+    # "PROVIDER_TOKEN_URL": "http://127.0.0.1:8765/api/v1/services/token",
+    # "PROVIDER_PROFILE_URL": "http://127.0.0.1:8765/api/v1/services/profile?position_type=1",
 }
\ No newline at end of file
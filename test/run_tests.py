@@ -50,6 +50,182 @@ def run_all_tests():
         print(f"✗ Integration test failed: {e}")
         test_results.append(("HisConSetting Integration", False))
     
+    # Test 4: Query Result Model Test
+    print("\n4. Testing Query Result Model...")
+    try:
+        from test_result_table_model import (test_result_model_paging, test_result_model_append_rows,
+                                             test_sampled_column_widths, test_local_sort_and_filter)
+        result = (test_result_model_paging() and test_result_model_append_rows()
+                  and test_sampled_column_widths() and test_local_sort_and_filter())
+        test_results.append(("Query Result Model", result))
+    except Exception as e:
+        print(f"✗ Query result model test failed: {e}")
+        test_results.append(("Query Result Model", False))
+    
+    # Test 5: Database Engine Test
+    print("\n5. Testing Database Engine Pool...")
+    try:
+        from test_db_engine import test_connection_url, test_engine_reuse, test_query_thread_statements
+        result = test_connection_url() and test_engine_reuse() and test_query_thread_statements()
+        test_results.append(("Database Engine Pool", result))
+    except Exception as e:
+        print(f"✗ Database engine test failed: {e}")
+        test_results.append(("Database Engine Pool", False))
+    
+    # Test 6: DbPerform Test
+    print("\n6. Testing DbPerform...")
+    try:
+        from test_db_perform import (test_execute_queries, test_schema_fingerprint, test_schema_probing,
+                                     test_thread_safety)
+        result = (test_execute_queries() and test_schema_fingerprint() and test_schema_probing()
+                  and test_thread_safety())
+        test_results.append(("DbPerform", result))
+    except Exception as e:
+        print(f"✗ DbPerform test failed: {e}")
+        test_results.append(("DbPerform", False))
+    
+    # Test 7: Keyset Paging Test
+    print("\n7. Testing Keyset Paging...")
+    try:
+        from test_keyset_pager import test_keyset_pages, test_page_cache_and_prefetch, test_discovered_tables
+        result = test_keyset_pages() and test_page_cache_and_prefetch() and test_discovered_tables()
+        test_results.append(("Keyset Paging", result))
+    except Exception as e:
+        print(f"✗ Keyset paging test failed: {e}")
+        test_results.append(("Keyset Paging", False))
+    
+    # Test 8: Lazy Module Loading Test
+    print("\n8. Testing Lazy Module Loading...")
+    try:
+        from test_module_registry import test_main_import_is_lazy, test_registry_and_prewarm
+        result = test_main_import_is_lazy() and test_registry_and_prewarm()
+        test_results.append(("Lazy Module Loading", result))
+    except Exception as e:
+        print(f"✗ Lazy module loading test failed: {e}")
+        test_results.append(("Lazy Module Loading", False))
+    
+    # Test 9: Startup Profiler Test
+    print("\n9. Testing Startup Profiler...")
+    try:
+        from test_startup_profiler import test_profiler_switches, test_profiler_report
+        result = test_profiler_switches() and test_profiler_report()
+        test_results.append(("Startup Profiler", result))
+    except Exception as e:
+        print(f"✗ Startup profiler test failed: {e}")
+        test_results.append(("Startup Profiler", False))
+    
+    # Test 10: Credential Cache Test
+    print("\n10. Testing Credential Cache...")
+    try:
+        from test_credential_cache import test_cache_round_trip, test_cache_expiry
+        result = test_cache_round_trip() and test_cache_expiry()
+        test_results.append(("Credential Cache", result))
+    except Exception as e:
+        print(f"✗ Credential cache test failed: {e}")
+        test_results.append(("Credential Cache", False))
+    
+    # Test 11: Fake Auth Server Test
+    print("\n11. Testing Fake Auth Server...")
+    try:
+        from test_fake_auth_server import test_fake_login_flow, test_fake_latency_and_failures
+        result = test_fake_login_flow() and test_fake_latency_and_failures()
+        test_results.append(("Fake Auth Server", result))
+    except Exception as e:
+        print(f"✗ Fake auth server test failed: {e}")
+        test_results.append(("Fake Auth Server", False))
+    
+    print("\n12. Testing Login WebEngine Release...")
+    try:
+        from test_login_web_engine import test_cached_login_skips_web_engine
+        result = test_cached_login_skips_web_engine()
+        test_results.append(("Login WebEngine Release", result))
+    except Exception as e:
+        print(f"✗ Login WebEngine test failed: {e}")
+        test_results.append(("Login WebEngine Release", False))
+    
+    print("\n13. Testing Query Export...")
+    try:
+        from test_query_export import (test_read_only_check, test_streaming_csv_export, test_xlsx_export,
+                                       test_excel_export_of_loaded_rows)
+        result = (test_read_only_check() and test_streaming_csv_export() and test_xlsx_export()
+                  and test_excel_export_of_loaded_rows())
+        test_results.append(("Query Export", result))
+    except Exception as e:
+        print(f"✗ Query export test failed: {e}")
+        test_results.append(("Query Export", False))
+    
+    print("\n14. Testing Result Snapshots...")
+    try:
+        from test_result_snapshot import test_snapshot_round_trip, test_snapshot_opens_in_grid
+        result = test_snapshot_round_trip() and test_snapshot_opens_in_grid()
+        test_results.append(("Result Snapshots", result))
+    except Exception as e:
+        print(f"✗ Result snapshot test failed: {e}")
+        test_results.append(("Result Snapshots", False))
+    
+    print("\n15. Testing Query Result Cache...")
+    try:
+        from test_query_cache import test_normalize_sql, test_cache_ttl_and_lru, test_query_window_cache
+        result = test_normalize_sql() and test_cache_ttl_and_lru() and test_query_window_cache()
+        test_results.append(("Query Result Cache", result))
+    except Exception as e:
+        print(f"✗ Query cache test failed: {e}")
+        test_results.append(("Query Result Cache", False))
+    
+    print("\n16. Testing Table Change Invalidation...")
+    try:
+        from test_table_change_monitor import test_extract_tables, test_invalidate_changed_tables, test_query_window_invalidation
+        result = test_extract_tables() and test_invalidate_changed_tables() and test_query_window_invalidation()
+        test_results.append(("Table Change Invalidation", result))
+    except Exception as e:
+        print(f"✗ Table change invalidation test failed: {e}")
+        test_results.append(("Table Change Invalidation", False))
+    
+    print("\n17. Testing Query History...")
+    try:
+        from test_query_history import test_history_store, test_query_window_history
+        result = test_history_store() and test_query_window_history()
+        test_results.append(("Query History", result))
+    except Exception as e:
+        print(f"✗ Query history test failed: {e}")
+        test_results.append(("Query History", False))
+    
+    print("\n18. Testing Explain Plan Viewer...")
+    try:
+        from test_explain_plan import test_mysql_plans, test_postgresql_plan, test_explain_in_window
+        result = test_mysql_plans() and test_postgresql_plan() and test_explain_in_window()
+        test_results.append(("Explain Plan Viewer", result))
+    except Exception as e:
+        print(f"✗ Explain plan test failed: {e}")
+        test_results.append(("Explain Plan Viewer", False))
+    
+    print("\n19. Testing Query Cancel...")
+    try:
+        from test_query_cancel import test_cancel_query_thread, test_cancel_in_window
+        result = test_cancel_query_thread() and test_cancel_in_window()
+        test_results.append(("Query Cancel", result))
+    except Exception as e:
+        print(f"✗ Query cancel test failed: {e}")
+        test_results.append(("Query Cancel", False))
+    
+    print("\n20. Testing Query Guardrails...")
+    try:
+        from test_query_guard import test_row_limit, test_statement_timeout, test_guardrails_in_window
+        result = test_row_limit() and test_statement_timeout() and test_guardrails_in_window()
+        test_results.append(("Query Guardrails", result))
+    except Exception as e:
+        print(f"✗ Query guardrail test failed: {e}")
+        test_results.append(("Query Guardrails", False))
+    
+    print("\n21. Testing Query Workspace Tabs...")
+    try:
+        from test_query_workspace import test_query_slots, test_workspace_tabs
+        result = test_query_slots() and test_workspace_tabs()
+        test_results.append(("Query Workspace Tabs", result))
+    except Exception as e:
+        print(f"✗ Query workspace test failed: {e}")
+        test_results.append(("Query Workspace Tabs", False))
+    
     # Summary
     print("\n" + "=" * 60)
     print("TEST SUMMARY")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the encrypted login credential cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from CredentialCache import CredentialCache
+
+
+PROFILE = {"hash_cid": "test-hash-cid", "title_th": "นพ.", "name_th": "ทดสอบ", "organization": []}
+
+
+def test_cache_round_trip():
+    """Test that entries are stored encrypted and loaded back by hash_cid"""
+
+    print("Testing CredentialCache storage...")
+
+    cache = CredentialCache(tempfile.mkdtemp())
+    entry = cache.create_entry({"access_token": "health-token", "expires_in": 7200},
+                               {"access_token": "provider-token", "expires_in": 3600}, PROFILE)
+    assert cache.save(entry)
+
+    files = [name for name in os.listdir(cache.cache_dir) if name.endswith(".bin")]
+    assert len(files) == 1 and "test-hash-cid" not in files[0]
+    with open(os.path.join(cache.cache_dir, files[0]), "rb") as cache_file:
+        raw = cache_file.read()
+    assert b"provider-token" not in raw and "ทดสอบ".encode("utf-8") not in raw
+    print("✓ Entry written encrypted without hash_cid in the file name")
+
+    loaded = cache.load("test-hash-cid")
+    assert loaded["provider_token"] == "provider-token"
+    assert loaded["profile"]["name_th"] == "ทดสอบ"
+    assert cache.load_last()["hash_cid"] == "test-hash-cid"
+    print("✓ Entry loaded by hash_cid and as last login")
+
+    cache.remove("test-hash-cid")
+    assert cache.load("test-hash-cid") is None and cache.load_last() is None
+    print("✓ Entry removed")
+
+    return True
+
+
+def test_cache_expiry():
+    """Test that token expiry decides whether an entry is used and refreshed"""
+
+    print("\nTesting CredentialCache expiry...")
+
+    cache = CredentialCache(tempfile.mkdtemp())
+    entry = cache.create_entry({"access_token": "a", "expires_in": 7200},
+                               {"access_token": "p", "expires_in": 600}, PROFILE)
+    now = time.time()
+
+    assert cache.is_usable(entry, now)
+    assert 0 < cache.seconds_until_refresh(entry, now) <= 600 - cache.REFRESH_MARGIN
+    assert cache.seconds_until_refresh(entry, now + 500) == 0
+    print("✓ Refresh scheduled before the provider token expires")
+
+    assert cache.is_usable(entry, now + 3600) and cache.can_refresh(entry, now + 3600)
+    assert not cache.is_usable(entry, now + 8000)
+    print("✓ Entry usable while the Health ID token can refresh it")
+
+    entry["access_expires_at"] = entry["provider_expires_at"] = now - 1
+    cache.save(entry)
+    assert cache.load("test-hash-cid") is None
+    assert os.listdir(cache.cache_dir) == []
+    print("✓ Expired entry discarded on load")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_cache_round_trip()
+        success &= test_cache_expiry()
+
+        if success:
+            print("\n✅ All CredentialCache tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script to verify DbPerform against a local SQLite database
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from DbPerform import DbPerform, parse_simple_select
+from DbEngine import db_engines
+
+
+def create_test_db():
+    """Create a DbPerform bound to a temporary SQLite database with a house table"""
+    db_path = os.path.join(tempfile.mkdtemp(), "dbperform_test.db")
+    db = DbPerform({'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"})
+    db.execute_query("CREATE TABLE house (housecode TEXT, address TEXT, village_id INTEGER)")
+    for i in range(20):
+        db.execute_query("INSERT INTO house VALUES (:code, :address, :village)",
+                         {'code': f"H{i:03d}", 'address': f"{i} Moo 1", 'village': i % 2})
+    return db
+
+
+def test_execute_queries():
+    """Test parameterized queries and candidate query fallback"""
+
+    print("Testing DbPerform queries...")
+
+    db = create_test_db()
+
+    success, rows = db.execute_query("SELECT housecode FROM house WHERE village_id = :village", {'village': 1})
+    assert success and len(rows) == 10
+    print("✓ Parameterized query returned rows")
+
+    success, message = db.execute_query("SELECT * FROM missing_table")
+    assert not success and "missing_table" in message
+    print("✓ Failed query reported without raising")
+
+    success, rows = db.execute_query("INSERT INTO house (housecode, village_id) VALUES (:code, 9) RETURNING housecode",
+                                     {'code': 'H9001'})
+    assert success and rows == [('H9001',)]
+    success, rows = db.execute_query("SELECT housecode FROM house WHERE village_id = 9")
+    assert success and rows == [('H9001',)]
+    db.execute_query("DELETE FROM house WHERE village_id = 9")
+    print("✓ Rows of INSERT ... RETURNING returned and the insert committed")
+
+    success, rows, query_index = db.execute_multiple_queries([
+        "SELECT * FROM villages",
+        "SELECT housecode, address FROM house",
+    ])
+    assert success and query_index == 1 and len(rows) == 20
+    print("✓ First successful candidate query used")
+
+    success, tables = db.find_tables_by_pattern(['%house%', '%village%'])
+    assert success and tables == ['house']
+    print("✓ Tables found by pattern")
+
+    stats = db.get_timing_stats()
+    assert stats['execute_query']['calls'] >= 24
+    assert stats['execute_query']['errors'] == 2
+    print("✓ Timing counters recorded")
+
+    db_engines.dispose_all()
+    return True
+
+
+def test_schema_fingerprint():
+    """Test that the schema fingerprint is stable until the schema changes"""
+
+    print("\nTesting DbPerform schema fingerprint...")
+
+    db = create_test_db()
+
+    success, fingerprint = db.get_schema_fingerprint()
+    assert success and fingerprint
+    assert db.get_schema_fingerprint() == (True, fingerprint)
+    print("✓ Fingerprint stable for an unchanged schema")
+
+    db.execute_query("ALTER TABLE house ADD COLUMN status TEXT")
+    success, changed_fingerprint = db.get_schema_fingerprint()
+    assert success and changed_fingerprint != fingerprint
+    print("✓ Fingerprint changes with the schema")
+
+    db_engines.dispose_all()
+    return True
+
+
+def test_schema_probing():
+    """Test that candidates are checked against the schema before running"""
+
+    print("\nTesting DbPerform candidate schema probing...")
+
+    assert parse_simple_select("SELECT housecode as house_id, 'Active' as status FROM house LIMIT 100") == \
+        ('house', ['housecode'])
+    assert parse_simple_select("SELECT DISTINCT h.address, COUNT(*) FROM house h GROUP BY h.address") == \
+        ('house', ['address'])
+    assert parse_simple_select("SELECT * FROM house JOIN village ON 1 = 1") is None
+    print("✓ Candidate tables and columns parsed")
+
+    db = create_test_db()
+    queries = [
+        "SELECT housecode, tambon FROM house",
+        "SELECT village_id FROM villages",
+        "SELECT housecode, address FROM house WHERE village_id = 0",
+    ]
+
+    success, rows, query_index = db.execute_multiple_queries(queries, probe_schema=True)
+    assert success and query_index == 2 and len(rows) == 10
+    stats = db.get_timing_stats()
+    assert stats['get_table_columns']['calls'] == 1
+    assert stats['execute_query']['errors'] == 0
+    print("✓ Unavailable candidates skipped without failed queries")
+
+    db_engines.dispose_all()
+    return True
+
+
+def test_thread_safety():
+    """Test that one DbPerform instance can be shared by several threads"""
+
+    print("\nTesting DbPerform from multiple threads...")
+
+    db = create_test_db()
+    results = []
+
+    def worker():
+        success, rows = db.execute_query("SELECT COUNT(*) FROM house")
+        results.append(success and rows[0][0] == 20)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    print("✓ Concurrent queries succeeded")
+
+    success, message = DbPerform({'use_connection_string': False, 'host': '', 'database': '', 'username': ''}).test_connection()
+    assert not success and "Connection Fail" in message
+    print("✓ Unconfigured connection reported")
+
+    db_engines.dispose_all()
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_execute_queries()
+        success &= test_schema_fingerprint()
+        success &= test_schema_probing()
+        success &= test_thread_safety()
+
+        if success:
+            print("\n✅ All DbPerform tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the EXPLAIN plan viewer
+"""
+
+import sys
+import json
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ExplainPlan import (parse_mysql_json, parse_mysql_tree, parse_postgresql_json, resolve_aliases,
+                         explain_query, plan_warnings, FULL_SCAN, FILESORT, TEMPORARY)
+
+
+MYSQL_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "cost_info": {"query_cost": "1520.75"},
+        "ordering_operation": {
+            "using_filesort": True,
+            "grouping_operation": {
+                "using_temporary_table": True,
+                "using_filesort": False,
+                "nested_loop": [
+                    {"table": {"table_name": "o", "access_type": "ALL", "rows_examined_per_scan": 12000,
+                               "cost_info": {"prefix_cost": "1210.00"},
+                               "attached_condition": "(`hos`.`o`.`vstdate` = DATE'2024-01-15')"}},
+                    {"table": {"table_name": "p", "access_type": "eq_ref", "key": "PRIMARY",
+                               "rows_examined_per_scan": 1, "cost_info": {"prefix_cost": "1520.75"}}},
+                ],
+            },
+        },
+    }
+}
+
+MYSQL_ANALYZE = """-> Sort: count(0) DESC  (actual time=52.1..52.1 rows=3 loops=1)
+    -> Table scan on <temporary>  (actual time=52.0..52.0 rows=3 loops=1)
+        -> Aggregate using temporary table  (actual time=52.0..52.0 rows=3 loops=1)
+            -> Table scan on opdscreen  (cost=1050 rows=10200) (actual time=0.05..31.2 rows=10000 loops=1)
+"""
+
+POSTGRESQL_PLAN = [{
+    "Plan": {
+        "Node Type": "Sort", "Total Cost": 950.5, "Plan Rows": 500, "Actual Rows": 12, "Actual Loops": 1,
+        "Sort Key": ["o.vn"], "Sort Method": "quicksort",
+        "Plans": [{
+            "Node Type": "Hash Join", "Total Cost": 900.0, "Plan Rows": 500, "Actual Rows": 12,
+            "Hash Cond": "(o.hn = p.hn)",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "ovst", "Alias": "o", "Total Cost": 400.0,
+                 "Plan Rows": 500, "Actual Rows": 12, "Filter": "(vstdate = '2024-01-15'::date)"},
+                {"Node Type": "Hash", "Total Cost": 300.0, "Plan Rows": 8000, "Actual Rows": 8000,
+                 "Plans": [{"Node Type": "Index Scan", "Relation Name": "clinic", "Index Name": "clinic_pkey",
+                            "Total Cost": 250.0, "Plan Rows": 8000, "Actual Rows": 8000}]},
+            ],
+        }],
+    },
+    "Execution Time": 3.2,
+}]
+
+
+def test_mysql_plans():
+    """Test parsing MySQL JSON and EXPLAIN ANALYZE plans"""
+
+    print("Testing MySQL plans...")
+
+    query = "SELECT p.sex, COUNT(*) FROM ovst o JOIN patient AS p ON p.hn = o.hn GROUP BY p.sex ORDER BY 2 DESC"
+    roots = resolve_aliases(parse_mysql_json(MYSQL_PLAN), query)
+    block = roots[0]
+    assert block.operation == "Query block #1" and block.cost == 1520.75
+    order_by = block.children[0]
+    assert order_by.operation == "Order by" and order_by.warnings == [FILESORT]
+    assert order_by.children[0].warnings == [TEMPORARY]
+    ovst, patient = order_by.children[0].children[0].children
+    assert ovst.table == "ovst" and ovst.estimated_rows == 12000 and ovst.warnings == [FULL_SCAN, FILESORT, TEMPORARY]
+    assert patient.table == "patient" and FULL_SCAN not in patient.warnings and "key: PRIMARY" in patient.details
+    assert {(node.table, warning) for node, warning, severe in plan_warnings(roots) if severe} == \
+        {("ovst", FULL_SCAN), ("ovst", FILESORT), ("ovst", TEMPORARY), ("patient", FILESORT), ("patient", TEMPORARY)}
+    print("✓ JSON plan tree with full scan, filesort and temporary table on aliased tables")
+
+    roots = parse_mysql_tree(MYSQL_ANALYZE)
+    assert len(roots) == 1 and roots[0].warnings == [FILESORT]
+    scan = roots[0].children[0].children[0].children[0]
+    assert scan.table == "opdscreen" and scan.estimated_rows == 10200 and scan.actual_rows == 10000
+    assert scan.warnings == [FULL_SCAN]
+    assert roots[0].children[0].children[0].warnings == [TEMPORARY]
+    print("✓ EXPLAIN ANALYZE tree with estimated and actual rows")
+
+    return True
+
+
+def test_postgresql_plan():
+    """Test parsing a PostgreSQL JSON plan"""
+
+    print("\nTesting PostgreSQL plan...")
+
+    roots = parse_postgresql_json(POSTGRESQL_PLAN)
+    sort = roots[0]
+    assert sort.operation == "Sort" and FILESORT in sort.warnings and "Sort Key: o.vn" in sort.details
+    seq_scan = sort.children[0].children[0]
+    assert seq_scan.table == "ovst" and seq_scan.estimated_rows == 500 and seq_scan.actual_rows == 12
+    assert seq_scan.warnings == [FULL_SCAN, FILESORT]
+    index_scan = sort.children[0].children[1].children[0]
+    assert index_scan.table == "clinic" and FULL_SCAN not in index_scan.warnings
+    print("✓ Seq Scan and Sort flagged, index scans not")
+
+    return True
+
+
+class RecordingConnection:
+    """Connection stub returning canned plans and recording the executed statements"""
+
+    def __init__(self, name, plan, is_mariadb=False):
+        self.dialect = type("Dialect", (), {"name": name, "is_mariadb": is_mariadb})()
+        self.plan = plan
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return type("Result", (), {"scalar": lambda result: self.plan})()
+
+    def rollback(self):
+        pass
+
+
+def test_analyze_guardrails():
+    """Test that EXPLAIN ANALYZE runs within the statement timeout and can be cancelled"""
+
+    print("\nTesting EXPLAIN ANALYZE guardrails...")
+
+    from QueryGuard import QueryGuard
+
+    guard = QueryGuard(statement_timeout=5)
+    query = "SELECT * FROM opdscreen"
+    mysql = RecordingConnection("mysql", MYSQL_ANALYZE)
+    explain_query(mysql, query, analyze=True, guard=guard)
+    assert mysql.statements == ["EXPLAIN ANALYZE SELECT /*+ MAX_EXECUTION_TIME(5000) */ * FROM opdscreen"]
+    mariadb = RecordingConnection("mysql", json.dumps(MYSQL_PLAN), is_mariadb=True)
+    explain_query(mariadb, query, analyze=True, guard=guard)
+    assert mariadb.statements == ["SET STATEMENT max_statement_time=5 FOR ANALYZE FORMAT=JSON SELECT * FROM opdscreen"]
+    postgresql = RecordingConnection("postgresql", POSTGRESQL_PLAN)
+    explain_query(postgresql, query, analyze=True, guard=guard)
+    assert postgresql.statements == ["SET LOCAL statement_timeout = 5000",
+                                     "EXPLAIN (ANALYZE, FORMAT JSON) SELECT * FROM opdscreen"]
+    mysql = RecordingConnection("mysql", json.dumps(MYSQL_PLAN))
+    explain_query(mysql, query, guard=guard)
+    assert mysql.statements == ["EXPLAIN FORMAT=JSON SELECT * FROM opdscreen"]
+    print("✓ Statement timeout applied to ANALYZE on MySQL, MariaDB and PostgreSQL")
+
+    from DbEngine import db_engines
+    from Query import ExplainThread
+
+    db_path = os.path.join(tempfile.mkdtemp(), "explain_cancel.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}",
+                'max_concurrent_queries': 1}
+    thread = ExplainThread("SELECT 1", settings, analyze=True)
+    errors, plans = [], []
+    thread.explain_error.connect(errors.append)
+    thread.plan_ready.connect(lambda *args: plans.append(args))
+    thread.cancel()
+    thread.run()
+    slot = db_engines.query_slot(settings)
+    assert errors == [] and plans == [] and slot.acquire(blocking=False)
+    slot.release()
+    db_engines.dispose(settings)
+    print("✓ Cancelled explain reports nothing and frees its query slot")
+
+    return True
+
+
+def test_explain_in_window():
+    """Test explaining a query from the Query window"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting Explain in the Query window...")
+
+    from DbEngine import db_engines
+    from Query import Query
+
+    db_path = os.path.join(tempfile.mkdtemp(), "explain_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("CREATE TABLE clinic (code TEXT PRIMARY KEY, name TEXT)"))
+    connection.commit()
+
+    roots = explain_query(connection, "SELECT * FROM clinic WHERE code = '001'")
+    assert plan_warnings(roots) == []
+    try:
+        explain_query(connection, "DELETE FROM patient", analyze=True)
+        assert False, "DELETE analyzed"
+    except ValueError:
+        pass
+    connection.close()
+    print("✓ Index lookup not flagged, ANALYZE refused for data changes")
+
+    original_get_settings = db_engines.get_settings
+    db_engines.get_settings = lambda: settings
+    try:
+        query = Query()
+        query.text_query.setPlainText("SELECT * FROM patient p ORDER BY p.hn;")
+        query.explain_current_query()
+        deadline = time.time() + 10
+        while not query.btn_explain.isEnabled() and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        app.processEvents()
+
+        dialog = query.plan_dialog
+        assert dialog is not None and dialog.tree_plan.topLevelItemCount() >= 2
+        assert dialog.tree_plan.topLevelItem(0).text(1) == "patient"
+        assert "full table scan on patient" in dialog.label_plan_summary.text()
+        print("✓ Plan shown with the full scan of patient highlighted")
+        dialog.close()
+        query.close()
+    finally:
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_mysql_plans()
+        success &= test_postgresql_plan()
+        success &= test_analyze_guardrails()
+        success &= test_explain_in_window()
+
+        if success:
+            print("\n✅ All ExplainPlan tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local fake Health ID / Provider ID server
+"""
+
+import sys
+import os
+import time
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from FakeAuthServer import FakeAuthServer
+
+
+def test_fake_login_flow():
+    """Test the authorize -> token -> provider token -> profile flow"""
+
+    print("Testing FakeAuthServer login flow...")
+
+    server = FakeAuthServer().start()
+    config = server.auth_config()
+    session = requests.Session()
+    try:
+        response = session.get(config["AUTHORIZE_URL"], params={"redirect_uri": config["REDIRECT_URI"]},
+                               allow_redirects=False, timeout=10)
+        assert response.status_code == 302
+        code = parse_qs(urlparse(response.headers["Location"]).query)["code"][0]
+        print("✓ Authorize redirects back with a code")
+
+        response = session.post(config["TOKEN_URL"], data={"code": code}, timeout=10)
+        access = response.json()["data"]
+        assert response.status_code == 200 and access["expires_in"] == 3600
+        assert session.post(config["TOKEN_URL"], data={"code": code}, timeout=10).status_code == 400
+        print("✓ Code exchanged once for an access token")
+
+        response = session.post(config["PROVIDER_TOKEN_URL"], data={"token": access["access_token"]}, timeout=10)
+        provider_token = response.json()["data"]["access_token"]
+        response = session.get(config["PROVIDER_PROFILE_URL"],
+                               headers={"Authorization": f"Bearer {provider_token}"}, timeout=10)
+        assert response.json()["data"]["hash_cid"].startswith("fake")
+        assert session.get(config["PROVIDER_PROFILE_URL"], headers={"Authorization": "Bearer bad"},
+                           timeout=10).status_code == 401
+        print("✓ Provider token and profile issued, invalid tokens rejected")
+    finally:
+        server.stop()
+
+    return True
+
+
+def test_fake_latency_and_failures():
+    """Test latency and failure injection"""
+
+    print("\nTesting FakeAuthServer injection...")
+
+    server = FakeAuthServer(latency_ms={"token": 100}).start()
+    try:
+        start_time = time.perf_counter()
+        requests.post(server.auth_config()["TOKEN_URL"], data={"code": "x"}, timeout=10)
+        assert time.perf_counter() - start_time >= 0.1
+        print("✓ Per-endpoint latency applied")
+    finally:
+        server.stop()
+
+    server = FakeAuthServer(failure_rate=1.0).start()
+    try:
+        response = requests.post(server.auth_config()["TOKEN_URL"], data={"code": "x"}, timeout=10)
+        assert response.status_code == 500
+        assert server.failure_counts == {"token": 1}
+        print("✓ Failures injected and counted")
+    finally:
+        server.stop()
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_fake_login_flow()
+        success &= test_fake_latency_and_failures()
+
+        if success:
+            print("\n✅ All FakeAuthServer tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to verify keyset paging of the management tables
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from DbPerform import DbPerform
+from KeysetPager import KeysetPager
+
+
+def create_test_db(row_count=250):
+    """Create a DbPerform bound to a temporary SQLite database with a patient table"""
+    db_path = os.path.join(tempfile.mkdtemp(), "keyset_test.db")
+    db = DbPerform({'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"})
+    db.execute_query("CREATE TABLE patient (hn TEXT PRIMARY KEY, fname TEXT)")
+    for i in range(row_count):
+        db.execute_query("INSERT INTO patient VALUES (:hn, :fname)", {'hn': f"{i:06d}", 'fname': f"Name {i}"})
+    return db
+
+
+def test_keyset_pages():
+    """Test that pages follow the key order and the last page is detected"""
+
+    print("Testing KeysetPager pages...")
+
+    db = create_test_db()
+    pager = KeysetPager(db, "hn, fname", "patient", "hn")
+
+    first = pager.fetch_page(0)
+    assert len(first) == 100
+    assert first[0] == ("000000", "Name 0")
+    print("✓ First page read without the paging key")
+
+    # Jumping ahead reads the pages in between to learn their keys
+    third = pager.fetch_page(2)
+    assert len(third) == 50
+    assert third[0][0] == "000200"
+    assert pager.is_last_page(2)
+    print("✓ Later page read after the last key of the previous page")
+
+    assert pager.fetch_page(3) == []
+    print("✓ Paging past the end returns no rows")
+
+    batches = []
+    pager.fetch_page(1, batches.append)
+    assert sum(len(batch) for batch in batches) == 100
+    assert pager.cached_page(1)[0][0] == "000100"
+    print("✓ Cached page delivered to the batch callback")
+
+    return True
+
+
+def test_page_cache_and_prefetch():
+    """Test the bounded page cache and background prefetch"""
+
+    print("\nTesting KeysetPager cache and prefetch...")
+
+    db = create_test_db()
+    pager = KeysetPager(db, "hn, fname", "patient", "hn", page_size=20, max_cached_pages=3)
+
+    for page in range(5):
+        pager.fetch_page(page)
+    assert pager.cached_page(0) is None and pager.cached_page(1) is None
+    assert pager.cached_page(4) is not None
+    print("✓ Least recently used pages evicted")
+
+    # Evicted pages are read again from their known start key
+    assert pager.fetch_page(0)[0][0] == "000000"
+    print("✓ Evicted page reloaded")
+
+    pager.prefetch(5)
+    deadline = time.time() + 5
+    while pager.cached_page(5) is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert pager.cached_page(5)[0][0] == "000100"
+    print("✓ Next page prefetched in the background")
+
+    return True
+
+
+def test_discovered_tables():
+    """Test paging tables found by the table search"""
+
+    print("\nTesting discovered table paging...")
+
+    from PagedTable import PagedLoadWorker
+
+    db = create_test_db()
+    db.execute_query("CREATE TABLE \"house list\" (village INTEGER, address TEXT)")
+    for i in range(150):
+        db.execute_query("INSERT INTO \"house list\" VALUES (:village, :address)",
+                         {'village': i // 10, 'address': f"{i} Moo {i // 10}"})
+    assert db.get_primary_key("patient") == (True, ["hn"])
+    assert db.get_primary_key("house list") == (True, [])
+    print("✓ Primary key read from the catalog")
+
+    pager = KeysetPager(db, "*", db.quote_identifier("house list"), None)
+    assert len(pager.fetch_page(0)) == 100 and pager.is_last_page(0)
+    pager.invalidate()
+    assert pager.is_last_page(0) and pager.fetch_page(1) == []
+    print("✓ Table without a unique key shows only its first page")
+
+    def load(cached_probes=None):
+        worker = PagedLoadWorker(db, [], "house_probe_cache", ['%house%', '%patient%'], cached_probes)
+        pagers, rows, probes = [], [], []
+        worker.pager_ready.connect(pagers.append)
+        worker.rows_loaded.connect(rows.extend)
+        worker.probe_resolved.connect(lambda key, probe: probes.append((key, probe)))
+        return worker._load(), pagers[-1], rows, probes
+
+    (success, message), pager, rows, probes = load()
+    assert success and message == "Loaded from table house list" and pager.key_column is None
+    assert len(rows) == 100 and pager.is_last_page(0)
+    cache_key, probe = probes[0]
+    assert probe == "table:house list"
+    print("✓ Quoted table name discovered and its probe cached")
+
+    (success, message), pager, rows, probes = load({cache_key: "table:patient"})
+    assert success and message == "Loaded using cached probe table:patient" and probes == []
+    assert pager.key_column == '"hn"' and not pager.is_last_page(0) and rows[0][0] == "000000"
+    print("✓ Cached probe used, table with a primary key keyset-paged on it")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_keyset_pages()
+        success &= test_page_cache_and_prefetch()
+        success &= test_discovered_tables()
+
+        if success:
+            print("\n✅ All KeysetPager tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
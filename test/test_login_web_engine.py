@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that Login only imports QtWebEngine for the OAuth page
+"""
+
+import sys
+import os
+import subprocess
+
+
+# Runs in a fresh process: log in from a cached entry against the fake server and open Main
+CACHED_LOGIN_SCRIPT = """
+import os, sys, tempfile
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+from FakeAuthServer import FakeAuthServer, DEFAULT_PROFILE
+from benchmark_login import configure_auth
+server = FakeAuthServer().start()
+configure_auth(server)
+
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from CredentialCache import credential_cache
+credential_cache.cache_dir = tempfile.mkdtemp()
+credential_cache.enabled = True
+credential_cache.save(credential_cache.create_entry(
+    {"access_token": server.issue("access_tokens"), "expires_in": 7200}, {"access_token": "p", "expires_in": 3600}, DEFAULT_PROFILE))
+
+from Login import Login
+login = Login()
+login.show()
+assert login.web_view is None and login.btn_start_main_window.isVisibleTo(login)
+login.start_main_form()
+login.main_window.cancel_auto_quit()
+app.processEvents()
+login.wait_for_workers()
+print("webengine:" + ",".join(m for m in ("PyQt6.QtWebEngineWidgets", "PyQt6.QtWebEngineCore") if m in sys.modules))
+server.stop()
+"""
+
+
+def test_cached_login_skips_web_engine():
+    """Test that a cached login reaches Main without importing QtWebEngine"""
+
+    print("Testing cached login without QtWebEngine...")
+
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", CACHED_LOGIN_SCRIPT], cwd=project_dir,
+                            capture_output=True, text=True, timeout=120)
+    assert output.returncode == 0, output.stderr
+    imported = [line for line in output.stdout.splitlines() if line.startswith("webengine:")][-1][len("webengine:"):]
+    assert imported == "", f"Imported during cached login: {imported}"
+    print("✓ Main started from cached credentials with no QtWebEngine module loaded")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_cached_login_skips_web_engine()
+
+        if success:
+            print("\n✅ All Login WebEngine tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script to verify lazy module loading in Main
+"""
+
+import sys
+import os
+import subprocess
+from PyQt6.QtWidgets import QApplication
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ModuleRegistry import ModuleRegistry, PrewarmWorker
+
+
+def test_main_import_is_lazy():
+    """Test that importing Main does not import the modules or database drivers"""
+
+    print("Testing lazy imports of Main...")
+
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import sys; import Main; "
+              "print(','.join(m for m in ('House', 'Query', 'HisConSetting', 'sqlalchemy', 'pymysql', 'psycopg2') "
+              "if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", script], cwd=project_dir,
+                            capture_output=True, text=True, timeout=60)
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.strip() == "", f"Imported at startup: {output.stdout.strip()}"
+    print("✓ Main imports no module windows or database drivers")
+
+    return True
+
+
+def test_registry_and_prewarm():
+    """Test first-use imports and the background pre-warm"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting ModuleRegistry...")
+
+    sys.modules.pop("colorsys", None)
+    registry = ModuleRegistry({"colors": ("colorsys", "rgb_to_hsv")})
+    assert not registry.is_loaded("colors")
+    assert registry.get("colors")(1, 0, 0) == (0.0, 1.0, 1)
+    assert registry.is_loaded("colors")
+    assert "colors" in registry.load_times()
+    print("✓ Module imported and timed on first use")
+
+    sys.modules.pop("colorsys", None)
+    registry = ModuleRegistry({"colors": ("colorsys", "rgb_to_hsv"), "missing": ("no_such_module_xyz", "X")})
+    loaded = []
+    worker = PrewarmWorker(registry)
+    worker.module_loaded.connect(lambda key, seconds: loaded.append(key))
+    worker.start()
+    assert worker.wait(10000)
+    app.processEvents()
+    assert registry.is_loaded("colors")
+    assert loaded == ["colors"]
+    print("✓ Pre-warm imported modules in the background and skipped failures")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_main_import_is_lazy()
+        success &= test_registry_and_prewarm()
+
+        if success:
+            print("\n✅ All ModuleRegistry tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Query result cache
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from QueryCache import QueryResultCache, normalize_sql, query_cache
+from QueryHistoryStore import query_history
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_sql():
+    """Test that whitespace and keyword case are ignored but literals are kept"""
+
+    print("Testing SQL normalization...")
+
+    assert normalize_sql("SELECT  sex,\n COUNT(*)\tFROM patient GROUP BY sex;") == \
+        normalize_sql("select sex, count(*) from patient group by sex")
+    assert normalize_sql("SELECT * FROM patient WHERE sex = 'M'") != \
+        normalize_sql("SELECT * FROM patient WHERE sex = 'm'")
+    assert normalize_sql("SELECT 'A  B'") == "select 'A  B'"
+    print("✓ Equivalent statements share a key, literals stay case-sensitive")
+
+    return True
+
+
+def test_cache_ttl_and_lru():
+    """Test expiry, byte-bounded LRU eviction and the hit/miss counters"""
+
+    print("\nTesting cache TTL and LRU eviction...")
+
+    clock = FakeClock()
+    cache = QueryResultCache(clock=clock)
+    cache.ttl = 60
+    cache.max_mb = 1000 / 1024 / 1024
+
+    cache.put("SELECT 1", "profile", ["a"], [(1,)], 400, 0.5)
+    assert cache.get("select 1", "profile").rows == [(1,)]
+    assert cache.get("SELECT 1", "other profile") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    print("✓ Entry keyed by normalized SQL and profile")
+
+    clock.now += 61
+    assert cache.get("SELECT 1", "profile") is None and len(cache) == 0
+    print("✓ Entry expired after its TTL")
+
+    cache.put("SELECT 1", "profile", ["a"], [], 400, 0.1)
+    cache.put("SELECT 2", "profile", ["a"], [], 400, 0.1)
+    cache.get("SELECT 1", "profile")
+    cache.put("SELECT 3", "profile", ["a"], [], 400, 0.1)
+    assert cache.get("SELECT 2", "profile") is None
+    assert cache.get("SELECT 1", "profile") is not None and cache.get("SELECT 3", "profile") is not None
+    assert cache.total_bytes == 800
+    print("✓ Least recently used entry evicted when over the byte budget")
+
+    assert not cache.put("SELECT 4", "profile", ["a"], [], 2000, 0.1)
+    print("✓ Result larger than the budget not cached")
+
+    return True
+
+
+def test_query_window_cache():
+    """Test that the Query window serves a repeated query from the cache"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting the cache in the Query window...")
+
+    from DbEngine import db_engines
+    from Query import Query
+
+    db_path = os.path.join(tempfile.mkdtemp(), "cache_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("INSERT INTO patient VALUES ('HN1', '1'), ('HN2', '2'), ('HN3', '1')"))
+    connection.commit()
+    connection.close()
+
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    query_cache.clear()
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        query = Query()
+        sql = "SELECT sex, COUNT(*) AS count FROM patient GROUP BY sex ORDER BY sex"
+
+        def run(statement):
+            query.text_query.setPlainText(statement)
+            query.execute_query()
+            deadline = time.time() + 10
+            while not query.btn_execute.isEnabled() and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            app.processEvents()
+
+        run(sql)
+        assert query.label_cache_status.text() == "Cache: MISS"
+        assert query.results_model.total_row_count() == 2
+
+        run("select sex, count(*) as count\n from patient group by sex order by sex")
+        assert query.label_cache_status.text() == "Cache: HIT"
+        assert query.results_model.total_row_count() == 2
+        print("✓ Repeated query served from the cache")
+
+        query.check_bypass_cache.setChecked(True)
+        run(sql)
+        assert query.label_cache_status.text() == "Cache: BYPASS"
+        assert query.results_model.total_row_count() == 2
+        print("✓ Bypass toggle queries the server")
+        query.close()
+    finally:
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_normalize_sql()
+        success &= test_cache_ttl_and_lru()
+        success &= test_query_window_cache()
+
+        if success:
+            print("\n✅ All QueryCache tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script to verify cancelling a running query
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from DbEngine import db_engines
+from QueryCache import query_cache
+from QueryHistoryStore import query_history
+
+# Runs for minutes in SQLite unless interrupted
+SLOW_QUERY = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000000) "
+              "SELECT COUNT(*) FROM n")
+# Streams rows for minutes unless fetching stops
+ENDLESS_QUERY = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000000) "
+                 "SELECT i, 'row ' || i FROM n")
+
+
+def create_database():
+    db_path = os.path.join(tempfile.mkdtemp(), "cancel_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("INSERT INTO patient VALUES ('HN1', '1'), ('HN2', '2')"))
+    connection.commit()
+    assert db_engines.backend_id(connection) is None
+    connection.close()
+    return settings
+
+
+def test_cancel_query_thread():
+    """Test cancelling a QueryThread while it executes and while it streams rows"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("Testing QueryThread cancel...")
+
+    from Query import QueryThread
+
+    settings = create_database()
+    try:
+        def run_and_cancel(query, cancel_when):
+            thread = QueryThread(query, "HOSXP", settings, streaming=True)
+            outcome = {}
+            thread.query_cancelled.connect(lambda rows, elapsed: outcome.update(cancelled=rows))
+            thread.stream_finished.connect(lambda rows, elapsed: outcome.update(finished=rows))
+            thread.query_error.connect(lambda message: outcome.update(error=message))
+            thread.start()
+            deadline = time.time() + 10
+            while not cancel_when(thread) and time.time() < deadline:
+                time.sleep(0.01)
+            start = time.time()
+            thread.cancel()
+            assert thread.wait(5000), "query kept running after cancel"
+            app.processEvents()
+            return outcome, time.time() - start
+
+        outcome, elapsed = run_and_cancel(SLOW_QUERY, lambda thread: thread.dbapi_connection is not None)
+        assert outcome == {'cancelled': 0} and elapsed < 2
+        print(f"✓ Running statement interrupted in {elapsed * 1000:.0f} ms")
+
+        outcome, elapsed = run_and_cancel(ENDLESS_QUERY, lambda thread: thread.row_count > 0)
+        assert outcome.get('cancelled', 0) > 0 and 'finished' not in outcome and 'error' not in outcome
+        print(f"✓ Streaming stopped after {outcome['cancelled']} rows")
+
+        thread = QueryThread("SELECT COUNT(*) FROM patient", "HOSXP", settings)
+        headers, rows = thread.execute_streaming_query("SELECT COUNT(*) FROM patient", "HOSXP")
+        assert list(rows) == [(2,)]
+        print("✓ Pooled connection usable after the cancels")
+    finally:
+        db_engines.dispose(settings)
+
+    return True
+
+
+def test_backend_session():
+    """Test that the session id is read once per connection and the cancel bypasses the pool"""
+
+    print("\nTesting backend session id and cancel connection...")
+
+    class MySQLConnection:
+        dialect = type("Dialect", (), {"name": "mysql"})()
+
+        def __init__(self):
+            self.info = {}
+            self.statements = []
+
+        def execute(self, statement):
+            self.statements.append(str(statement))
+            return type("Result", (), {"scalar": lambda result: 42})()
+
+    connection = MySQLConnection()
+    assert db_engines.backend_id(connection) == 42 and db_engines.backend_id(connection) == 42
+    assert connection.statements == ["SELECT CONNECTION_ID()"]
+    print("✓ Session id read once and reused from the connection info")
+
+    db_path = os.path.join(tempfile.mkdtemp(), "cancel_side.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    try:
+        db_engines.cancel_backend(settings, 42)
+        assert False, "SQLite session cancelled"
+    except ValueError:
+        pass
+    assert db_engines.engine_for_profile(db_engines.profile_key(settings)) is None
+    print("✓ Cancel opens its own connection instead of the shared pool")
+
+    return True
+
+
+def test_cancel_in_window():
+    """Test the Cancel button of the Query window"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting Cancel in the Query window...")
+
+    from Query import Query
+
+    settings = create_database()
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    original_critical = QMessageBox.critical
+    errors = []
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    QMessageBox.critical = lambda *args: errors.append(args) or QMessageBox.StandardButton.Ok
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        query = Query()
+        assert not query.btn_cancel_query.isEnabled()
+        query.text_query.setPlainText(ENDLESS_QUERY)
+        query.execute_query()
+        assert query.btn_cancel_query.isEnabled()
+
+        deadline = time.time() + 10
+        while query.results_model.total_row_count() == 0 and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        query.cancel_query()
+        while not query.btn_execute.isEnabled() and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        app.processEvents()
+
+        assert query.label_results_info.text().startswith("Query cancelled")
+        assert not query.btn_cancel_query.isEnabled() and errors == []
+        assert query_cache.get(ENDLESS_QUERY, query.cache_profile) is None
+        print("✓ Partial result kept and not cached")
+
+        query.text_query.setPlainText("SELECT hn FROM patient")
+        query.execute_query()
+        while not query.btn_execute.isEnabled() and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        app.processEvents()
+        assert query.label_results_info.text() == "Query completed successfully - 2 rows returned"
+        print("✓ Next query runs normally")
+        query.close()
+    finally:
+        QMessageBox.critical = original_critical
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_cancel_query_thread()
+        success &= test_backend_session()
+        success &= test_cancel_in_window()
+
+        if success:
+            print("\n✅ All query cancel tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
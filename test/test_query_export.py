@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming query exports
+"""
+
+import sys
+import os
+import csv
+import datetime
+import decimal
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication, QMessageBox, QFileDialog
+from PyQt6.QtCore import Qt
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from DbEngine import db_engines
+from QueryCache import query_cache
+from QueryHistoryStore import query_history
+from QueryExport import is_read_only_query, XlsxExportWriter
+from Query import QueryExportThread
+
+
+def create_export_database(row_count):
+    """Create a SQLite database with row_count visits and return its connection settings"""
+    db_path = os.path.join(tempfile.mkdtemp(), "export_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE ovst (vn INTEGER PRIMARY KEY, hn TEXT, vstdate TEXT, income REAL)"))
+    connection.execute(text("INSERT INTO ovst VALUES (:vn, :hn, :vstdate, :income)"),
+                       [{"vn": i, "hn": f"HN{i:06d}", "vstdate": "2024-01-15", "income": i * 1.5}
+                        for i in range(row_count)])
+    connection.commit()
+    connection.close()
+    return settings
+
+
+def run_export(app, thread):
+    """Run an export thread to completion and return the signals it emitted"""
+    events = []
+    thread.export_progress.connect(lambda *args: events.append(("progress",) + args))
+    thread.export_finished.connect(lambda *args: events.append(("finished",) + args))
+    thread.export_cancelled.connect(lambda *args: events.append(("cancelled",) + args))
+    thread.query_error.connect(lambda *args: events.append(("error",) + args))
+    thread.start()
+    assert thread.wait(30000)
+    app.processEvents()
+    return events
+
+
+def test_read_only_check():
+    """Test that only read-only statements are re-executed for an export"""
+
+    print("Testing read-only query detection...")
+
+    assert is_read_only_query("SELECT * FROM ovst")
+    assert is_read_only_query("  -- visits\n/* today */ with v as (select 1) select * from v")
+    assert is_read_only_query("(SELECT 1) UNION (SELECT 2)")
+    assert not is_read_only_query("DELETE FROM ovst")
+    assert not is_read_only_query("update ovst set hn = '' -- select")
+    print("✓ SELECT/WITH accepted, data changes rejected")
+
+    assert is_read_only_query("WITH v AS (SELECT 'delete' AS note FROM ovst FOR UPDATE) SELECT * FROM v")
+    assert not is_read_only_query("WITH d AS (DELETE FROM ovst RETURNING *) SELECT * FROM d")
+    assert not is_read_only_query("WITH u AS (UPDATE ovst SET hn = '' RETURNING vn) SELECT COUNT(*) FROM u")
+    assert not is_read_only_query("WITH v AS (SELECT vn FROM ovst) DELETE FROM ovst WHERE vn IN (SELECT vn FROM v)")
+    print("✓ Data-modifying CTEs and WITH ... DELETE rejected")
+
+    return True
+
+
+def test_streaming_csv_export():
+    """Test that an export writes every row and cancels cleanly"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting streaming CSV export...")
+
+    settings = create_export_database(12000)
+    try:
+        filename = os.path.join(tempfile.mkdtemp(), "visits.csv")
+        events = run_export(app, QueryExportThread("SELECT * FROM ovst ORDER BY vn", "HOSXP", settings, filename, 12000))
+        assert events[-1][:2] == ("finished", 12000), events[-1]
+        with open(filename, encoding="utf-8-sig", newline="") as csv_file:
+            rows = list(csv.reader(csv_file))
+        assert rows[0] == ["vn", "hn", "vstdate", "income"]
+        assert len(rows) == 12001 and rows[-1][1] == "HN011999"
+        assert not os.path.exists(filename + ".part")
+        print("✓ All rows streamed to the CSV file")
+
+        filename = os.path.join(tempfile.mkdtemp(), "cancelled.csv")
+        thread = QueryExportThread("SELECT * FROM ovst", "HOSXP", settings, filename)
+        thread.cancel()
+        events = run_export(app, thread)
+        assert events[-1][0] == "cancelled"
+        assert not os.path.exists(filename) and not os.path.exists(filename + ".part")
+        print("✓ Cancelled export leaves no file behind")
+
+        connection, _ = db_engines.checkout(settings)
+        assert connection.execute(text("SELECT COUNT(*) FROM ovst")).scalar() == 12000
+        connection.close()
+        print("✓ Connection returned to the pool")
+
+        events = run_export(app, QueryExportThread("DELETE FROM ovst", "HOSXP", settings, filename))
+        assert events[-1][0] == "error"
+        print("✓ Non-SELECT statement refused")
+
+        missing_dir = os.path.join(tempfile.mkdtemp(), "missing", "visits.csv")
+        events = run_export(app, QueryExportThread("SELECT * FROM ovst", "HOSXP", settings, missing_dir))
+        assert events[-1][0] == "error" and db_engines.get_engine(settings).pool.checkedout() == 0
+        thread = QueryExportThread("", "HOSXP", settings, filename)
+        headers, rows = thread.execute_streaming_query("SELECT * FROM ovst", "HOSXP")
+        assert db_engines.get_engine(settings).pool.checkedout() == 1
+        rows.close()
+        assert db_engines.get_engine(settings).pool.checkedout() == 0
+        print("✓ Connection released when the file cannot be written or no row is read")
+    finally:
+        db_engines.dispose(settings)
+
+    return True
+
+
+def test_xlsx_export():
+    """Test typed Excel cells and the split into sheets at the row limit"""
+
+    from openpyxl import load_workbook
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting Excel export...")
+
+    filename = os.path.join(tempfile.mkdtemp(), "typed.xlsx")
+    writer = XlsxExportWriter(filename)
+    writer.write_header(["vn", "vstdate", "vsttime", "income", "note"])
+    writer.write_rows([
+        (1, datetime.date(2024, 1, 15), datetime.datetime(2024, 1, 15, 8, 30, tzinfo=datetime.timezone.utc),
+         decimal.Decimal("150.25"), "ไข้\x01หวัด"),
+        (2, None, None, 3.5, b"bytes"),
+    ])
+    writer.close()
+    sheet = load_workbook(filename, read_only=True)["Results"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ("vn", "vstdate", "vsttime", "income", "note")
+    assert rows[1][0] == 1 and rows[1][1] == datetime.datetime(2024, 1, 15)
+    assert rows[1][2] == datetime.datetime(2024, 1, 15, 8, 30)
+    assert rows[1][3] == 150.25 and rows[1][4] == "ไข้หวัด"
+    assert rows[2] == (2, None, None, 3.5, "bytes")
+    print("✓ Numbers and dates written as typed cells")
+
+    settings = create_export_database(2500)
+    original_max_rows = XlsxExportWriter.MAX_SHEET_ROWS
+    XlsxExportWriter.MAX_SHEET_ROWS = 1000
+    try:
+        filename = os.path.join(tempfile.mkdtemp(), "visits.xlsx")
+        events = run_export(app, QueryExportThread("SELECT * FROM ovst ORDER BY vn", "HOSXP", settings, filename))
+        assert events[-1][:2] == ("finished", 2500), events[-1]
+        workbook = load_workbook(filename, read_only=True)
+        assert workbook.sheetnames == ["Results", "Results 2", "Results 3"]
+        sheet_rows = [list(workbook[name].iter_rows(values_only=True)) for name in workbook.sheetnames]
+        assert [len(rows) for rows in sheet_rows] == [1000, 1000, 503]
+        assert all(rows[0] == ("vn", "hn", "vstdate", "income") for rows in sheet_rows)
+        assert sheet_rows[2][-1][0] == 2499 and sheet_rows[2][-1][3] == 2499 * 1.5
+        print("✓ Rows split across sheets at the row limit, each with a header")
+    finally:
+        XlsxExportWriter.MAX_SHEET_ROWS = original_max_rows
+        db_engines.dispose(settings)
+
+    return True
+
+
+def test_excel_export_of_loaded_rows():
+    """Test that Export to Excel writes the loaded rows and only re-runs the query on request"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting Excel export of the loaded rows...")
+
+    from openpyxl import load_workbook
+    from Query import Query
+
+    settings = create_export_database(120)
+    settings['row_limit'] = 50
+    filename = os.path.join(tempfile.mkdtemp(), "loaded.xlsx")
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    original_dialog = QFileDialog.getSaveFileName
+    original_question = QMessageBox.question
+    original_information = QMessageBox.information
+    answers = []
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    QFileDialog.getSaveFileName = lambda *args: (filename, "")
+    QMessageBox.question = lambda *args: answers.pop(0)
+    QMessageBox.information = lambda *args: QMessageBox.StandardButton.Ok
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        query = Query()
+        query.text_query.setPlainText("SELECT * FROM ovst ORDER BY vn")
+        query.execute_query()
+        deadline = time.time() + 10
+        while not query.btn_execute.isEnabled() and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        assert len(query.current_results) == 50
+
+        # Changed on the server after the rows were loaded
+        connection, _ = db_engines.checkout(settings)
+        connection.execute(text("UPDATE ovst SET hn = 'changed'"))
+        connection.commit()
+        connection.close()
+
+        def export(answer):
+            answers.append(answer)
+            query.export_to_excel()
+            assert query.export_thread.wait(30000)
+            app.processEvents()
+            return list(load_workbook(filename, read_only=True)["Results"].iter_rows(values_only=True))
+
+        rows = export(QMessageBox.StandardButton.No)
+        assert len(rows) == 51 and rows[1] == (0, "HN000000", "2024-01-15", 0.0)
+        print("✓ Loaded rows exported as shown, without querying the server")
+
+        query.results_model.sort(0, Qt.SortOrder.DescendingOrder)
+        query.results_model.set_filter("HN00001")
+        rows = export(QMessageBox.StandardButton.No)
+        assert [row[0] for row in rows[1:]] == list(range(19, 9, -1))
+        query.results_model.set_filter("")
+        print("✓ Local sort and filter of the grid applied to the file")
+
+        rows = export(QMessageBox.StandardButton.Yes)
+        assert len(rows) == 121 and rows[1][1] == "changed"
+        print("✓ Full result re-run only when asked for")
+        query.close()
+    finally:
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        QFileDialog.getSaveFileName = original_dialog
+        QMessageBox.question = original_question
+        QMessageBox.information = original_information
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_read_only_check()
+        success &= test_streaming_csv_export()
+        success &= test_xlsx_export()
+        success &= test_excel_export_of_loaded_rows()
+
+        if success:
+            print("\n✅ All query export tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the interactive query guardrails
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from QueryGuard import QueryGuard, is_unbounded_select, add_limit, add_mysql_timeout_hint
+from QueryCache import query_cache
+from QueryHistoryStore import query_history
+
+
+class FakeDialect:
+    def __init__(self, name, is_mariadb=False):
+        self.name = name
+        self.is_mariadb = is_mariadb
+
+
+class FakeConnection:
+    """Records the statements executed by QueryGuard.prepare"""
+
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+def test_row_limit():
+    """Test detecting unbounded SELECTs and adding the LIMIT"""
+
+    print("Testing automatic LIMIT...")
+
+    assert is_unbounded_select("SELECT * FROM ovst")
+    assert is_unbounded_select("  -- today\nselect hn from ovst where vstdate = CURDATE();")
+    assert is_unbounded_select("WITH v AS (SELECT * FROM ovst LIMIT 10) SELECT * FROM v")
+    assert is_unbounded_select("SELECT * FROM ovst WHERE hn IN (SELECT hn FROM patient LIMIT 5)")
+    assert is_unbounded_select("SELECT 'no limit here' AS note FROM dual")
+    assert not is_unbounded_select("SELECT * FROM ovst LIMIT 100")
+    assert not is_unbounded_select("SELECT * FROM ovst ORDER BY vn FETCH FIRST 10 ROWS ONLY")
+    assert not is_unbounded_select("SELECT * FROM ovst FOR UPDATE")
+    assert not is_unbounded_select("SHOW TABLES")
+    assert not is_unbounded_select("UPDATE ovst SET vstdate = NULL")
+    print("✓ Unbounded SELECTs detected, bounded and other statements left alone")
+
+    assert add_limit("SELECT * FROM ovst -- all visits\n;", 5001) == "SELECT * FROM ovst -- all visits\nLIMIT 5001"
+    guard = QueryGuard(row_limit=5000)
+    assert guard.row_limit_for("SELECT * FROM ovst") == 5000 and guard.row_limit_for("SELECT 1 LIMIT 1") == 0
+    assert QueryGuard().row_limit_for("SELECT * FROM ovst") == 0
+    print("✓ LIMIT added on its own line")
+
+    return True
+
+
+def test_statement_timeout():
+    """Test the statement timeout of each dialect"""
+
+    print("\nTesting statement timeout...")
+
+    query = "WITH v AS (SELECT vn FROM ovst) SELECT COUNT(*) FROM v"
+    hinted = add_mysql_timeout_hint(query, 120000)
+    assert hinted == "WITH v AS (SELECT vn FROM ovst) SELECT /*+ MAX_EXECUTION_TIME(120000) */ COUNT(*) FROM v"
+    assert add_mysql_timeout_hint("SELECT /*+ NO_INDEX(ovst) */ * FROM ovst", 1000) == \
+        "SELECT /*+ NO_INDEX(ovst) */ * FROM ovst"
+    assert add_mysql_timeout_hint("UPDATE ovst SET vstdate = NULL", 1000) == "UPDATE ovst SET vstdate = NULL"
+
+    guard = QueryGuard(statement_timeout=30, row_limit=100)
+    mysql = FakeConnection(FakeDialect('mysql'))
+    assert guard.prepare(mysql, "SELECT * FROM ovst", 100) == \
+        "SELECT /*+ MAX_EXECUTION_TIME(30000) */ * FROM ovst\nLIMIT 101"
+    mariadb = FakeConnection(FakeDialect('mysql', is_mariadb=True))
+    assert guard.prepare(mariadb, "SELECT * FROM ovst") == "SET STATEMENT max_statement_time=30 FOR SELECT * FROM ovst"
+    postgresql = FakeConnection(FakeDialect('postgresql'))
+    assert guard.prepare(postgresql, "SELECT * FROM ovst") == "SELECT * FROM ovst"
+    assert postgresql.statements == ["SET LOCAL statement_timeout = 30000"]
+    assert QueryGuard.from_settings({'statement_timeout': 0}).prepare(mysql, "SELECT 1") == "SELECT 1"
+    print("✓ MySQL hint, MariaDB SET STATEMENT and PostgreSQL SET LOCAL")
+
+    return True
+
+
+def test_guardrails_in_window():
+    """Test the row limit, Fetch All and the size cap in the Query window"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting guardrails in the Query window...")
+
+    from DbEngine import db_engines
+    from Query import Query
+
+    db_path = os.path.join(tempfile.mkdtemp(), "guard_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}",
+                'statement_timeout': 0, 'row_limit': 50, 'max_result_mb': 0}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    for i in range(120):
+        connection.execute(text("INSERT INTO patient VALUES (:hn, '1')"), {'hn': f"HN{i:04d}"})
+    connection.commit()
+    connection.close()
+
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    original_critical = QMessageBox.critical
+    errors = []
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    QMessageBox.critical = lambda *args: errors.append(args) or QMessageBox.StandardButton.Ok
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        query = Query()
+
+        def wait():
+            deadline = time.time() + 10
+            while not query.btn_execute.isEnabled() and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            app.processEvents()
+
+        query.text_query.setPlainText("SELECT * FROM patient")
+        query.execute_query()
+        wait()
+        assert query.results_model.total_row_count() == 50
+        assert query.label_results_info.text() == "Showing the first 50 rows - more rows available"
+        assert not query.btn_fetch_all.isHidden()
+        assert query_cache.get("SELECT * FROM patient", query.cache_profile) is None
+        print("✓ Unbounded SELECT limited and not cached")
+
+        query.fetch_all_rows()
+        wait()
+        assert query.results_model.total_row_count() == 120 and query.btn_fetch_all.isHidden()
+        query.text_query.setPlainText("SELECT * FROM patient LIMIT 70")
+        query.execute_query()
+        wait()
+        assert query.results_model.total_row_count() == 70
+        print("✓ Fetch All and explicit LIMITs return every row")
+
+        settings.update(row_limit=0, max_result_mb=1)
+        query.text_query.setPlainText(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000) "
+            "SELECT i, printf('%0500d', i) FROM n")
+        query.execute_query()
+        wait()
+        assert query.label_results_info.text().startswith("Result stopped at the 1 MB size cap")
+        assert 0 < query.results_model.total_row_count() < 1000000
+        query.text_query.setPlainText("SELECT COUNT(*) FROM patient")
+        query.execute_query()
+        wait()
+        assert query.label_results_info.text() == "Query completed successfully - 1 rows returned" and errors == []
+        print("✓ Fetching stopped at the size cap, next query runs normally")
+        query.close()
+    finally:
+        QMessageBox.critical = original_critical
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_row_limit()
+        success &= test_statement_timeout()
+        success &= test_guardrails_in_window()
+
+        if success:
+            print("\n✅ All query guardrail tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the persistent query history
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from QueryHistoryStore import QueryHistoryStore, query_history, percentile
+from QueryCache import query_cache
+
+
+def test_history_store():
+    """Test recording, searching and per-statement percentiles"""
+
+    print("Testing query history store...")
+
+    store = QueryHistoryStore(os.path.join(tempfile.mkdtemp(), "history", "query_history.db"))
+    now = time.time()
+    for i in range(20):
+        sql = "SELECT * FROM ovst WHERE vstdate = CURDATE()" if i % 2 else "select *  from ovst\nwhere vstdate = curdate()"
+        assert store.record(sql, "mysql://hosxp@pcu/hos", now - 100 + i, float(i + 1), 10, 2048)
+    store.record("SELECT COUNT(*) FROM patient", "mysql://hosxp@pcu/hos", now - 5000, 0.2, 1, 64)
+    store.record("SELECT * FROM opd_visit", "mysql://hosxp@pcu/hos", now, 0.01, error="Table 'opd_visit' doesn't exist")
+
+    entries = store.search()
+    assert len(entries) == 22 and entries[0].error and entries[0].row_count is None
+    assert [entry.sql for entry in store.search("patient")] == ["SELECT COUNT(*) FROM patient"]
+    assert len(store.search("doesn't exist")) == 1 and store.search("100%") == []
+    print("✓ Executions recorded and searchable by SQL or error")
+
+    stats = store.slowest_statements()
+    assert len(stats) == 2
+    assert stats[0].runs == 20 and stats[0].p50 == 10.0 and stats[0].p95 == 19.0 and stats[0].max_time == 20.0
+    assert stats[0].sql == "SELECT * FROM ovst WHERE vstdate = CURDATE()"
+    assert [item.runs for item in store.slowest_statements(since=now - 1000)] == [20]
+    assert percentile([0.5], 0.95) == 0.5 and percentile([], 0.5) == 0.0
+    print("✓ Runs grouped by normalized statement with p50/p95")
+
+    store.MAX_ENTRIES = 5
+    store.record("SELECT 1", "sample:HOSXP", now, 0.5)
+    assert len(store.search()) == 5
+    store.close()
+    assert len(QueryHistoryStore(store.path).search()) == 5
+    print("✓ Oldest entries pruned and history persisted")
+
+    return True
+
+
+def test_query_window_history():
+    """Test that the Query window records executions and shows them in the history dialog"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting the history in the Query window...")
+
+    from DbEngine import db_engines
+    from Query import Query
+
+    db_path = os.path.join(tempfile.mkdtemp(), "history_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("INSERT INTO patient VALUES ('HN1', '1'), ('HN2', '2')"))
+    connection.commit()
+    connection.close()
+
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    original_critical = QMessageBox.critical
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    QMessageBox.critical = lambda *args: QMessageBox.StandardButton.Ok
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        query = Query()
+        query.check_bypass_cache.setChecked(True)
+
+        def run(statement):
+            query.text_query.setPlainText(statement)
+            query.execute_query()
+            deadline = time.time() + 10
+            while not query.btn_execute.isEnabled() and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            app.processEvents()
+
+        run("SELECT hn FROM patient")
+        run("SELECT * FROM missing_table")
+        entries = query_history.search()
+        assert [entry.row_count for entry in entries] == [None, 2]
+        assert entries[0].error and "missing_table" in entries[0].error
+        assert entries[1].profile.startswith("sqlite:///") and entries[1].bytes_fetched > 0
+        print("✓ Successful and failed executions recorded")
+
+        query.show_history()
+        dialog = query.history_dialog
+        assert dialog.history_model.rowCount() == 2 and dialog.slowest_model.rowCount() == 1
+        dialog.edit_search.setText("patient")
+        dialog.load_history()
+        assert dialog.history_model.rowCount() == 1
+        dialog.table_history.selectRow(0)
+        query.text_query.clear()
+        dialog.use_selected_query()
+        assert query.text_query.toPlainText() == "SELECT hn FROM patient"
+        print("✓ History searched and statement copied back to the editor")
+
+        dialog.close()
+        query.close()
+    finally:
+        QMessageBox.critical = original_critical
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_history_store()
+        success &= test_query_window_history()
+
+        if success:
+            print("\n✅ All QueryHistory tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the tabbed Query workspace and the per-server query limit
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from sqlalchemy import text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from DbEngine import DbEngine, db_engines
+from QueryCache import query_cache
+from QueryHistoryStore import query_history
+
+# Runs for minutes in SQLite unless cancelled
+SLOW_QUERY = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000000) "
+              "SELECT COUNT(*) FROM n")
+
+
+def test_query_slots():
+    """Test the per-server semaphores bounding concurrent queries"""
+
+    print("Testing per-server query slots...")
+
+    engines = DbEngine()
+    hosxp = {'host': '192.168.1.10', 'port': 3306, 'database': 'hosxp_pcu', 'username': 'sa',
+             'db_system': 'mysql', 'max_concurrent_queries': 2}
+    jhcis = dict(hosxp, database='jhcisdb', username='jhcis')
+    other_server = dict(hosxp, host='192.168.1.20')
+
+    assert engines.server_key(hosxp) == engines.server_key(jhcis) == ('mysql', '192.168.1.10', 3306)
+    slot = engines.query_slot(hosxp)
+    assert slot is engines.query_slot(jhcis) and slot is not engines.query_slot(other_server)
+    assert engines.query_slot(dict(hosxp, max_concurrent_queries=0)) is None
+    assert engines.query_slot({'use_connection_string': True, 'connection_string': "sqlite:///x.db"}) is None
+    assert slot.acquire(blocking=False) and slot.acquire(blocking=False) and not slot.acquire(blocking=False)
+    print("✓ Databases on one server share its slots, other servers have their own")
+
+    return True
+
+
+def test_workspace_tabs():
+    """Test running queries in several tabs under a concurrency limit"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting the Query workspace tabs...")
+
+    from QueryWorkspace import QueryWorkspace
+
+    db_path = os.path.join(tempfile.mkdtemp(), "workspace_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}",
+                'max_concurrent_queries': 1}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("INSERT INTO patient VALUES ('HN1', '1'), ('HN2', '2')"))
+    connection.commit()
+    connection.close()
+
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    original_critical = QMessageBox.critical
+    errors = []
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    QMessageBox.critical = lambda *args: errors.append(args) or QMessageBox.StandardButton.Ok
+    query_cache.ttl, query_cache.max_mb = 300, 16
+    try:
+        workspace = QueryWorkspace()
+        report = workspace.current_query()
+        lookup = workspace.new_tab()
+        assert workspace.tab_queries.count() == 2 and workspace.current_query() is lookup
+        assert report.results_model is not lookup.results_model
+
+        def process_until(condition):
+            deadline = time.time() + 10
+            while not condition() and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            app.processEvents()
+
+        report.text_query.setPlainText(SLOW_QUERY)
+        report.execute_query()
+        process_until(lambda: report.query_thread.query_slot is not None)
+        assert workspace.tab_queries.tabText(0) == "Query 1 (running)"
+
+        lookup.check_bypass_cache.setChecked(True)
+        lookup.text_query.setPlainText("SELECT hn FROM patient")
+        lookup.execute_query()
+        process_until(lambda: lookup.label_results_info.text().startswith("Waiting"))
+        assert lookup.label_results_info.text() == "Waiting for a free query slot on the server..."
+        assert lookup.is_running() and report.is_running()
+        print("✓ Second tab waits while the first holds the only slot")
+
+        report.cancel_query()
+        process_until(lambda: lookup.btn_execute.isEnabled() and report.btn_execute.isEnabled())
+        assert report.label_results_info.text().startswith("Query cancelled")
+        assert lookup.label_results_info.text() == "Query completed successfully - 2 rows returned"
+        assert workspace.tab_queries.tabText(0) == "Query 1" and errors == []
+        print("✓ Waiting query runs once the slot is free")
+
+        settings['max_concurrent_queries'] = 2
+        report.execute_query()
+        process_until(lambda: report.query_thread.query_slot is not None)
+        lookup.execute_query()
+        process_until(lambda: lookup.btn_execute.isEnabled())
+        assert lookup.label_results_info.text() == "Query completed successfully - 2 rows returned"
+        assert report.is_running()
+        print("✓ Tabs run concurrently within the limit")
+
+        start = time.time()
+        workspace.close_tab(0)
+        assert not report.is_running() and time.time() - start < 5
+        assert workspace.tab_queries.count() == 1 and workspace.current_query() is lookup
+        workspace.close_tab(0)
+        assert workspace.tab_queries.count() == 1 and workspace.current_query() is not lookup
+        assert workspace.tab_queries.tabText(0) == "Query 3"
+        print("✓ Closing a tab cancels its query, the last tab is replaced")
+        workspace.close()
+    finally:
+        QMessageBox.critical = original_critical
+        query_cache.clear()
+        query_cache.ttl = query_cache.max_mb = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_query_slots()
+        success &= test_workspace_tabs()
+
+        if success:
+            print("\n✅ All Query workspace tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
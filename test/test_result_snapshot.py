@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script to verify columnar result snapshots
+"""
+
+import sys
+import os
+import datetime
+import decimal
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ResultSnapshot import write_snapshot, ResultSnapshot, SnapshotError
+from ResultTableModel import ResultTableModel
+
+
+def create_rows(row_count):
+    """Return visit rows with numbers, dates, repeated codes and nulls"""
+    start = datetime.datetime(2024, 1, 15, 8, 0)
+    return [(i, f"HN{i:06d}", (start + datetime.timedelta(days=i % 30)).date(),
+             start + datetime.timedelta(minutes=i), None if i % 5 == 0 else i * 1.5,
+             "M" if i % 2 else "F", decimal.Decimal("30.50"))
+            for i in range(row_count)]
+
+
+HEADERS = ["vn", "hn", "vstdate", "vsttime", "income", "sex", "price"]
+
+
+def test_snapshot_round_trip():
+    """Test that values, types and nulls survive a snapshot"""
+
+    print("Testing snapshot round trip...")
+
+    rows = create_rows(1000)
+    filename = os.path.join(tempfile.mkdtemp(), "visits.qsnap")
+    size = write_snapshot(filename, HEADERS, rows, {"query": "SELECT * FROM ovst"})
+    assert size == os.path.getsize(filename) and not os.path.exists(filename + ".part")
+
+    snapshot = ResultSnapshot(filename)
+    assert snapshot.headers == HEADERS and snapshot.row_count == 1000
+    assert snapshot.metadata["query"] == "SELECT * FROM ovst"
+    assert snapshot.rows[1] == (1, "HN000001", datetime.date(2024, 1, 16),
+                                datetime.datetime(2024, 1, 15, 8, 1), 1.5, "M", "30.50")
+    assert snapshot.rows[0][4] is None and snapshot.rows[-1][0] == 999
+    assert list(snapshot.rows)[500] == snapshot.rows[500]
+    print("✓ Numbers, dates, text and nulls read back")
+
+    types = {column.type for column in snapshot._columns}
+    assert {"int64", "date", "datetime", "float64", "dictionary", "string"} <= types
+    print("✓ Repeated text dictionary-encoded, unique text stored plain")
+
+    model = ResultTableModel()
+    model.set_results(snapshot.rows, snapshot.headers)
+    assert model.total_row_count() == 1000
+    assert model.data(model.index(2, 2)) == "2024-01-17"
+    model.clear()
+    print("✓ Snapshot rows shown through ResultTableModel")
+
+    copy_filename = os.path.join(tempfile.mkdtemp(), "copy.qsnap")
+    rows_type = type(snapshot.rows)
+    original_getitem, original_iter = rows_type.__getitem__, rows_type.__iter__
+
+    def decode_rows(*args):
+        raise AssertionError("rows decoded one by one")
+
+    rows_type.__getitem__ = rows_type.__iter__ = decode_rows
+    try:
+        write_snapshot(copy_filename, snapshot.headers, snapshot.rows, snapshot.metadata)
+    finally:
+        rows_type.__getitem__, rows_type.__iter__ = original_getitem, original_iter
+    copy = ResultSnapshot(copy_filename)
+    assert list(copy.rows) == list(snapshot.rows) and copy.metadata == snapshot.metadata
+    copy.close()
+    snapshot.close()
+    print("✓ Opened snapshot saved again column by column")
+
+    with open(filename, "r+b") as snapshot_file:
+        snapshot_file.write(b"NOTASNAP")
+    try:
+        ResultSnapshot(filename)
+        assert False, "corrupt snapshot opened"
+    except SnapshotError:
+        pass
+    print("✓ Invalid file rejected")
+
+    return True
+
+
+def test_snapshot_opens_in_grid():
+    """Test that the Query window shows a large snapshot without loading it"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting snapshot in the Query window...")
+
+    from Query import Query
+
+    filename = os.path.join(tempfile.mkdtemp(), "large.qsnap")
+    write_snapshot(filename, HEADERS, create_rows(200000), {"query": "SELECT * FROM ovst", "created_at": "2024-01-15"})
+
+    query = Query()
+    start_time = time.perf_counter()
+    query.load_snapshot(filename)
+    open_time = time.perf_counter() - start_time
+    assert query.results_model.total_row_count() == 200000
+    assert query.results_model.rowCount() == ResultTableModel.FETCH_BATCH_SIZE
+    assert query.text_query.toPlainText() == "SELECT * FROM ovst"
+    assert query.btn_save_snapshot.isEnabled()
+    print(f"✓ 200,000-row snapshot shown in {open_time * 1000:.1f} ms")
+
+    query.clear_query()
+    assert query.snapshot is None
+    query.close()
+    print("✓ Snapshot released when the results are cleared")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_snapshot_round_trip()
+        success &= test_snapshot_opens_in_grid()
+
+        if success:
+            print("\n✅ All ResultSnapshot tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
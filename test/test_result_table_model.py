@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the lazily paged ResultTableModel used by Query
+"""
+
+import sys
+import os
+import tempfile
+import time
+import datetime
+import decimal
+from PyQt6.QtWidgets import QApplication, QTableView
+from PyQt6.QtCore import Qt
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ResultTableModel import ResultTableModel, resize_columns_to_sample, sample_row_indexes, column_ranks
+
+
+def test_result_model_paging():
+    """Test that only one page of rows is exposed until the view fetches more"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("Testing ResultTableModel paging...")
+
+    rows = [[i, f"Name {i}", None] for i in range(2500)]
+    model = ResultTableModel()
+    model.set_results(rows, ["ID", "Name", "Empty"])
+
+    assert model.columnCount() == 3
+    assert model.total_row_count() == 2500
+    assert model.rowCount() == ResultTableModel.FETCH_BATCH_SIZE
+    assert model.canFetchMore()
+    print("✓ First page exposed")
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 2500
+    print("✓ Remaining pages fetched")
+
+    assert model.data(model.index(5, 1)) == "Name 5"
+    assert model.data(model.index(5, 2)) == ""
+    assert model.headerData(1, Qt.Orientation.Horizontal) == "Name"
+    print("✓ Cell and header data correct")
+
+    model.clear()
+    assert model.rowCount() == 0 and model.columnCount() == 0
+    print("✓ Model cleared")
+
+    return True
+
+
+def test_result_model_append_rows():
+    """Test that streamed rows fill the first page and then wait for fetchMore"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting ResultTableModel streaming appends...")
+
+    buffer = []
+    model = ResultTableModel()
+    model.set_results(buffer, ["ID"])
+
+    model.append_rows([[i] for i in range(10)])
+    assert model.rowCount() == 10
+    print("✓ Rows visible immediately while the first page fills")
+
+    model.append_rows([[i] for i in range(10, 1500)])
+    assert len(buffer) == 1500
+    assert model.rowCount() == ResultTableModel.FETCH_BATCH_SIZE
+    assert model.canFetchMore()
+    print("✓ Rows beyond the first page wait for fetchMore")
+
+    return True
+
+
+def test_sampled_column_widths():
+    """Test that column widths are estimated from a bounded sample"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting sampled column width estimation...")
+
+    indexes = list(sample_row_indexes(100000, 200))
+    assert len(indexes) <= 201
+    assert indexes[0] == 0 and indexes[-1] == 99999
+    assert list(sample_row_indexes(5, 200)) == [0, 1, 2, 3, 4]
+    print("✓ Sample indexes spread over the buffer")
+
+    view = QTableView()
+    model = ResultTableModel(view)
+    model.set_results([["x", "a much longer cell value than the header"]] * 10, ["A", "B"])
+    view.setModel(model)
+    resize_columns_to_sample(view, max_width=400)
+
+    assert view.columnWidth(1) > view.columnWidth(0)
+    assert view.columnWidth(1) <= 400
+    print("✓ Column widths follow sampled content")
+
+    return True
+
+
+def test_local_sort_and_filter():
+    """Test type-aware, stable, multi-column sorting and filtering of the loaded rows"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting local sort and filter...")
+
+    assert column_ranks([10, None, 9, decimal.Decimal("9.5"), 10]) == [3, 0, 1, 2, 3]
+    assert column_ranks(["b", "B", "a"]) == [1, 1, 0]
+    assert column_ranks([datetime.datetime(2024, 1, 15, 8), datetime.date(2024, 1, 15), None]) == [2, 1, 0]
+    print("✓ Numbers, dates and text ranked by value, NULLs first")
+
+    rows = [["HN3", 9, "M"], ["HN1", 10, "F"], ["HN2", 9, "F"], ["HN4", None, "m"], ["HN5", 100, "F"]]
+    model = ResultTableModel()
+    model.set_results(rows, ["HN", "Age", "Sex"])
+
+    def hns():
+        return [model.data(model.index(row, 0)) for row in range(model.rowCount())]
+
+    model.sort(1, Qt.SortOrder.AscendingOrder)
+    assert hns() == ["HN4", "HN3", "HN2", "HN1", "HN5"]
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    assert hns() == ["HN5", "HN1", "HN3", "HN2", "HN4"]
+    model.sort(2, Qt.SortOrder.AscendingOrder)
+    assert model.sort_columns() == [(2, True), (1, False)]
+    assert hns() == ["HN5", "HN1", "HN2", "HN3", "HN4"]
+    assert model.headerData(0, Qt.Orientation.Vertical) == "5"
+    print("✓ Header clicks sort numerically and keep the previous column as tie-breaker")
+
+    model.set_filter("f", column=2)
+    assert hns() == ["HN5", "HN1", "HN2"] and model.view_row_count() == 3 and model.total_row_count() == 5
+    model.set_filter("hn4")
+    assert hns() == ["HN4"]
+    model.set_filter("")
+    model.sort(-1)
+    assert hns() == ["HN3", "HN1", "HN2", "HN4", "HN5"]
+    print("✓ Filter by column or any column, sort removed")
+
+    model.sort_by([(2, True)])
+    assert hns() == ["HN1", "HN2", "HN5", "HN3", "HN4"]
+    assert model.removeRow(0)
+    assert rows == [["HN3", 9, "M"], ["HN2", 9, "F"], ["HN4", None, "m"], ["HN5", 100, "F"]]
+    assert hns() == ["HN2", "HN5", "HN3", "HN4"]
+    print("✓ Removing a sorted row removes it from the buffer")
+
+    model.sort_by([(2, True), (1, True)])
+    model.set_filter("f", column=2)
+    model.append_rows([["HN0", 1, "F"], ["HN6", 50, "M"]])
+    assert hns() == ["HN2", "HN5", "HN0"] and model.view_row_count() == 3
+    model.refresh_view()
+    assert hns() == ["HN0", "HN2", "HN5"]
+    model.set_filter("")
+    print("✓ Appended rows filtered at once and sorted when loading ends")
+
+    streamed = []
+    model.set_results(streamed, ["ID", "Score"])
+    model.sort_by([(1, True)])
+    start = time.perf_counter()
+    for batch_start in range(0, 100000, 1000):
+        model.append_rows([[i, (i * 37) % 1000] for i in range(batch_start, batch_start + 1000)])
+    model.refresh_view()
+    append_time = time.perf_counter() - start
+    scores = [streamed[model.buffer_row(view_row)][1] for view_row in range(model.view_row_count())]
+    assert scores == sorted(scores) and len(scores) == 100000 and append_time < 2.0
+    print(f"✓ 100 batches appended to a sorted view in {append_time * 1000:.0f} ms")
+
+    row_count = 200000
+    rows = [[i, f"Patient {(i * 7919) % row_count:06d}", (i * 37) % 1000,
+             datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365)] for i in range(row_count)]
+    model.set_results(rows, ["ID", "Name", "Score", "Visit Date"])
+    start = time.perf_counter()
+    model.sort(2, Qt.SortOrder.DescendingOrder)
+    first_sort = time.perf_counter() - start
+    start = time.perf_counter()
+    model.sort_by([(3, True), (1, False)])
+    multi_sort = time.perf_counter() - start
+    assert first_sort < 1.0 and multi_sort < 1.0
+    buffer_rows = [rows[model.buffer_row(view_row)] for view_row in range(row_count)]
+    assert buffer_rows == sorted(rows, key=lambda row: (row[3], [-ord(c) for c in row[1]]))
+    start = time.perf_counter()
+    model.set_filter("patient 00012")
+    filter_time = time.perf_counter() - start
+    assert model.view_row_count() == 10 and filter_time < 1.0
+    print(f"✓ {row_count} rows sorted in {first_sort * 1000:.0f} ms, multi-column {multi_sort * 1000:.0f} ms, "
+          f"filtered in {filter_time * 1000:.0f} ms")
+
+    from ResultSnapshot import write_snapshot, ResultSnapshot
+    filename = os.path.join(tempfile.mkdtemp(), "sort.plksnap")
+    write_snapshot(filename, ["HN", "Age"], [["HN1", 40], ["HN2", None], ["HN3", 7]])
+    snapshot = ResultSnapshot(filename)
+    model.set_results(snapshot.rows, snapshot.headers)
+    model.sort(1, Qt.SortOrder.AscendingOrder)
+    assert hns() == ["HN2", "HN3", "HN1"]
+    model.clear()
+    snapshot.close()
+    print("✓ Snapshot rows sorted column by column")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_result_model_paging()
+        success &= test_result_model_append_rows()
+        success &= test_sampled_column_widths()
+        success &= test_local_sort_and_filter()
+
+        if success:
+            print("\n✅ All ResultTableModel tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
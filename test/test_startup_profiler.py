@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the startup profiler and its JSON report
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from StartupProfiler import StartupProfiler
+
+
+def test_profiler_switches():
+    """Test enabling the profiler by environment variable and command line flag"""
+
+    print("Testing StartupProfiler switches...")
+
+    profiler = StartupProfiler.from_environment(argv=["Login.py"], environ={})
+    assert not profiler.enabled
+    with profiler.phase("noop"):
+        pass
+    profiler.mark("noop")
+    assert profiler.phases == [] and profiler.marks == {}
+    assert profiler.finish() is None
+    print("✓ Disabled profiler records nothing")
+
+    profiler = StartupProfiler.from_environment(argv=["Login.py"], environ={"APP_PROFILE_STARTUP": "1"})
+    assert profiler.enabled and profiler.report_path == "startup_profile.json"
+    profiler.import_timer.uninstall()
+    print("✓ Enabled by APP_PROFILE_STARTUP")
+
+    argv = ["Login.py", "--profile-startup=/tmp/report.json"]
+    profiler = StartupProfiler.from_environment(argv=argv, environ={})
+    assert profiler.report_path == "/tmp/report.json"
+    assert argv == ["Login.py"]
+    profiler.import_timer.uninstall()
+    print("✓ Enabled by --profile-startup (flag removed from argv)")
+
+    return True
+
+
+def test_profiler_report():
+    """Test phase timings, import timings and the written report"""
+
+    print("\nTesting StartupProfiler report...")
+
+    report_path = os.path.join(tempfile.mkdtemp(), "startup_profile.json")
+    profiler = StartupProfiler(report_path)
+
+    with profiler.phase("main.setupUi"):
+        for _ in range(3):
+            with profiler.phase("main.create_icon_from_text"):
+                pass
+    sys.modules.pop("colorsys", None)
+    import colorsys
+    profiler.mark("main.interactive")
+
+    assert profiler.finish() == report_path
+    assert profiler.finish() is None
+    with open(report_path, encoding="utf-8") as report_file:
+        report = json.load(report_file)
+
+    phases = {phase["name"]: phase for phase in report["phases"]}
+    assert phases["main.create_icon_from_text"]["calls"] == 3
+    assert phases["main.setupUi"]["total_ms"] >= phases["main.create_icon_from_text"]["total_ms"]
+    assert "main.interactive" in report["marks"]
+    print("✓ Phases summed and marks recorded")
+
+    modules = {item["module"]: item for item in report["imports"]}
+    assert "colorsys" in modules
+    assert modules["colorsys"]["cumulative_ms"] >= modules["colorsys"]["self_ms"] >= 0
+    assert colorsys.__loader__.__class__.__name__ != "_TimedLoader"
+    print("✓ Import times recorded like -X importtime")
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_profiler_switches()
+        success &= test_profiler_report()
+
+        if success:
+            print("\n✅ All StartupProfiler tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Test script to verify table-change invalidation of cached results
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+from PyQt6.QtWidgets import QApplication
+from sqlalchemy import create_engine, text
+
+# Add the parent directory to Python path so we can import the modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from QueryCache import QueryResultCache, query_cache
+from QueryHistoryStore import query_history
+from TableChangeMonitor import TableChangeMonitor, table_monitor, extract_tables, version_query, read_table_versions
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeVersions:
+    """Change tokens kept in a dict, standing in for the server catalog"""
+
+    def __init__(self, versions):
+        self.versions = dict(versions)
+        self.reads = 0
+
+    def __call__(self, connection, tables):
+        self.reads += 1
+        return {table: self.versions[table] for table in tables if table in self.versions}
+
+
+def test_extract_tables():
+    """Test that the tables after FROM/JOIN are found"""
+
+    print("Testing table extraction...")
+
+    assert extract_tables("SELECT * FROM patient") == ("patient",)
+    assert extract_tables("select o.vn from ovst o join opdscreen s on s.vn = o.vn "
+                          "left join `Patient` as p on p.hn = o.hn where o.vstdate = '2024-01-15'") == \
+        ("opdscreen", "ovst", "patient")
+    assert extract_tables("SELECT * FROM ovst o JOIN other_db.patient p ON p.hn = o.hn") == ()
+    assert extract_tables("SELECT * FROM ovst o, patient p WHERE o.hn = p.hn") == ("ovst", "patient")
+    assert extract_tables("SELECT * FROM (SELECT hn FROM patient) t -- FROM ovst") == ("patient",)
+    assert extract_tables("SELECT 'from ovst' AS label") == ()
+    print("✓ Tables, aliases and comma joins recognised; schema-qualified names, comments and literals ignored")
+
+    assert version_query('mysql', ["ovst"]) is not None and "UPDATE_TIME" in str(version_query('mysql', ["ovst"]))
+    assert "pg_stat_user_tables" in str(version_query('postgresql', ["ovst"]))
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        assert read_table_versions(connection, ["ovst"]) is None
+    engine.dispose()
+    print("✓ MySQL/PostgreSQL catalogs queried, other databases not tracked")
+
+    return True
+
+
+def test_invalidate_changed_tables():
+    """Test that only entries of a changed table are dropped"""
+
+    print("\nTesting change-based invalidation...")
+
+    clock = FakeClock()
+    cache = QueryResultCache(clock=clock)
+    cache.ttl, cache.tracked_ttl, cache.max_mb = 60, 3600, 16
+    server = FakeVersions({"patient": "1", "ovst": "1"})
+    # Polled from the background thread too
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    monitor = TableChangeMonitor(cache, engine_lookup=lambda profile: engine if profile == "hosxp" else None,
+                                 version_reader=server)
+
+    cache.put("SELECT * FROM patient", "hosxp", ["hn"], [("HN1",)], 100, 0.1, {"patient": "1"})
+    cache.put("SELECT * FROM ovst", "hosxp", ["vn"], [(1,)], 100, 0.1, {"ovst": "1"})
+    cache.put("SELECT * FROM ovst o JOIN patient p ON p.hn = o.hn", "hosxp", ["vn"], [(1,)], 100, 0.1,
+              {"ovst": "1", "patient": "1"})
+    cache.put("SELECT * FROM v_visits", "hosxp", ["vn"], [(1,)], 100, 0.1)
+    cache.put("SELECT * FROM patient", "sample", ["hn"], [("HN1",)], 100, 0.1)
+
+    assert monitor.poll_once() == 0 and len(cache) == 5
+    print("✓ Nothing dropped while the tables are unchanged")
+
+    server.versions["ovst"] = "2"
+    assert monitor.poll_once() == 2
+    assert cache.get("SELECT * FROM ovst", "hosxp") is None
+    assert cache.get("SELECT * FROM ovst o JOIN patient p ON p.hn = o.hn", "hosxp") is None
+    assert cache.get("SELECT * FROM patient", "hosxp") is not None
+    assert cache.get("SELECT * FROM v_visits", "hosxp") is not None
+    print("✓ Only results reading the changed table dropped")
+
+    clock.now += 120
+    assert cache.get("SELECT * FROM patient", "hosxp") is not None
+    assert cache.get("SELECT * FROM v_visits", "hosxp") is None
+    assert cache.get("SELECT * FROM patient", "sample") is None
+    print("✓ Tracked entries outlive the plain TTL, untracked ones expire")
+
+    changes = []
+    table_watch = monitor.watch("hosxp", {"ovst": "2"}, lambda: changes.append("ovst"))
+    monitor.poll_once()
+    assert changes == []
+    server.versions["ovst"] = "3"
+    monitor.poll_once()
+    monitor.poll_once()
+    assert changes == ["ovst"]
+    monitor.unwatch(table_watch)
+    server.versions["ovst"] = "4"
+    monitor.poll_once()
+    assert changes == ["ovst"]
+    print("✓ Watch callback called once per change")
+
+    monitor.poll_interval = 0.01
+    monitor.start()
+    time.sleep(0.1)
+    monitor.stop()
+    assert server.reads > 5
+    engine.dispose()
+    print("✓ Background poller runs and stops")
+
+    return True
+
+
+def test_query_window_invalidation():
+    """Test that the Query window re-runs a query after its table changed"""
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    print("\nTesting invalidation in the Query window...")
+
+    import Query as query_module
+    from DbEngine import db_engines
+
+    db_path = os.path.join(tempfile.mkdtemp(), "monitor_test.db")
+    settings = {'use_connection_string': True, 'connection_string': f"sqlite:///{db_path}"}
+    connection, _ = db_engines.checkout(settings)
+    connection.execute(text("CREATE TABLE patient (hn TEXT, sex TEXT)"))
+    connection.execute(text("INSERT INTO patient VALUES ('HN1', '1'), ('HN2', '2')"))
+    connection.commit()
+    connection.close()
+
+    # SQLite has no change counters - stand in for the server catalog
+    server = FakeVersions({"patient": "1"})
+    original_reader = query_module.read_table_versions
+    original_get_settings = db_engines.get_settings
+    original_path = query_history.path
+    query_module.read_table_versions = server
+    db_engines.get_settings = lambda: settings
+    query_history.close()
+    query_history.path = os.path.join(tempfile.mkdtemp(), "query_history.db")
+    query_cache.clear()
+    query_cache.ttl, query_cache.tracked_ttl, query_cache.max_mb = 300, 3600, 16
+    monitor = TableChangeMonitor(query_cache, version_reader=server)
+    # The window starts the shared poller once a tracked result is cached
+    table_monitor.poll_interval = 3600
+    try:
+        query = query_module.Query()
+        sql = "SELECT hn FROM patient ORDER BY hn"
+
+        def run():
+            query.text_query.setPlainText(sql)
+            query.execute_query()
+            deadline = time.time() + 10
+            while not query.btn_execute.isEnabled() and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            app.processEvents()
+
+        run()
+        run()
+        assert query.label_cache_status.text() == "Cache: HIT"
+        assert monitor.poll_once() == 0
+        print("✓ Result cached with the table's change token")
+
+        connection, _ = db_engines.checkout(settings)
+        connection.execute(text("INSERT INTO patient VALUES ('HN3', '1')"))
+        connection.commit()
+        connection.close()
+        server.versions["patient"] = "2"
+        assert monitor.poll_once() == 1
+
+        run()
+        assert query.label_cache_status.text() == "Cache: MISS"
+        assert query.results_model.total_row_count() == 3
+        print("✓ Changed table re-queried from the server")
+        query.close()
+    finally:
+        query_cache.clear()
+        query_cache.ttl = query_cache.tracked_ttl = query_cache.max_mb = None
+        query_module.read_table_versions = original_reader
+        table_monitor.stop()
+        table_monitor.poll_interval = None
+        query_history.close()
+        query_history.path = original_path
+        db_engines.get_settings = original_get_settings
+        db_engines.dispose(settings)
+
+    return True
+
+
+if __name__ == '__main__':
+    success = True
+
+    try:
+        success &= test_extract_tables()
+        success &= test_invalidate_changed_tables()
+        success &= test_query_window_invalidation()
+
+        if success:
+            print("\n✅ All TableChangeMonitor tests passed!")
+        else:
+            print("\n❌ Some tests failed.")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"\n💥 Test execution failed: {e}")
+        sys.exit(1)